@@ -0,0 +1,192 @@
+"""
+Vector Compression Benchmark
+Recall vs memory of the local index codecs (src/vector_codecs.py):
+float32, float16 and PQ at several subvector counts, each scanned with
+asymmetric distance computation and then (optionally) reranked exactly
+from float32, as LocalIndex does. Recall is measured against exact
+float32 search, and results are written as JSON like run_benchmarks.py.
+
+Usage:
+    python benchmarks/compression.py --snapshot ./dataset/snapshots/tickets
+    python benchmarks/compression.py --synthetic 200000 --subvectors 24,48,96 --rerank 0,50,200
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+from typing import Dict, List
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.vector_codecs import Float16Codec, PQCodec
+from src.local_index import PQ_TRAIN_ROWS, _top_k, _rerank
+from benchmarks.run_benchmarks import RESULTS_DIR, environment
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recall vs memory of the local index vector codecs")
+    parser.add_argument("--snapshot", default=None,
+                        help="Snapshot directory to take real embeddings from (default: synthetic corpus)")
+    parser.add_argument("--synthetic", type=int, default=100000,
+                        help="Synthetic corpus size when no snapshot is given")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Held-out query vectors")
+    parser.add_argument("--top-k", type=int, default=5, help="Neighbours per query (recall@k)")
+    parser.add_argument("--subvectors", default="24,48,96", help="Comma-separated PQ subvector counts")
+    parser.add_argument("--rerank", default="0,20,50,200",
+                        help="Comma-separated exact-rerank candidate counts (0 = ADC scores only)")
+    parser.add_argument("--output", default=None,
+                        help="Result file (default: benchmarks/results/compression-<timestamp>.json)")
+    return parser.parse_args()
+
+
+def synthetic_corpus(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    """
+    Unit vectors clustered in a low-dimensional subspace plus a little
+    isotropic noise, roughly like sentence embeddings (whose intrinsic
+    dimension is far below 384); uniform noise would be a PQ worst case
+    """
+    rng = np.random.default_rng(seed)
+    latent_dim = min(48, dim)
+    basis = np.linalg.qr(rng.normal(size=(dim, latent_dim)))[0].T.astype(np.float32)
+    centres = rng.normal(size=(256, latent_dim)).astype(np.float32)
+    latent = centres[rng.integers(0, len(centres), count)] \
+        + 0.5 * rng.normal(size=(count, latent_dim)).astype(np.float32)
+    vectors = latent @ basis + 0.02 * rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_corpus(args) -> np.ndarray:
+    if args.snapshot:
+        from src.snapshot import Snapshot
+        return np.asarray(Snapshot(args.snapshot).embeddings, dtype=np.float32)
+    return synthetic_corpus(args.synthetic + args.queries, args.dim)
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    """Mean fraction of the true top k found, both (k, queries)"""
+    return float(np.mean([len(set(found[:, q]) & set(truth[:, q])) / truth.shape[0] for q in range(truth.shape[1])]))
+
+
+def bench_codec(codec, corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray,
+                top_k: int, reranks: List[int]) -> Dict:
+    """Train/encode once, then search every query one at a time per rerank setting"""
+    started = time.perf_counter()
+    if isinstance(codec, PQCodec):
+        sample = np.random.default_rng(0).choice(len(corpus), min(len(corpus), PQ_TRAIN_ROWS), replace=False)
+        codec.train(corpus[np.sort(sample)])
+    train_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    codes = np.concatenate([codec.encode(corpus[start:start + 65536]) for start in range(0, len(corpus), 65536)])
+    encode_seconds = time.perf_counter() - started
+    
+    runs = []
+    for rerank in reranks:
+        found = []
+        started = time.perf_counter()
+        for q in range(len(queries)):
+            query = queries[q:q + 1]
+            scores = codec.scores(codes, query, "cosine")
+            if rerank:
+                candidates, _ = _top_k(scores, min(max(top_k, rerank), len(corpus)))
+                top, _ = _rerank(corpus, query, candidates, "cosine", top_k)
+            else:
+                top, _ = _top_k(scores, top_k)
+            found.append(top[:, 0])
+        elapsed = time.perf_counter() - started
+        runs.append({
+            "rerank": rerank,
+            "recall": round(recall(np.stack(found, axis=1), truth), 4),
+            "query_ms": round(elapsed / len(queries) * 1000, 3)
+        })
+    
+    return {
+        "codec": codec.name,
+        "subvectors": getattr(codec, "subvectors", None),
+        "bytes_per_vector": codec.bytes_per_vector,
+        "memory_mb": round(codec.bytes_per_vector * len(corpus) / 1e6, 2),
+        "compression": round(4 * corpus.shape[1] / codec.bytes_per_vector, 1),
+        "train_s": round(train_seconds, 2),
+        "encode_s": round(encode_seconds, 2),
+        "runs": runs
+    }
+
+
+def main():
+    args = parse_args()
+    
+    print("\n" + "=" * 70)
+    print("🗜️  Vector Compression Benchmark")
+    print("=" * 70)
+    
+    vectors = load_corpus(args)
+    rng = np.random.default_rng(1)
+    held_out = rng.choice(len(vectors), args.queries, replace=False)
+    queries = vectors[held_out]
+    corpus = np.delete(vectors, held_out, axis=0)
+    dim = corpus.shape[1]
+    print(f"\n📦 {len(corpus)} × {dim} corpus ({'snapshot' if args.snapshot else 'synthetic'}), "
+          f"{len(queries)} queries, recall@{args.top_k}")
+    
+    # Ground truth and baseline: exact float32 scan
+    started = time.perf_counter()
+    truth = np.stack([_top_k(corpus @ queries[q:q + 1].T, args.top_k)[0][:, 0] for q in range(len(queries))], axis=1)
+    baseline_ms = (time.perf_counter() - started) / len(queries) * 1000
+    results = [{
+        "codec": "float32",
+        "subvectors": None,
+        "bytes_per_vector": 4 * dim,
+        "memory_mb": round(corpus.nbytes / 1e6, 2),
+        "compression": 1.0,
+        "train_s": 0.0,
+        "encode_s": 0.0,
+        "runs": [{"rerank": 0, "recall": 1.0, "query_ms": round(baseline_ms, 3)}]
+    }]
+    
+    reranks = [int(rerank) for rerank in args.rerank.split(",")]
+    codecs = [Float16Codec(dim)] + [PQCodec(dim, int(m)) for m in args.subvectors.split(",")]
+    for codec in codecs:
+        label = f"{codec.name} ({codec.subvectors} subvectors)" if isinstance(codec, PQCodec) else codec.name
+        print(f"\n🔬 {label}...")
+        results.append(bench_codec(codec, corpus, queries, truth, args.top_k, reranks))
+    
+    print(f"\n{'codec':<10}{'m':>5}{'B/vec':>8}{'MB':>10}{'ratio':>7}{'rerank':>8}{'recall':>8}{'ms/query':>10}")
+    for result in results:
+        for run in result["runs"]:
+            print(f"{result['codec']:<10}{result['subvectors'] or '-':>5}{result['bytes_per_vector']:>8}"
+                  f"{result['memory_mb']:>10}{result['compression']:>7}{run['rerank']:>8}"
+                  f"{run['recall']:>8.3f}{run['query_ms']:>10.3f}")
+    
+    # float16 trades scan speed for memory: NumPy widens half floats in software
+    float16 = next((result for result in results if result["codec"] == "float16"), None)
+    if float16 and baseline_ms > 0:
+        slowdown = float16["runs"][0]["query_ms"] / baseline_ms
+        print(f"\n⚠️  float16 halves memory but scans {slowdown:.1f}x slower than float32 here "
+              f"(half->float32 conversion on every query)")
+    
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "corpus": {
+            "source": args.snapshot or "synthetic",
+            "vectors": len(corpus),
+            "dimension": dim,
+            "queries": len(queries),
+            "top_k": args.top_k
+        },
+        "codecs": results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"compression-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
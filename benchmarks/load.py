@@ -0,0 +1,105 @@
+"""
+Open-loop Load Generator
+Fires /classify requests at a fixed arrival rate regardless of how fast
+the server answers, and reports throughput and latency percentiles
+"""
+
+import time
+import asyncio
+from typing import Dict, List
+import httpx
+import numpy as np
+
+
+def percentiles(latencies_ms: List[float]) -> Dict:
+    """p50/p95/p99/max of a latency sample in milliseconds"""
+    if not latencies_ms:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(max(latencies_ms)), 2)
+    }
+
+
+async def run_open_loop(
+    url: str,
+    texts: List[str],
+    rate: float,
+    duration: float,
+    path: str = "/classify",
+    timeout: float = 30.0
+) -> Dict:
+    """
+    Send requests at `rate` per second for `duration` seconds
+    
+    Latency is measured from each request's scheduled send time, so time
+    spent queued behind a slow server counts (no coordinated omission).
+    
+    Args:
+        url: API base URL
+        texts: Ticket texts, cycled; a sequence number is appended so every
+            request misses the result and embedding caches
+        rate: Arrivals per second
+        duration: Seconds to keep sending
+        path: Endpoint to hit
+        timeout: Per-request timeout in seconds
+    
+    Returns:
+        Dict with sent/ok/error counts, achieved throughput and percentiles
+    """
+    total = int(rate * duration)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    loop = asyncio.get_running_loop()
+    
+    async def one(client: httpx.AsyncClient, scheduled: float, text: str):
+        try:
+            response = await client.post(path, json={"text": text})
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == "200":
+            latencies.append((loop.time() - scheduled) * 1000)
+    
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=256)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        tasks = []
+        started = loop.time()
+        for i in range(total):
+            scheduled = started + i / rate
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            text = f"{texts[i % len(texts)]} #{i}"
+            tasks.append(asyncio.create_task(one(client, scheduled, text)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - started
+    
+    ok = statuses.get("200", 0)
+    return {
+        "target_rps": rate,
+        "duration_s": duration,
+        "sent": total,
+        "ok": ok,
+        "errors": total - ok,
+        "statuses": statuses,
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        **percentiles(latencies)
+    }
+
+
+def run_rates(url: str, texts: List[str], rates: List[float], duration: float) -> List[Dict]:
+    """Run one open-loop phase per arrival rate, printing a summary line for each"""
+    results = []
+    for rate in rates:
+        result = asyncio.run(run_open_loop(url, texts, rate, duration))
+        results.append(result)
+        print(f"  • {rate:>7.1f} req/s → {result['throughput_rps']:>7.1f} ok/s, "
+              f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+              f"p99 {result['p99_ms']} ms, errors {result['errors']}")
+        time.sleep(1)  # let the server drain before the next phase
+    return results
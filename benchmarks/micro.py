@@ -0,0 +1,102 @@
+"""
+Micro-benchmarks
+Encoder single vs batched, Endee payload serialization/deserialization
+and classification voting, timed in-process
+"""
+
+import time
+import statistics
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+import msgpack
+import numpy as np
+
+from src.endee_client import _EndeeClientBase
+
+
+def measure(fn: Callable, number: int = 100, repeat: int = 5) -> Dict:
+    """
+    Time fn() in `repeat` rounds of `number` calls
+    
+    Returns:
+        Per-call median/min/mean microseconds over the rounds
+    """
+    fn()  # warm-up
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number * 1e6)
+    return {
+        "median_us": round(statistics.median(rounds), 2),
+        "min_us": round(min(rounds), 2),
+        "mean_us": round(statistics.mean(rounds), 2),
+        "calls": number * repeat
+    }
+
+
+def bench_encode(model, texts: List[str], batch_size: int = 32, repeat: int = 3) -> Dict:
+    """model.encode one text at a time vs one batched call"""
+    def single():
+        for text in texts:
+            model.encode(text, normalize_embeddings=True)
+    
+    def batched():
+        model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    
+    single_stats = measure(single, number=1, repeat=repeat)
+    batched_stats = measure(batched, number=1, repeat=repeat)
+    return {
+        "texts": len(texts),
+        "batch_size": batch_size,
+        "single_ms_per_text": round(single_stats["median_us"] / 1000 / len(texts), 3),
+        "batched_ms_per_text": round(batched_stats["median_us"] / 1000 / len(texts), 3),
+        "speedup": round(single_stats["median_us"] / batched_stats["median_us"], 2)
+    }
+
+
+def bench_codec(client, dim: int = 384, top_k: int = 5, insert_batch: int = 500) -> Dict:
+    """Request encoding (msgpack vs JSON) and search-response decoding"""
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(dim).astype(np.float32)
+    vectors = rng.standard_normal((insert_batch, dim)).astype(np.float32)
+    
+    search_payload = _EndeeClientBase._search_payload(query, top_k, None)
+    insert_items = _EndeeClientBase._insert_items(vectors, [f"ticket_{i}" for i in range(insert_batch)])
+    
+    results = {"dim": dim, "top_k": top_k, "insert_batch": insert_batch}
+    for wire_format in ("msgpack", "json"):
+        body, _ = _EndeeClientBase._encode_body(insert_items, wire_format)
+        results[f"search_request_{wire_format}"] = measure(
+            lambda: _EndeeClientBase._encode_body(search_payload, wire_format), number=2000
+        )
+        results[f"insert_request_{wire_format}"] = measure(
+            lambda: _EndeeClientBase._encode_body(insert_items, wire_format), number=20
+        )
+        results[f"insert_request_{wire_format}_bytes"] = len(body)
+    
+    # Decode + metadata join of a top-k response, as EndeeClient.search does it
+    hits = [{"id": f"ticket_{i}", "distance": 0.1 * i} for i in range(top_k)]
+    response = SimpleNamespace(
+        headers={"Content-Type": "application/msgpack"},
+        content=msgpack.packb({"results": hits})
+    )
+    results["search_response_decode"] = measure(
+        lambda: client._parse_search_results(client._decode_response(response)), number=2000
+    )
+    return results
+
+
+def bench_vote(classifier, top_k: int = 5) -> Dict:
+    """TicketClassifier._build_result on a synthetic top-k result list"""
+    categories = ["Authentication", "Billing", "Technical"]
+    results = [
+        {
+            "id": f"ticket_{i}",
+            "score": 0.9 - 0.05 * i,
+            "metadata": {"category": categories[i % 3], "priority": "High", "text": f"ticket {i}"}
+        }
+        for i in range(top_k)
+    ]
+    return {"top_k": top_k, "vote": measure(lambda: classifier._build_result(results), number=5000)}
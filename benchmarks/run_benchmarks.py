@@ -0,0 +1,191 @@
+"""
+Benchmark Suite
+Runs the micro-benchmarks and the open-loop /classify load test against
+the fake Endee server (src/fake_endee.py), and writes the results as JSON
+so runs can be diffed across releases.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --rates 20,50,100 --duration 15
+    python benchmarks/run_benchmarks.py --endee-latency-ms 5 --endee-error-rate 0.01
+    python benchmarks/run_benchmarks.py --url http://localhost:8000 --skip-micro
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+import tempfile
+import threading
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fake_endee import FakeEndee
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run micro-benchmarks and the /classify load test")
+    parser.add_argument("--tickets", default="./data/sample_tickets.json",
+                        help="Tickets indexed into the fake Endee and used as request texts")
+    parser.add_argument("--rates", default="10,25,50",
+                        help="Comma-separated arrival rates (requests/s) for the load test")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds per load-test rate")
+    parser.add_argument("--url", default=None,
+                        help="Load-test an already running API instead of starting one")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="Port for the in-process API")
+    parser.add_argument("--endee-latency-ms", type=float, default=0.0,
+                        help="Latency injected by the fake Endee per request")
+    parser.add_argument("--endee-error-rate", type=float, default=0.0,
+                        help="Fraction of fake Endee requests answered with 503")
+    parser.add_argument("--skip-micro", action="store_true", help="Skip the micro-benchmarks")
+    parser.add_argument("--skip-load", action="store_true", help="Skip the load test")
+    parser.add_argument("--output", default=None,
+                        help="Results file (default: benchmarks/results/<timestamp>.json)")
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    """Facts that make two result files comparable"""
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "encoder_backend": os.getenv("ENCODER_BACKEND", "torch"),
+        "wire_format": os.getenv("ENDEE_WIRE_FORMAT", "msgpack")
+    }
+
+
+def start_api(port: int):
+    """Run the API in a background thread; returns the uvicorn server"""
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config("src.api:app", host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.1)
+    return server
+
+
+async def run_warmup(url: str, texts, ready_timeout: float = 120.0):
+    """Wait for readiness, then a few sequential requests so lazy initialization isn't measured"""
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        deadline = time.monotonic() + ready_timeout
+        while (await client.get("/health/ready")).status_code != 200:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"API at {url} not ready after {ready_timeout:.0f}s")
+            await asyncio.sleep(0.2)
+        for text in texts[:5]:
+            await client.post("/classify", json={"text": f"warm-up {text}"})
+
+
+def main():
+    args = parse_args()
+    
+    with open(args.tickets, "r") as f:
+        tickets = json.load(f)
+    texts = [ticket["text"] for ticket in tickets]
+    ids = [f"ticket_{ticket['id']}" for ticket in tickets]
+    
+    # Point everything at a throwaway metadata store and the fake Endee
+    workdir = tempfile.mkdtemp(prefix="endee_bench_")
+    fake = FakeEndee()
+    os.environ["ENDEE_HOST"] = fake.start()
+    os.environ["VECTOR_BACKEND"] = "endee"
+    os.environ["METADATA_STORE_PATH"] = os.path.join(workdir, "metadata")
+    os.environ["EMBED_CACHE_PATH"] = ""
+    os.environ["RESULT_CACHE_SIZE"] = "0"
+    
+    print("\n" + "=" * 70)
+    print("⏱️  Benchmark Suite")
+    print("=" * 70)
+    print(f"\n📡 Fake Endee at {os.environ['ENDEE_HOST']}")
+    
+    # Load the model once; the classifier and the in-process API reuse it
+    from src.encoders import load_encoder, preload_encoder
+    from src.endee_client import EndeeClient
+    preload_encoder()
+    model, _ = load_encoder()
+    
+    # Index the tickets with real embeddings (this also fills the metadata store)
+    client = EndeeClient()
+    client.create_index("support_tickets", dimension=model.get_sentence_embedding_dimension())
+    client.batch_insert(
+        "support_tickets",
+        model.encode(texts, normalize_embeddings=True),
+        tickets,
+        ids=ids
+    )
+    client.close()
+    
+    # Faults apply to the measured traffic only
+    fake.latency_ms = args.endee_latency_ms
+    fake.error_rate = args.endee_error_rate
+    
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "endee": {"latency_ms": args.endee_latency_ms, "error_rate": args.endee_error_rate}
+    }
+    
+    if not args.skip_micro:
+        from src.classifier import TicketClassifier
+        from benchmarks.micro import bench_encode, bench_codec, bench_vote
+        
+        print("\n🔬 Micro-benchmarks...")
+        classifier = TicketClassifier()
+        dim = classifier.model.get_sentence_embedding_dimension()
+        report["micro"] = {
+            "encode": bench_encode(classifier.model, texts),
+            "codec": bench_codec(classifier.endee, dim=dim),
+            "vote": bench_vote(classifier)
+        }
+        asyncio.run(classifier.aclose())
+        print(json.dumps(report["micro"], indent=2))
+    
+    if not args.skip_load:
+        from benchmarks.load import run_rates
+        
+        server = None
+        url = args.url
+        if url is None:
+            print("\n🚀 Starting API...")
+            server = start_api(args.port)
+            url = f"http://127.0.0.1:{args.port}"
+        
+        rates = [float(rate) for rate in args.rates.split(",")]
+        print(f"\n📈 Open-loop load test against {url}/classify ({args.duration:.0f}s per rate)")
+        asyncio.run(run_warmup(url, texts))
+        report["load"] = run_rates(url, texts, rates, args.duration)
+        
+        if server is not None:
+            server.should_exit = True
+    
+    report["endee"]["responses"] = fake.stats()["responses"]
+    fake.stop()
+    
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,53 @@ and saves it to the dataset directory
 
 from sentence_transformers import SentenceTransformer
 import os
+import sys
+import argparse
 
 # Define model name and local save path
 MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
 SAVE_PATH = './dataset/minilm_model'
 
-def download_model():
+# Texts used to check ONNX embeddings against the PyTorch model
+PARITY_TEXTS = [
+    "I forgot my password",
+    "Reset password link not working",
+    "Charged twice for my subscription this month",
+    "The application crashes when I upload a large file",
+    "Please add dark mode to the dashboard",
+    "How do I change the email address on my account?",
+]
+
+
+def export_onnx_model(model, quantize=False):
+    """Export the saved model to ONNX (optionally int8) and check parity"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from src.encoders import DEFAULT_ONNX_PATH, OnnxEncoder, check_parity, export_onnx
+    
+    print("\n📦 Exporting to ONNX...")
+    onnx_file = export_onnx(SAVE_PATH, DEFAULT_ONNX_PATH, quantize=quantize)
+    print(f"✅ Exported: {onnx_file}")
+    
+    variants = [("fp32", False, 0.9999)]
+    if quantize:
+        variants.append(("int8", True, 0.99))
+    
+    print("\n🧪 Checking ONNX parity against PyTorch...")
+    all_ok = True
+    for label, quantized, threshold in variants:
+        parity = check_parity(model, OnnxEncoder(DEFAULT_ONNX_PATH, quantized=quantized), PARITY_TEXTS)
+        ok = parity["min_cosine"] >= threshold
+        all_ok = all_ok and ok
+        print(f"   {'✅' if ok else '❌'} {label}: min cosine {parity['min_cosine']:.5f} "
+              f"(threshold {threshold}), max abs diff {parity['max_abs_diff']:.5f}")
+    
+    if all_ok:
+        backend = "onnx-int8" if quantize else "onnx"
+        print(f"\n💡 Set ENCODER_BACKEND={backend} in .env to use it")
+    return all_ok
+
+
+def download_model(onnx=False, quantize=False):
     """Download and save the MiniLM model"""
     
     print("=" * 70)
@@ -48,6 +89,9 @@ def download_model():
     print(f"   Embedding dimensions: {len(embedding)}")
     print(f"   First 5 values: {embedding[:5]}")
     
+    if onnx and not export_onnx_model(model, quantize=quantize):
+        print("\n❌ ONNX parity check failed - keep ENCODER_BACKEND=torch")
+    
     print("\n" + "=" * 70)
     print("🎉 Setup Complete! You can now use the model in your project.")
     print("=" * 70)
@@ -70,8 +114,15 @@ print(embedding.shape)  # (384,)
     """)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download the MiniLM model")
+    parser.add_argument("--onnx", action="store_true",
+                        help="Also export the model to ONNX for ENCODER_BACKEND=onnx")
+    parser.add_argument("--quantize", action="store_true",
+                        help="Also write a dynamic int8 ONNX model (implies --onnx)")
+    args = parser.parse_args()
+    
     try:
-        download_model()
+        download_model(onnx=args.onnx or args.quantize, quantize=args.quantize)
     except Exception as e:
         print(f"\n❌ Error: {e}")
         print("\nMake sure you have installed sentence-transformers:")
@@ -5,20 +5,42 @@ Runs the FastAPI application
 
 import uvicorn
 import os
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the Support Ticket Classifier API")
+    parser.add_argument("--production", action="store_true",
+                        help="Preload the model once and fork workers (no auto-reload)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes in production mode (default: API_WORKERS or CPU count)")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "0.0.0.0"), help="Interface to bind")
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")), help="Port to bind")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    
     print("\n" + "=" * 70)
     print("🎯 Support Ticket Classifier API")
     print("=" * 70)
-    print("\n📚 Documentation: http://localhost:8000/docs")
-    print("❤️  Health Check: http://localhost:8000/health")
-    print("📊 API Root: http://localhost:8000")
+    print(f"\n📚 Documentation: http://localhost:{args.port}/docs")
+    print(f"❤️  Health Check: http://localhost:{args.port}/health")
+    print(f"📊 API Root: http://localhost:{args.port}")
     print("\n" + "=" * 70 + "\n")
     
-    uvicorn.run(
-        "src.api:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,  # Auto-reload on code changes
-        log_level="info"
-    )
+    if args.production:
+        from src.server import serve
+        serve(host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(
+            "src.api:app",
+            host=args.host,
+            port=args.port,
+            reload=True,  # Auto-reload on code changes
+            log_level="info"
+        )
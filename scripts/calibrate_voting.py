@@ -0,0 +1,116 @@
+"""
+Calibrate Voting
+Leave-one-out evaluation of the kNN vote over the sample tickets: every
+ticket is classified against all the others for each weighting and
+temperature, and accuracy plus expected calibration error (ECE) are
+reported so VOTE_WEIGHTING / VOTE_TEMPERATURE can be picked from data.
+
+Usage:
+    python scripts/calibrate_voting.py
+    python scripts/calibrate_voting.py --top-k 7 --temperatures 0.02,0.05,0.1,0.2
+"""
+
+import sys
+import os
+import json
+import argparse
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.encoders import load_encoder
+from src.voting import vote_weights, weighted_vote
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Grid-search the kNN vote weighting on held-out tickets")
+    parser.add_argument("--tickets", default="./data/sample_tickets.json", help="Labelled tickets (JSON array)")
+    parser.add_argument("--top-k", type=int, default=5, help="Neighbours per vote")
+    parser.add_argument("--temperatures", default="0.02,0.05,0.1,0.2,0.5",
+                        help="Comma-separated softmax temperatures to try")
+    parser.add_argument("--bins", type=int, default=10, help="Confidence bins for ECE")
+    return parser.parse_args()
+
+
+def expected_calibration_error(confidences: np.ndarray, correct: np.ndarray, bins: int = 10) -> float:
+    """
+    Gap between confidence and accuracy, averaged over confidence bins
+    
+    Args:
+        confidences: Predicted confidence per example (0..1)
+        correct: Whether each prediction was right
+        bins: Number of equal-width confidence bins
+    
+    Returns:
+        ECE (0 = perfectly calibrated)
+    """
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(confidences, edges[1:-1]), 0, bins - 1)
+    error = 0.0
+    for b in range(bins):
+        mask = which == b
+        if mask.any():
+            error += mask.mean() * abs(confidences[mask].mean() - correct[mask].mean())
+    return float(error)
+
+
+def evaluate(neighbours, scores, labels, weighting: str, temperature: float, bins: int) -> dict:
+    """Leave-one-out accuracy and ECE for one vote configuration"""
+    confidences = np.empty(len(labels))
+    correct = np.empty(len(labels))
+    for i, (row, row_scores) in enumerate(zip(neighbours, scores)):
+        weights = vote_weights(row_scores, weighting, temperature)
+        predicted, confidences[i], _ = weighted_vote([labels[j] for j in row], weights)
+        correct[i] = predicted == labels[i]
+    return {
+        "weighting": weighting,
+        "temperature": temperature if weighting == "softmax" else None,
+        "accuracy": round(float(correct.mean()), 3),
+        "mean_confidence": round(float(confidences.mean()), 3),
+        "ece": round(expected_calibration_error(confidences, correct, bins), 3)
+    }
+
+
+def main():
+    args = parse_args()
+    
+    with open(args.tickets, "r") as f:
+        tickets = json.load(f)
+    labels = [ticket["category"] for ticket in tickets]
+    top_k = min(args.top_k, len(tickets) - 1)
+    
+    print("\n" + "=" * 70)
+    print("🎯 Voting Calibration (leave-one-out)")
+    print("=" * 70)
+    
+    model, _ = load_encoder()
+    embeddings = np.asarray(
+        model.encode([ticket["text"] for ticket in tickets], normalize_embeddings=True),
+        dtype=np.float32
+    )
+    
+    # Exact neighbours of every ticket among the others
+    similarity = embeddings @ embeddings.T
+    np.fill_diagonal(similarity, -np.inf)
+    neighbours = np.argsort(-similarity, axis=1, kind="stable")[:, :top_k]
+    scores = np.take_along_axis(similarity, neighbours, axis=1)
+    
+    configs = [("softmax", float(t)) for t in args.temperatures.split(",")]
+    configs += [("distance", 0.0), ("uniform", 0.0)]
+    rows = [evaluate(neighbours, scores, labels, w, t, args.bins) for w, t in configs]
+    
+    print(f"\n{len(tickets)} tickets, top_k={top_k}\n")
+    print(f"{'weighting':<10} {'temp':>6} {'accuracy':>9} {'confidence':>11} {'ECE':>6}")
+    for row in rows:
+        temperature = f"{row['temperature']:.2f}" if row["temperature"] is not None else "-"
+        print(f"{row['weighting']:<10} {temperature:>6} {row['accuracy']:>9.3f} "
+              f"{row['mean_confidence']:>11.3f} {row['ece']:>6.3f}")
+    
+    best = min(rows, key=lambda row: (-row["accuracy"], row["ece"]))
+    print(f"\n✅ Best: VOTE_WEIGHTING={best['weighting']}"
+          + (f" VOTE_TEMPERATURE={best['temperature']}" if best["temperature"] is not None else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,104 +1,294 @@
 """
 Index Sample Tickets into Endee
-Loads sample tickets and stores their embeddings in Endee
+Streams tickets from disk, embeds them in batches and inserts them into
+Endee in fixed-size chunks with several requests in flight. Progress is
+checkpointed so an interrupted run resumes where it stopped.
 """
 
 import sys
 import os
 import json
+import time
+import random
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sentence_transformers import SentenceTransformer
-from src.endee_client import EndeeClient
+from src.encoders import load_encoder
+from src.backends import create_vector_client
+from src.embedding_cache import EmbeddingCache, model_identity
+
+
+def iter_tickets(path: str, read_size: int = 1 << 16) -> Iterator[Dict]:
+    """
+    Stream tickets from a JSON array or NDJSON file without loading it whole
+    
+    Args:
+        path: Path to a .json array or .jsonl/.ndjson file
+        read_size: Bytes read from disk per step
+    
+    Yields:
+        Ticket dicts in file order
+    """
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    
+    # Incrementally decode the elements of a top-level JSON array
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(read_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"{path} is not a JSON array")
+        buffer = buffer[1:]
+        eof = False
+        
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                ticket, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(read_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield ticket
+            buffer = buffer[end:]
+
+
+def iter_chunks(tickets: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    """Group a ticket stream into lists of at most size tickets"""
+    chunk = []
+    for ticket in tickets:
+        chunk.append(ticket)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_checkpoint(path: str, source: str, index_name: str) -> int:
+    """
+    Read how many tickets a previous run already indexed
+    
+    Returns:
+        Number of leading tickets to skip (0 if no matching checkpoint)
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("source") != os.path.abspath(source) or checkpoint.get("index") != index_name:
+        print(f"⚠️  Checkpoint {path} is for a different source/index, starting over")
+        return 0
+    return checkpoint.get("completed", 0)
+
+
+def save_checkpoint(path: str, source: str, index_name: str, completed: int):
+    """Atomically record the number of leading tickets that are indexed"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "source": os.path.abspath(source),
+            "index": index_name,
+            "completed": completed,
+            "updated_at": time.time()
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def insert_with_retry(
+    client,
+    index_name: str,
+    chunk: Dict,
+    retries: int,
+    backoff: float
+):
+    """
+    Insert one chunk, retrying with exponential backoff and jitter
+    
+    Raises:
+        RuntimeError: If the chunk still fails after all retries
+    """
+    for attempt in range(retries + 1):
+        if client.batch_insert(
+            index_name=index_name,
+            vectors=chunk["vectors"],
+            metadatas=chunk["metadatas"],
+            ids=chunk["ids"]
+        ):
+            return
+        if attempt < retries:
+            delay = backoff * (2 ** attempt) * (1 + random.random())
+            print(f"  ↻ Chunk {chunk['number']} failed, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+    raise RuntimeError(f"Chunk {chunk['number']} failed after {retries + 1} attempts")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Index tickets into Endee")
+    parser.add_argument("--source", default="./data/sample_tickets.json",
+                        help="JSON array or NDJSON file of tickets")
+    parser.add_argument("--index", default="support_tickets", help="Endee index name")
+    parser.add_argument("--chunk-size", type=int, default=500,
+                        help="Tickets per insert request")
+    parser.add_argument("--encode-batch-size", type=int, default=64,
+                        help="Tickets per model forward pass")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Insert requests in flight")
+    parser.add_argument("--retries", type=int, default=5,
+                        help="Retries per failed insert chunk")
+    parser.add_argument("--backoff", type=float, default=0.5,
+                        help="Initial retry backoff in seconds")
+    parser.add_argument("--checkpoint", default="./dataset/index_checkpoint.json",
+                        help="Checkpoint file used to resume interrupted runs")
+    parser.add_argument("--embedding-cache", default=os.getenv("EMBED_CACHE_PATH", ""),
+                        help="SQLite embedding cache shared with the API (default: EMBED_CACHE_PATH)")
+    parser.add_argument("--reset", action="store_true",
+                        help="Ignore any existing checkpoint and index from the start")
+    return parser.parse_args()
 
 
 def main():
     """Load sample tickets and index them in Endee"""
+    args = parse_args()
     
     print("\n" + "=" * 70)
     print("📚 Indexing Sample Tickets")
     print("=" * 70)
     
+    tickets_path = args.source
+    if not os.path.exists(tickets_path):
+        print(f"❌ {tickets_path} not found!")
+        sys.exit(1)
+    
     # Load MiniLM model
     print("\n🤖 Loading MiniLM model...")
     model_path = "./dataset/minilm_model"
     
-    if os.path.exists(model_path):
-        model = SentenceTransformer(model_path)
-        print(f"✅ Loaded model from: {model_path}")
-    else:
-        print(f"⚠️  Local model not found. Downloading from Hugging Face...")
-        model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        print(f"✅ Model loaded")
+    model, model_name = load_encoder(model_path)
     
-    # Load sample tickets
-    print("\n📄 Loading sample tickets...")
-    tickets_path = "./data/sample_tickets.json"
+    # Reuse embeddings already computed by the API or a previous run
+    cache = EmbeddingCache(model_identity(model_name, model), path=args.embedding_cache)
     
-    if not os.path.exists(tickets_path):
-        print(f"❌ {tickets_path} not found!")
-        sys.exit(1)
+    def encode(texts):
+        return model.encode(
+            texts,
+            batch_size=args.encode_batch_size,
+            normalize_embeddings=True
+        )
     
-    with open(tickets_path, 'r') as f:
-        tickets = json.load(f)
+    # Initialize Endee client (pool large enough for all in-flight inserts)
+    print("\n📡 Connecting to Endee...")
+    client = create_vector_client(pool_size=max(args.workers, 1))
     
-    print(f"✅ Loaded {len(tickets)} tickets")
+    # Resume from checkpoint
+    skip = 0 if args.reset else load_checkpoint(args.checkpoint, tickets_path, args.index)
+    if skip:
+        print(f"\n⏩ Resuming after {skip} already indexed tickets")
     
-    # Initialize Endee client
-    print("\n📡 Connecting to Endee...")
-    client = EndeeClient()
+    print(f"\n🔄 Streaming tickets from {tickets_path} "
+          f"(chunk: {args.chunk_size}, in flight: {args.workers})...")
     
-    # Prepare batch data
-    print("\n🔄 Generating embeddings...")
-    vectors = []
-    metadatas = []
-    ids = []
+    tickets = iter_tickets(tickets_path)
+    for _ in range(skip):
+        if next(tickets, None) is None:
+            break
     
-    for ticket in tickets:
-        # Generate embedding
-        embedding = model.encode(ticket['text'], normalize_embeddings=True)
-        
-        # Prepare data
-        vectors.append(embedding.tolist())
-        metadatas.append({
-            "category": ticket['category'],
-            "priority": ticket['priority'],
-            "text": ticket['text']
-        })
-        ids.append(f"ticket_{ticket['id']}")
-        
-        print(f"  ✓ Ticket {ticket['id']}: {ticket['text'][:50]}...")
-    
-    # Batch insert into Endee
-    print(f"\n💾 Indexing {len(vectors)} tickets into Endee...")
-    success = client.batch_insert(
-        index_name="support_tickets",
-        vectors=vectors,
-        metadatas=metadatas,
-        ids=ids
-    )
-    
-    if success:
-        print("\n" + "=" * 70)
-        print("✅ Indexing Complete!")
-        print("=" * 70)
-        
-        # Show statistics
+    category_counts = Counter()
+    completed = skip
+    done_chunks = {}  # chunk number -> size, for chunks finished out of order
+    next_to_commit = 0
+    inflight = set()
+    started = time.time()
+    
+    def commit_finished(finished):
+        """Advance the checkpoint over the contiguous run of finished chunks"""
+        nonlocal completed, next_to_commit
+        for future in finished:
+            number, size = future.result()  # re-raises insert failures
+            done_chunks[number] = size
+        advanced = False
+        while next_to_commit in done_chunks:
+            completed += done_chunks.pop(next_to_commit)
+            next_to_commit += 1
+            advanced = True
+        if advanced:
+            save_checkpoint(args.checkpoint, tickets_path, args.index, completed)
+            rate = (completed - skip) / max(time.time() - started, 1e-9)
+            print(f"  ✓ {completed} tickets indexed ({rate:.0f} tickets/s)")
+    
+    def run_chunk(chunk):
+        insert_with_retry(client, args.index, chunk, args.retries, args.backoff)
+        return chunk["number"], len(chunk["ids"])
+    
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for number, batch in enumerate(iter_chunks(tickets, args.chunk_size)):
+                # Encode the chunk's cache misses in batched forward passes
+                embeddings = cache.get_or_encode([ticket['text'] for ticket in batch], encode)
+                chunk = {
+                    "number": number,
+                    "vectors": embeddings,
+                    "metadatas": [
+                        {
+                            "category": ticket['category'],
+                            "priority": ticket['priority'],
+                            "text": ticket['text']
+                        }
+                        for ticket in batch
+                    ],
+                    "ids": [f"ticket_{ticket['id']}" for ticket in batch]
+                }
+                category_counts.update(ticket['category'] for ticket in batch)
+                
+                # Keep at most `workers` inserts in flight
+                while len(inflight) >= args.workers:
+                    finished, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                    commit_finished(finished)
+                inflight.add(pool.submit(run_chunk, chunk))
+            
+            commit_finished(wait(inflight).done)
+            inflight = set()
+    except (RuntimeError, KeyboardInterrupt) as e:
+        print(f"\n❌ Indexing stopped: {e or 'interrupted'}")
+        print(f"   {completed} tickets are checkpointed in {args.checkpoint}; "
+              f"re-run to resume.")
+        sys.exit(1)
+    
+    print("\n" + "=" * 70)
+    print("✅ Indexing Complete!")
+    print("=" * 70)
+    
+    print(f"\n💾 Indexed {completed - skip} tickets this run ({completed} total)")
+    cache_stats = cache.stats()
+    print(f"   Embedding cache hit rate: {cache_stats['hit_rate']:.1%}")
+    if skip and completed == skip:
+        print("   Everything was already indexed; use --reset to index from scratch.")
+    
+    # Show statistics
+    if category_counts:
         print("\n📊 Indexed Tickets by Category:")
-        from collections import Counter
-        category_counts = Counter(t['category'] for t in tickets)
         for category, count in category_counts.items():
             print(f"  • {category}: {count} tickets")
-        
-        print("\n🎯 Next steps:")
-        print("1. Run: python main.py")
-        print("2. Open: http://localhost:8000/docs")
-        print("3. Test the /classify endpoint!")
-    else:
-        print("\n❌ Indexing failed. Check Endee connection.")
-        sys.exit(1)
+    
+    print("\n🎯 Next steps:")
+    print("1. Run: python main.py")
+    print("2. Open: http://localhost:8000/docs")
+    print("3. Test the /classify endpoint!")
 
 
 if __name__ == "__main__":
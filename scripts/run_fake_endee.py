@@ -0,0 +1,77 @@
+"""
+Run the Fake Endee Server
+Serves the in-memory Endee stand-in on localhost so the API, the indexer
+and the benchmarks work without the endee-server container
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fake_endee import FakeEndee
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a fake Endee server with fault injection")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to bind")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added delay per request")
+    parser.add_argument("--search-latency-ms", type=float, default=None,
+                        help="Delay for search requests (overrides --latency-ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random delay (0..jitter)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503, help="Status for injected errors")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Requests per second before answering 429 (0 = unlimited)")
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="Concurrent requests before answering 503 (0 = unlimited)")
+    parser.add_argument("--reject-msgpack", action="store_true",
+                        help="Answer 415 to msgpack bodies (exercises the JSON fallback)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for errors and jitter")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    
+    latency = args.latency_ms
+    if args.search_latency_ms is not None:
+        latency = {endpoint: args.latency_ms for endpoint in ("create", "insert", "stats", "delete", "delete_vector")}
+        latency["search"] = args.search_latency_ms
+    
+    fake = FakeEndee(
+        latency_ms=latency,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        rate_limit=args.rate_limit,
+        max_concurrency=args.max_concurrency,
+        reject_msgpack=args.reject_msgpack,
+        seed=args.seed
+    )
+    url = fake.start(args.host, args.port)
+    
+    print("\n" + "=" * 70)
+    print("🧪 Fake Endee Server")
+    print("=" * 70)
+    print(f"\n📡 Listening on {url} (set ENDEE_HOST={url})")
+    print(f"   latency: {latency} ms, jitter: {args.jitter_ms} ms, "
+          f"errors: {args.error_rate:.1%} ({args.error_status}), "
+          f"rate limit: {args.rate_limit or 'none'}, max concurrency: {args.max_concurrency or 'none'}")
+    print("\nPress Ctrl+C to stop (vectors are kept in memory only)")
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\n📊 {fake.stats()}")
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.endee_client import EndeeClient
+from src.backends import create_vector_client
 
 
 def main():
@@ -21,7 +21,7 @@ def main():
     
     # Initialize client
     print("\n📡 Connecting to Endee...")
-    client = EndeeClient()
+    client = create_vector_client()
     
     # Create index
     print("\n📊 Creating 'support_tickets' index...")
@@ -0,0 +1,221 @@
+"""
+Snapshot Tickets
+Exports tickets and their embeddings to a compact, versioned snapshot
+(see src/snapshot.py) and restores snapshots into Endee or the local
+engine. A restore is bulk I/O only: no JSON parsing and no re-encoding,
+so snapshots can be built once and shipped between environments. The
+model is loaded only to check that the snapshot was built with the
+encoder this deployment classifies with (--force skips the check).
+
+Usage:
+    python scripts/snapshot_tickets.py export --source ./data/sample_tickets.json --out ./dataset/snapshots/tickets
+    python scripts/snapshot_tickets.py import --snapshot ./dataset/snapshots/tickets
+    VECTOR_BACKEND=local python scripts/snapshot_tickets.py import --snapshot ./dataset/snapshots/tickets
+    python scripts/snapshot_tickets.py info --snapshot ./dataset/snapshots/tickets --verify
+"""
+
+import sys
+import os
+import time
+import argparse
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.snapshot import Snapshot, SnapshotWriter
+from src.metadata_store import vector_ids
+from index_tickets import iter_tickets, iter_chunks, insert_with_retry, load_checkpoint, save_checkpoint
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export tickets to a snapshot, or restore one into the index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    export = commands.add_parser("export", help="Embed tickets and write a snapshot")
+    export.add_argument("--source", default="./data/sample_tickets.json",
+                        help="JSON array or NDJSON file of tickets")
+    export.add_argument("--out", required=True, help="Snapshot directory to create")
+    export.add_argument("--chunk-size", type=int, default=500, help="Tickets per write batch")
+    export.add_argument("--encode-batch-size", type=int, default=64, help="Tickets per model forward pass")
+    export.add_argument("--embedding-cache", default=os.getenv("EMBED_CACHE_PATH", ""),
+                        help="SQLite embedding cache shared with the API (default: EMBED_CACHE_PATH)")
+    
+    restore = commands.add_parser("import", help="Bulk-load a snapshot into Endee or the local engine")
+    restore.add_argument("--snapshot", required=True, help="Snapshot directory")
+    restore.add_argument("--index", default="support_tickets", help="Index name")
+    restore.add_argument("--chunk-size", type=int, default=500, help="Tickets per insert request")
+    restore.add_argument("--workers", type=int, default=4, help="Insert requests in flight")
+    restore.add_argument("--retries", type=int, default=5, help="Retries per failed insert chunk")
+    restore.add_argument("--backoff", type=float, default=0.5, help="Initial retry backoff in seconds")
+    restore.add_argument("--checkpoint", default="./dataset/snapshot_checkpoint.json",
+                         help="Checkpoint file used to resume interrupted restores")
+    restore.add_argument("--embedding-cache", default=os.getenv("EMBED_CACHE_PATH", ""),
+                         help="Also seed this SQLite embedding cache, so the API never re-encodes the corpus")
+    restore.add_argument("--verify", action="store_true", help="Check file checksums before loading")
+    restore.add_argument("--force", action="store_true",
+                         help="Restore even if the snapshot was built with a different model")
+    restore.add_argument("--reset", action="store_true", help="Ignore any existing checkpoint")
+    
+    info = commands.add_parser("info", help="Describe a snapshot")
+    info.add_argument("--snapshot", required=True, help="Snapshot directory")
+    info.add_argument("--verify", action="store_true", help="Check file checksums")
+    return parser.parse_args()
+
+
+def export_snapshot(args):
+    """Stream tickets, embed them (cache first) and write a snapshot"""
+    from src.encoders import load_encoder
+    from src.embedding_cache import EmbeddingCache, model_identity
+    
+    if not os.path.exists(args.source):
+        print(f"❌ {args.source} not found!")
+        sys.exit(1)
+    if os.path.isdir(args.out) and os.listdir(args.out):
+        print(f"❌ {args.out} already exists; snapshots are immutable, pick a new directory")
+        sys.exit(1)
+    
+    print("\n🤖 Loading MiniLM model...")
+    model, model_name = load_encoder("./dataset/minilm_model")
+    model_id = model_identity(model_name, model)
+    cache = EmbeddingCache(model_id, path=args.embedding_cache)
+    
+    def encode(texts):
+        return model.encode(texts, batch_size=args.encode_batch_size, normalize_embeddings=True)
+    
+    print(f"\n📦 Writing snapshot of {args.source} to {args.out}...")
+    started = time.time()
+    writer = SnapshotWriter(args.out, model_id)
+    for batch in iter_chunks(iter_tickets(args.source), args.chunk_size):
+        writer.add(
+            vector_ids(None, batch),
+            cache.get_or_encode([ticket["text"] for ticket in batch], encode),
+            batch
+        )
+        print(f"  ✓ {writer.count} tickets")
+    manifest = writer.close(source=os.path.abspath(args.source))
+    cache.close()
+    
+    size = sum(info["bytes"] for info in manifest["files"].values())
+    print(f"\n✅ Snapshot written: {manifest['count']} tickets, {size / 1e6:.1f} MB "
+          f"in {time.time() - started:.1f}s")
+
+
+def import_snapshot(args):
+    """Bulk-load a snapshot into the configured vector backend"""
+    from src.backends import create_vector_client
+    
+    try:
+        snapshot = Snapshot(args.snapshot)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if args.verify:
+        corrupt = snapshot.verify()
+        if corrupt:
+            print(f"❌ Checksum mismatch: {', '.join(corrupt)}")
+            sys.exit(1)
+        print("  ✓ Checksums match")
+    
+    # Vectors from another model (or other weights) would load fine and
+    # silently return the wrong neighbours
+    if not args.force:
+        from src.encoders import load_encoder
+        from src.embedding_cache import model_identity
+        print("\n🤖 Loading the configured encoder to check the snapshot's model...")
+        model, model_name = load_encoder("./dataset/minilm_model")
+        model_id = model_identity(model_name, model)
+        if snapshot.manifest["model"] != model_id:
+            print(f"❌ Snapshot was built with {snapshot.manifest['model']}, "
+                  f"but this deployment encodes with {model_id}")
+            print("   Re-export the snapshot with the configured model, or pass --force to restore anyway.")
+            sys.exit(1)
+        print(f"  ✓ Model matches ({model_id})")
+    
+    cache = None
+    if args.embedding_cache:
+        from src.embedding_cache import EmbeddingCache
+        cache = EmbeddingCache(snapshot.manifest["model"], path=args.embedding_cache)
+    
+    print("\n📡 Connecting to vector backend...")
+    client = create_vector_client(pool_size=max(args.workers, 1))
+    if not client.create_index(args.index, dimension=snapshot.dimension, metric=snapshot.manifest["metric"]):
+        sys.exit(1)
+    
+    # A checkpoint counts leading rows, exactly like the indexer's
+    skip = 0 if args.reset else load_checkpoint(args.checkpoint, args.snapshot, args.index)
+    if skip:
+        print(f"\n⏩ Resuming after {skip} already restored tickets")
+    
+    print(f"\n🔄 Restoring {len(snapshot) - skip} tickets from {args.snapshot} "
+          f"(model {snapshot.manifest['model']}, chunk: {args.chunk_size}, in flight: {args.workers})...")
+    started = time.time()
+    completed = skip
+    batches = enumerate(snapshot.iter_batches(args.chunk_size, start=skip))
+    
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            while True:
+                # One window of `workers` chunks at a time; checkpoint when it lands
+                window = [
+                    {"number": number, "ids": ids, "vectors": vectors, "metadatas": metadatas}
+                    for number, (ids, vectors, metadatas) in islice(batches, args.workers)
+                ]
+                if not window:
+                    break
+                futures = [
+                    pool.submit(insert_with_retry, client, args.index, chunk, args.retries, args.backoff)
+                    for chunk in window
+                ]
+                for future in wait(futures).done:
+                    future.result()  # re-raises insert failures
+                if cache is not None:
+                    for chunk in window:
+                        cache.put_many([metadata["text"] for metadata in chunk["metadatas"]], chunk["vectors"])
+                completed += sum(len(chunk["ids"]) for chunk in window)
+                save_checkpoint(args.checkpoint, args.snapshot, args.index, completed)
+                rate = (completed - skip) / max(time.time() - started, 1e-9)
+                print(f"  ✓ {completed} tickets restored ({rate:.0f} tickets/s)")
+    except (RuntimeError, KeyboardInterrupt) as e:
+        print(f"\n❌ Restore stopped: {e or 'interrupted'}")
+        print(f"   {completed} tickets are checkpointed in {args.checkpoint}; re-run to resume.")
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+        client.close()
+    
+    print(f"\n✅ Restored {completed - skip} tickets in {time.time() - started:.1f}s")
+
+
+def show_info(args):
+    """Print the manifest summary (and optionally verify checksums)"""
+    try:
+        snapshot = Snapshot(args.snapshot)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    manifest = snapshot.manifest
+    print(f"\n📦 {args.snapshot} (format v{manifest['version']}, created {manifest['created_at']})")
+    print(f"  • Tickets: {manifest['count']} × {manifest['dimension']} dims ({manifest['metric']})")
+    print(f"  • Model: {manifest['model']}")
+    print(f"  • Source: {manifest['source']}")
+    print(f"  • Categories: {', '.join(manifest['categories'])}")
+    print(f"  • Priorities: {', '.join(manifest['priorities'])}")
+    for name, info in manifest["files"].items():
+        print(f"  • {name}: {info['bytes']:,} bytes")
+    if args.verify:
+        corrupt = snapshot.verify()
+        print(f"\n❌ Checksum mismatch: {', '.join(corrupt)}" if corrupt else "\n✅ Checksums match")
+        if corrupt:
+            sys.exit(1)
+
+
+def main():
+    args = parse_args()
+    {"export": export_snapshot, "import": import_snapshot, "info": show_info}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Sync Tickets (Change-Feed Ingester)
+Applies only what changed in a ticket export since the last run: new and
+edited tickets are re-embedded and upserted by id, tickets that vanished
+from the export are deleted. A state file keeps a content hash per id, so
+a nightly export becomes a few seconds of incremental work instead of a
+full re-index.
+
+Usage:
+    python scripts/sync_tickets.py --source ./data/sample_tickets.json
+    python scripts/sync_tickets.py --source export.jsonl --dry-run
+"""
+
+import sys
+import os
+import json
+import time
+import hashlib
+import argparse
+from typing import Dict, Iterator
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.encoders import load_encoder
+from src.backends import create_vector_client
+from src.embedding_cache import EmbeddingCache, model_identity
+from src.metadata_store import vector_ids
+from index_tickets import iter_tickets, iter_chunks
+
+
+def ticket_hash(ticket: Dict) -> str:
+    """Content hash of the fields that end up in the index"""
+    content = json.dumps(
+        [ticket.get("text", ""), ticket.get("category"), ticket.get("priority")],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def load_state(path: str, index_name: str) -> Dict[str, str]:
+    """
+    Read the id -> content hash map written by the previous run
+    
+    Returns:
+        Empty dict if there is no state for this index (everything is upserted)
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        state = json.load(f)
+    if state.get("index") != index_name:
+        print(f"⚠️  State {path} is for index '{state.get('index')}', starting over")
+        return {}
+    return state.get("tickets", {})
+
+
+def save_state(path: str, index_name: str, source: str, hashes: Dict[str, str]):
+    """Atomically record the id -> content hash map that is now indexed"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "index": index_name,
+            "source": os.path.abspath(source),
+            "updated_at": time.time(),
+            "tickets": hashes
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Apply ticket changes since the last run to the index")
+    parser.add_argument("--source", default="./data/sample_tickets.json",
+                        help="Current ticket export (JSON array or NDJSON)")
+    parser.add_argument("--index", default="support_tickets", help="Index name")
+    parser.add_argument("--state", default="./dataset/sync_state.json",
+                        help="Content hashes from the previous run")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Tickets per upsert/delete batch")
+    parser.add_argument("--encode-batch-size", type=int, default=64,
+                        help="Tickets per model forward pass")
+    parser.add_argument("--embedding-cache", default=os.getenv("EMBED_CACHE_PATH", ""),
+                        help="SQLite embedding cache shared with the API (default: EMBED_CACHE_PATH)")
+    parser.add_argument("--no-deletes", action="store_true",
+                        help="Keep tickets that are missing from the export (partial exports)")
+    parser.add_argument("--dry-run", action="store_true", help="Report the diff without applying it")
+    parser.add_argument("--reset", action="store_true",
+                        help="Ignore the previous state and upsert every ticket")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    
+    print("\n" + "=" * 70)
+    print("🔁 Syncing Ticket Changes")
+    print("=" * 70)
+    
+    if not os.path.exists(args.source):
+        print(f"❌ {args.source} not found!")
+        sys.exit(1)
+    
+    previous = {} if args.reset else load_state(args.state, args.index)
+    current: Dict[str, str] = {}
+    counts = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+    
+    def changed_tickets() -> Iterator[Dict]:
+        """Stream the export, yielding only new or edited tickets (with their id)"""
+        for batch in iter_chunks(iter_tickets(args.source), args.chunk_size):
+            for vector_id, ticket in zip(vector_ids(None, batch), batch):
+                digest = ticket_hash(ticket)
+                current[vector_id] = digest
+                old = previous.get(vector_id)
+                if old == digest:
+                    counts["unchanged"] += 1
+                    continue
+                counts["added" if old is None else "updated"] += 1
+                yield {**ticket, "_vector_id": vector_id}
+    
+    started = time.time()
+    applied = dict(previous)
+    
+    if args.dry_run:
+        for _ in changed_tickets():
+            pass
+        client = None
+    else:
+        print("\n🤖 Loading MiniLM model...")
+        model, model_name = load_encoder("./dataset/minilm_model")
+        cache = EmbeddingCache(model_identity(model_name, model), path=args.embedding_cache)
+        
+        def encode(texts):
+            return model.encode(texts, batch_size=args.encode_batch_size, normalize_embeddings=True)
+        
+        print("\n📡 Connecting to Endee...")
+        client = create_vector_client()
+        
+        print(f"\n🔄 Upserting changed tickets from {args.source}...")
+        for batch in iter_chunks(changed_tickets(), args.chunk_size):
+            ids = [ticket["_vector_id"] for ticket in batch]
+            ok = client.upsert(
+                args.index,
+                cache.get_or_encode([ticket["text"] for ticket in batch], encode),
+                [
+                    {"category": ticket["category"], "priority": ticket["priority"], "text": ticket["text"]}
+                    for ticket in batch
+                ],
+                ids,
+                batch_size=args.chunk_size
+            )
+            if not ok:
+                save_state(args.state, args.index, args.source, applied)
+                print("\n❌ Upsert failed; progress so far is saved, re-run to continue")
+                sys.exit(1)
+            applied.update((vector_id, current[vector_id]) for vector_id in ids)
+    
+    removed = [] if args.no_deletes else [vector_id for vector_id in previous if vector_id not in current]
+    counts["deleted"] = len(removed)
+    
+    if client is not None:
+        if removed:
+            print(f"\n🗑️  Deleting {len(removed)} tickets missing from the export...")
+            if not client.delete_vectors(args.index, removed, batch_size=args.chunk_size):
+                save_state(args.state, args.index, args.source, applied)
+                print("\n❌ Delete failed; progress so far is saved, re-run to continue")
+                sys.exit(1)
+            for vector_id in removed:
+                applied.pop(vector_id, None)
+        save_state(args.state, args.index, args.source, applied)
+        client.close()
+    
+    print("\n" + "=" * 70)
+    print("✅ Dry run complete (nothing applied)" if args.dry_run else "✅ Sync Complete!")
+    print("=" * 70)
+    print(f"\n  • Added: {counts['added']}")
+    print(f"  • Updated: {counts['updated']}")
+    print(f"  • Deleted: {counts['deleted']}")
+    print(f"  • Unchanged: {counts['unchanged']}")
+    print(f"\n⏱️  {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Admission Control
+Bounded concurrency and queueing for the classify endpoints, so bursts
+are shed early with a Retry-After instead of piling up behind the
+encoder and Endee until every client times out
+"""
+
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+from src import metrics
+
+
+class AdmissionRejected(Exception):
+    """A request was shed; carries the HTTP status and Retry-After to answer with"""
+    
+    def __init__(self, reason: str, status_code: int, retry_after: float):
+        super().__init__(f"Request rejected ({reason}), retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded FIFO queue and a per-request deadline
+    
+    At most max_concurrency requests run at once; up to max_queue more wait
+    in arrival order. A request is rejected without waiting when the queue
+    is full (429) or when the expected wait, from the mean service time of
+    recent requests, already exceeds the deadline (503). A queued request
+    that is still waiting at its deadline is rejected as well (503), so
+    no encode work is ever spent on a request its client has given up on.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        deadline_ms: Optional[float] = None
+    ):
+        """
+        Initialize controller
+        
+        Args:
+            max_concurrency: Requests served at once (default: ADMISSION_MAX_CONCURRENCY or 64, 0 = unlimited)
+            max_queue: Requests allowed to wait for a slot (default: ADMISSION_MAX_QUEUE or 256)
+            deadline_ms: Max time a request may wait for a slot (default: ADMISSION_DEADLINE_MS or 2000)
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "64"))
+        if max_queue is None:
+            max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", "256"))
+        if deadline_ms is None:
+            deadline_ms = float(os.getenv("ADMISSION_DEADLINE_MS", "2000"))
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline_ms / 1000.0
+        
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Exponentially weighted mean of how long a request holds its slot
+        self.service_time = 0.0
+        
+        # Stats
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "deadline": 0, "timeout": 0}
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrency > 0
+    
+    def expected_wait(self, position: int) -> float:
+        """Estimated seconds until the request at this queue position gets a slot"""
+        return (position + 1) * self.service_time / max(self.max_concurrency, 1)
+    
+    def _reject(self, reason: str, status_code: int, retry_after: float):
+        self.shed[reason] += 1
+        metrics.ADMISSION_SHED.inc(reason)
+        return AdmissionRejected(reason, status_code, max(1.0, math.ceil(retry_after)))
+    
+    async def _acquire(self):
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return
+        
+        position = len(self._waiters)
+        if position >= self.max_queue:
+            raise self._reject("queue_full", 429, self.expected_wait(position))
+        if self.expected_wait(position) > self.deadline:
+            raise self._reject("deadline", 503, self.expected_wait(position))
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        metrics.ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.deadline)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+                waiter.cancel()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._reject("timeout", 503, self.expected_wait(len(self._waiters)))
+                raise
+            # The slot was handed over just as we gave up: keep it, or pass it on
+            if isinstance(e, asyncio.CancelledError):
+                self._handoff()
+                raise
+        finally:
+            metrics.ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+            metrics.ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started)
+    
+    def _handoff(self):
+        # Give the slot straight to the oldest waiter so it can't be overtaken
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+    
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Hold a slot for the duration of the block
+        
+        Raises:
+            AdmissionRejected: If the request was shed instead of admitted
+        """
+        if not self.enabled:
+            yield
+            return
+        
+        await self._acquire()
+        self.admitted += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - started
+            self.service_time = held if not self.service_time else 0.9 * self.service_time + 0.1 * held
+            self._handoff()
+    
+    def stats(self) -> Dict:
+        """
+        Get admission statistics
+        
+        Returns:
+            Dict with limits, current load, mean service time and shed counts
+        """
+        total = self.admitted + sum(self.shed.values())
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "deadline_ms": self.deadline * 1000.0,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "mean_service_ms": round(self.service_time * 1000.0, 2),
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "shed_rate": round(sum(self.shed.values()) / total, 4) if total else 0.0
+        }
@@ -3,17 +3,113 @@ FastAPI Application
 RESTful API for ticket classification
 """
 
-from fastapi import FastAPI, HTTPException
+import os
+import sys
+import json
+import time
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict
-from src.classifier import TicketClassifier
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Dict, Optional
+from src import metrics
+from src.admission import AdmissionController, AdmissionRejected
+
+# The classifier (and through it the encoder stack) is imported by the
+# startup loader, so importing this module stays cheap
+if TYPE_CHECKING:
+    from src.classifier import TicketClassifier
+
+# Initialize classifier (loaded and warmed up in the background on startup)
+classifier: Optional["TicketClassifier"] = None
+
+# Dummy queries run through the encoder and Endee before reporting ready
+WARMUP_QUERIES = int(os.getenv("WARMUP_QUERIES", "3"))
+
+
+class _Startup:
+    """Startup progress for the health probes, with per-phase timings"""
+    
+    def __init__(self):
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.started = time.perf_counter()
+    
+    def record(self, phase: str, seconds: float):
+        self.phases[phase] = round(seconds, 3)
+        metrics.STARTUP_SECONDS.set(seconds, phase)
+        print(f"  ⏱️  {phase}: {seconds * 1000:.0f} ms")
+    
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        yield
+        self.record(name, time.perf_counter() - started)
+
+
+startup = _Startup()
+
+
+async def _load_classifier():
+    """Import, build and warm up the classifier, then mark the API ready"""
+    global classifier
+    
+    def build():
+        with startup.phase("import"):
+            from src.classifier import TicketClassifier
+        with startup.phase("classifier"):
+            return TicketClassifier()
+    
+    try:
+        # Model loading blocks; keep the event loop free for the liveness probe
+        instance = await asyncio.to_thread(build)
+        if WARMUP_QUERIES > 0:
+            for phase, seconds in (await instance.warm_up(WARMUP_QUERIES)).items():
+                startup.record(phase, seconds)
+    except Exception as e:
+        startup.state, startup.error = "failed", str(e)
+        if os.getenv("API_SUPERVISED") == "1":
+            # A worker that can't serve must not keep its share of the listening
+            # socket: exit so the supervisor (src/server.py) restarts it
+            print(f"❌ Startup failed: {e}; exiting")
+            sys.stdout.flush()
+            os._exit(1)
+        # Unsupervised (uvicorn src.api:app, tests, in-process benchmarks):
+        # stay up and report the failure on /health/live
+        print(f"❌ Startup failed: {e}")
+        return
+    
+    classifier = instance
+    startup.state = "ready"
+    startup.record("total", time.perf_counter() - startup.started)
+    print("✅ API ready!\n")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the classifier in the background; close it on shutdown"""
+    global classifier
+    print("\n🚀 Starting Support Ticket Classifier API...")
+    loader = asyncio.create_task(_load_classifier())
+    try:
+        yield
+    finally:
+        if not loader.done():
+            loader.cancel()
+        if classifier:
+            await classifier.aclose()
+            classifier = None
+
 
 # Initialize FastAPI
 app = FastAPI(
     title="Support Ticket Classifier",
     description="AI-powered ticket classification using Endee vector search",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS
@@ -25,17 +121,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize classifier (loaded once on startup)
-classifier = None
+# Request counts, latency and in-flight gauges for the API routes
+app.add_middleware(
+    metrics.MetricsMiddleware,
+    paths=[
+        "/classify", "/classify/batch", "/classify/stream", "/health", "/health/live", "/health/ready",
+        "/categories", "/stats", "/metrics"
+    ]
+)
 
+# Streaming classification settings
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "64"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
 
-@app.on_event("startup")
-async def startup_event():
-    """Load classifier on startup"""
-    global classifier
-    print("\n🚀 Starting Support Ticket Classifier API...")
-    classifier = TicketClassifier()
-    print("✅ API ready!\n")
+# Concurrency limit, queue depth and queueing deadline for /classify and /classify/batch
+admission = AdmissionController()
+
+# Ticket text length limits (shared by all classify endpoints)
+MIN_TEXT_LENGTH = 10
+MAX_TEXT_LENGTH = 2000
 
 
 # Request/Response Models
@@ -43,8 +147,8 @@ class TicketRequest(BaseModel):
     """Ticket classification request"""
     text: str = Field(
         ...,
-        min_length=10,
-        max_length=2000,
+        min_length=MIN_TEXT_LENGTH,
+        max_length=MAX_TEXT_LENGTH,
         description="Ticket description"
     )
     
@@ -71,6 +175,58 @@ class ClassificationResponse(BaseModel):
     confidence: float
     routing_team: str
     similar_tickets: List[SimilarTicket]
+    degraded: bool = False
+
+
+class BatchTicketRequest(BaseModel):
+    """Batch classification request"""
+    # Items are validated one by one in the handler, so a bad item is
+    # reported on its own instead of failing the whole batch with a 422
+    texts: List[Any] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Ticket descriptions (each a 10-2000 character string)"
+    )
+    top_k: int = Field(5, ge=1, le=100, description="Similar tickets per ticket")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": [
+                    "I forgot my password and the reset link isn't working",
+                    "I was charged twice for my subscription"
+                ]
+            }
+        }
+
+
+class BatchItemResult(BaseModel):
+    """Result for one ticket of a batch (either result or error is set)"""
+    index: int
+    result: Optional[ClassificationResponse] = None
+    error: Optional[str] = None
+
+
+class BatchClassificationResponse(BaseModel):
+    """Batch classification results, in input order"""
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
+
+@asynccontextmanager
+async def _admitted():
+    """Hold an admission slot, turning a shed request into 429/503 with Retry-After"""
+    try:
+        async with admission.admit():
+            yield
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Server overloaded ({e.reason}), retry later",
+            headers={"Retry-After": str(int(e.retry_after))}
+        )
 
 
 # API Endpoints
@@ -87,13 +243,36 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint ("healthy" once the classifier is warmed up, "degraded" while Endee is down)"""
+    if classifier is None:
+        status = startup.state
+    else:
+        status = "degraded" if classifier.degraded else "healthy"
     return {
-        "status": "healthy",
+        "status": status,
         "classifier": "ready" if classifier else "not ready"
     }
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is serving (503 only if startup failed)"""
+    if startup.state == "failed":
+        return JSONResponse(status_code=503, content={"status": "failed", "error": startup.error})
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 200 once the classifier is loaded and warmed up, else 503"""
+    body = {"status": startup.state, "startup_seconds": startup.phases}
+    if classifier is None:
+        if startup.error:
+            body["error"] = startup.error
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
 @app.post("/classify", response_model=ClassificationResponse)
 async def classify_ticket(request: TicketRequest):
     """
@@ -108,13 +287,214 @@ async def classify_ticket(request: TicketRequest):
         )
     
     try:
-        result = classifier.classify(request.text)
+        async with _admitted():
+            result = await classifier.aclassify(request.text)
         return ClassificationResponse(**result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Classification error: {str(e)}"
+        )
+
+
+@app.post("/classify/batch", response_model=BatchClassificationResponse)
+async def classify_batch(request: BatchTicketRequest):
+    """
+    Classify many tickets in one request
+    
+    Tickets are encoded in one pass and searched concurrently. Invalid
+    tickets are reported per item instead of failing the whole batch.
+    """
+    if not classifier:
+        raise HTTPException(
+            status_code=503,
+            detail="Classifier not initialized"
+        )
+    
+    results: List[Dict] = [None] * len(request.texts)
+    valid_indexes = []
+    for i, text in enumerate(request.texts):
+        error = _validate_text(text)
+        if error:
+            results[i] = {"index": i, "error": error}
+        else:
+            valid_indexes.append(i)
+    
+    try:
+        async with _admitted():
+            batch = await classifier.aclassify_batch(
+                [request.texts[i] for i in valid_indexes],
+                top_k=request.top_k
+            )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Classification error: {str(e)}"
         )
+    
+    for i, item in zip(valid_indexes, batch):
+        item["index"] = i
+        results[i] = item
+    
+    failed = sum(1 for item in results if "error" in item)
+    return BatchClassificationResponse(
+        results=[BatchItemResult(**item) for item in results],
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+
+class _BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that leaves receive() to the request body reader
+    
+    Starlette's StreamingResponse listens for client disconnects by
+    consuming receive() messages, which would swallow request body chunks
+    that are still being read while results stream out. Disconnects are
+    surfaced by request.stream() instead.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _validate_text(text) -> Optional[str]:
+    """Return an error message if text is not a valid ticket description"""
+    if not isinstance(text, str):
+        return "Ticket text must be a string"
+    if not MIN_TEXT_LENGTH <= len(text) <= MAX_TEXT_LENGTH:
+        return f"Ticket text must be {MIN_TEXT_LENGTH}-{MAX_TEXT_LENGTH} characters"
+    return None
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream into lines, holding at most one partial line
+    
+    Lines longer than max_line_bytes are dropped and yielded as None so
+    the caller can report them without buffering them: the limit is
+    checked before each piece of a chunk is added to the buffer, so a long
+    line arriving over many chunks never holds more than max_line_bytes.
+    """
+    buffer = bytearray()
+    skipping = False
+    async for chunk in chunks:
+        start = 0
+        while start < len(chunk):
+            newline = chunk.find(b"\n", start)
+            end = len(chunk) if newline < 0 else newline
+            if not skipping:
+                if len(buffer) + end - start > max_line_bytes:
+                    buffer.clear()
+                    skipping = True
+                else:
+                    buffer += chunk[start:end]
+            if newline < 0:
+                break
+            if skipping:
+                skipping = False
+                yield None
+            else:
+                yield bytes(buffer)
+                buffer.clear()
+            start = newline + 1
+    
+    if skipping:
+        yield None
+    elif buffer.strip():
+        yield bytes(buffer)
+
+
+def _parse_stream_line(line: Optional[bytes]) -> Dict:
+    """Parse one NDJSON input line into {"text", "id"} or {"error"}"""
+    if line is None:
+        return {"error": f"Line exceeds {STREAM_MAX_LINE_BYTES} bytes"}
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return {"error": f"Invalid JSON: {e}"}
+    
+    if isinstance(record, dict):
+        text, ticket_id = record.get("text"), record.get("id")
+    else:
+        text, ticket_id = record, None
+    
+    error = _validate_text(text)
+    if error:
+        return {"id": ticket_id, "error": error}
+    return {"id": ticket_id, "text": text}
+
+
+@app.post("/classify/stream")
+async def classify_stream(request: Request, top_k: int = Query(5, ge=1, le=100)):
+    """
+    Classify an NDJSON stream of tickets
+    
+    Each request line is a JSON object with "text" (and optional "id") or a
+    bare JSON string. Lines are classified in chunks of STREAM_CHUNK_SIZE and
+    results are streamed back as NDJSON in input order while the body is
+    still being read. The body is only read as fast as results are consumed,
+    so memory stays bounded by one chunk regardless of input size.
+    
+    Each chunk goes through admission control like a /classify/batch
+    request; a shed chunk's lines are answered with an overload error.
+    """
+    if not classifier:
+        raise HTTPException(
+            status_code=503,
+            detail="Classifier not initialized"
+        )
+    
+    async def classify_chunk(chunk: List[Dict]) -> AsyncIterator[bytes]:
+        pending = [item for item in chunk if "text" in item]
+        try:
+            results = []
+            if pending:
+                async with admission.admit():
+                    results = await classifier.aclassify_batch(
+                        [item["text"] for item in pending], top_k=top_k
+                    )
+        except AdmissionRejected as e:
+            results = [{
+                "error": f"Server overloaded ({e.reason}), retry later",
+                "retry_after": int(e.retry_after)
+            }] * len(pending)
+        except Exception as e:
+            results = [{"error": f"Classification error: {str(e)}"}] * len(pending)
+        
+        for item, result in zip(pending, results):
+            item.pop("text")
+            item.update({key: value for key, value in result.items() if key != "index"})
+        
+        yield b"".join(json.dumps(item).encode() + b"\n" for item in chunk)
+    
+    async def results() -> AsyncIterator[bytes]:
+        chunk = []
+        line_number = 0
+        async for line in _iter_lines(request.stream(), STREAM_MAX_LINE_BYTES):
+            line_number += 1
+            if line is not None and not line.strip():
+                continue
+            item = {"line": line_number}
+            item.update(_parse_stream_line(line))
+            chunk.append(item)
+            
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                async for output in classify_chunk(chunk):
+                    yield output
+                chunk = []
+        
+        if chunk:
+            async for output in classify_chunk(chunk):
+                yield output
+    
+    return _BodyStreamingResponse(results(), media_type="application/x-ndjson")
 
 
 @app.get("/categories")
@@ -140,5 +520,20 @@ async def get_stats():
             detail="Classifier not initialized"
         )
     
-    stats = classifier.endee.get_stats("support_tickets")
+    stats = await classifier.aendee.get_stats("support_tickets")
+    stats["connection_pool"] = classifier.aendee.pool_stats()
+    stats["embedding_batches"] = classifier.batcher.stats()
+    stats["embedding_cache"] = classifier.embedding_cache.stats()
+    stats["result_cache"] = classifier.result_cache.stats()
+    stats["metadata_store"] = classifier.metadata.stats()
+    stats["voting"] = classifier.voting_stats()
+    stats["centroids"] = classifier.centroid_stats()
+    stats["circuit_breaker"] = classifier.degraded_stats()
+    stats["admission"] = admission.stats()
     return stats
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics: per-stage latency histograms, Endee status counts, in-flight requests"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,53 @@
+"""
+Vector Backend Selection
+Picks the vector search engine from config (VECTOR_BACKEND=endee|local)
+"""
+
+import os
+from typing import Optional, Union
+from src.endee_client import EndeeClient, AsyncEndeeClient
+from src.local_index import LocalIndex, AsyncLocalIndex
+from src.metadata_store import MetadataStore
+
+
+def create_vector_client(
+    metadata_store: Optional[MetadataStore] = None,
+    pool_size: Optional[int] = None,
+    backend: Optional[str] = None
+) -> Union[EndeeClient, LocalIndex]:
+    """
+    Create the configured synchronous vector client
+    
+    Args:
+        metadata_store: Sidecar metadata store to share
+        pool_size: Connection pool size (Endee only)
+        backend: "endee" or "local" (default: VECTOR_BACKEND or endee)
+    
+    Returns:
+        EndeeClient or LocalIndex (same interface)
+    """
+    backend = (backend or os.getenv("VECTOR_BACKEND", "endee")).lower()
+    if backend == "local":
+        return LocalIndex(metadata_store=metadata_store)
+    if backend != "endee":
+        raise ValueError(f"Unknown VECTOR_BACKEND '{backend}' (expected 'endee' or 'local')")
+    return EndeeClient(pool_size=pool_size, metadata_store=metadata_store)
+
+
+def create_async_vector_client(client: Union[EndeeClient, LocalIndex]) -> Union[AsyncEndeeClient, AsyncLocalIndex]:
+    """
+    Create the async counterpart of a vector client
+    
+    The local engine is shared (one in-memory matrix per process); Endee
+    gets its own pooled async connection set but shares the circuit
+    breaker, so both clients see Endee go down at once.
+    
+    Args:
+        client: Client returned by create_vector_client
+    
+    Returns:
+        AsyncEndeeClient or AsyncLocalIndex
+    """
+    if isinstance(client, LocalIndex):
+        return AsyncLocalIndex(client)
+    return AsyncEndeeClient(pool_size=client.pool_size, metadata_store=client.metadata, breaker=client.breaker)
@@ -0,0 +1,165 @@
+"""
+Embedding Micro-Batcher
+Coalesces concurrent encode requests into batched model calls
+"""
+
+import os
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+# Batch-size histogram buckets (upper bounds, inclusive)
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class EmbeddingBatcher:
+    """
+    Collects tickets from concurrent callers and encodes them in one batch
+    
+    A batch is flushed once it holds max_batch_size texts or max_wait_ms
+    have passed since its first text arrived, whichever comes first. Each
+    caller gets back its own row of the batched embedding matrix.
+    """
+    
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        executor: Executor,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        max_inflight_batches: int = 1
+    ):
+        """
+        Initialize batcher
+        
+        Args:
+            encode_fn: Encodes a list of texts into a (n, dim) array
+            executor: Executor the (blocking) encode_fn runs on
+            max_batch_size: Max texts per batch (default: EMBED_BATCH_MAX_SIZE or 32)
+            max_wait_ms: Max time to hold a batch open (default: EMBED_BATCH_MAX_WAIT_MS or 5)
+            max_inflight_batches: Batches allowed to encode concurrently
+        """
+        self.encode_fn = encode_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_inflight_batches = max_inflight_batches
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._pending = set()
+        
+        # Stats
+        self.batches = 0
+        self.items = 0
+        self.histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.histogram_overflow = 0
+    
+    async def encode(self, text: str) -> np.ndarray:
+        """
+        Encode a single text as part of the next batch
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            Embedding vector for this text
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._inflight = asyncio.Semaphore(self.max_inflight_batches)
+            self._worker = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        """Collect texts into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._inflight.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            task = asyncio.create_task(self._encode_batch(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+    
+    async def _encode_batch(self, batch: List):
+        """Run one batched encode and hand each caller its row"""
+        texts = [text for text, _ in batch]
+        try:
+            loop = asyncio.get_running_loop()
+            embeddings = await loop.run_in_executor(self.executor, self.encode_fn, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._inflight.release()
+        
+        self._record(len(batch))
+        for row, (_, future) in zip(embeddings, batch):
+            if not future.done():
+                future.set_result(row)
+    
+    def _record(self, size: int):
+        self.batches += 1
+        self.items += size
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.histogram[bucket] += 1
+                return
+        self.histogram_overflow += 1
+    
+    def stats(self) -> Dict:
+        """
+        Get batching statistics
+        
+        Returns:
+            Dict with batch count, mean size and batch-size histogram
+        """
+        histogram = {f"<={bucket}": count for bucket, count in self.histogram.items()}
+        histogram[f">{BATCH_SIZE_BUCKETS[-1]}"] = self.histogram_overflow
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "batch_size_histogram": histogram
+        }
+    
+    async def stop(self):
+        """Stop the batching worker (pending batches are allowed to finish)"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
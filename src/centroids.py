@@ -0,0 +1,176 @@
+"""
+Label Centroids
+Running mean embedding per category and per priority, used as a cheap
+first stage: a ticket is scored against every centroid with one small
+matrix product, and only ambiguous tickets need a kNN search
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.metadata_store import DEFAULT_CATEGORY, DEFAULT_PRIORITY
+
+# Metadata fields that get centroids, with the label used when one is missing
+CENTROID_FIELDS = {"category": DEFAULT_CATEGORY, "priority": DEFAULT_PRIORITY}
+
+
+class _FieldCentroids:
+    """Per-label vector sums and counts for one metadata field"""
+    
+    def __init__(self):
+        self.labels: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.sums = np.zeros((0, 0))
+        self.counts = np.zeros(0)
+        self.matrix = None  # (labels, normalized centroids), rebuilt lazily after a change
+    
+    def add(self, vectors: np.ndarray, labels: List[str], sign: int = 1):
+        codes = np.fromiter(
+            (self.codes.setdefault(label, len(self.codes)) for label in labels),
+            dtype=np.intp, count=len(labels)
+        )
+        if len(self.codes) > len(self.labels):
+            self.labels = list(self.codes)
+            grown = np.zeros((len(self.labels), vectors.shape[1]))
+            if len(self.sums):
+                grown[:len(self.sums)] = self.sums
+            self.sums = grown
+            self.counts = np.concatenate([self.counts, np.zeros(len(self.labels) - len(self.counts))])
+        np.add.at(self.sums, codes, sign * vectors)
+        self.counts += sign * np.bincount(codes, minlength=len(self.labels))
+        self.matrix = None
+    
+    def centroids(self) -> Tuple[List[str], np.ndarray]:
+        """Labels that still have tickets and their normalized centroids"""
+        if self.matrix is None:
+            present = np.flatnonzero(self.counts > 0)
+            sums = self.sums[present]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            self.matrix = ([self.labels[i] for i in present], (sums / np.maximum(norms, 1e-12)).astype(np.float32))
+        return self.matrix
+
+
+class CentroidIndex:
+    """
+    Incrementally updated category/priority centroids
+    
+    Vectors are L2-normalized before they are summed, so a centroid is the
+    direction of the mean ticket of its label and cosine scores are one
+    matrix product against the (normalized) query embeddings.
+    """
+    
+    def __init__(self):
+        self._fields = {field: _FieldCentroids() for field in CENTROID_FIELDS}
+        self._lock = threading.Lock()
+        self.vectors = 0
+    
+    def add(self, vectors, metadatas: List[Dict]):
+        """
+        Fold newly indexed tickets into the centroids
+        
+        Args:
+            vectors: Embeddings (list or (n, dim) array)
+            metadatas: Metadata dict per vector (category, priority, ...)
+        """
+        self._update(vectors, metadatas, 1)
+    
+    def remove(self, vectors, metadatas: List[Dict]):
+        """
+        Take deleted (or replaced) tickets back out of the centroids
+        
+        Args:
+            vectors: The embeddings the tickets were added with
+            metadatas: The metadata they were added with
+        """
+        self._update(vectors, metadatas, -1)
+    
+    def _update(self, vectors, metadatas: List[Dict], sign: int):
+        if not len(metadatas):
+            return
+        matrix = np.asarray(vectors, dtype=np.float64).reshape(len(metadatas), -1)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        with self._lock:
+            for field, default in CENTROID_FIELDS.items():
+                self._fields[field].add(matrix, [m.get(field) or default for m in metadatas], sign)
+            self.vectors += sign * len(matrix)
+    
+    def scores(self, field: str, embeddings) -> Tuple[List[str], np.ndarray]:
+        """
+        Cosine similarity of each embedding to every centroid of a field
+        
+        Args:
+            field: "category" or "priority"
+            embeddings: Query embeddings, shape (n, dim)
+        
+        Returns:
+            (labels, scores) with scores of shape (n, len(labels))
+        """
+        with self._lock:
+            labels, matrix = self._fields[field].centroids()
+        if not labels:
+            return [], np.zeros((len(embeddings), 0), dtype=np.float32)
+        return labels, np.asarray(embeddings, dtype=np.float32) @ matrix.T
+    
+    def save(self, path: str, state: Dict):
+        """
+        Atomically write the per-label sums and counts (.npz)
+        
+        Args:
+            path: File to write
+            state: What the centroids were built from (model, corpus generation);
+                load only accepts the file for the same state
+        """
+        with self._lock:
+            arrays = {}
+            for field, centroids in self._fields.items():
+                arrays[f"{field}_sums"] = centroids.sums
+                arrays[f"{field}_counts"] = centroids.counts
+            header = {
+                "state": state,
+                "vectors": self.vectors,
+                "labels": {field: centroids.labels for field, centroids in self._fields.items()}
+            }
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, header=np.array(json.dumps(header)), **arrays)
+        os.replace(tmp_path, path)
+    
+    def load(self, path: str, state: Dict) -> bool:
+        """
+        Replace the centroids with a file written by save
+        
+        Returns:
+            False if the file is missing or was saved for another state
+        """
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as saved:
+            header = json.loads(str(saved["header"]))
+            if header["state"] != state:
+                return False
+            fields = {}
+            for field in CENTROID_FIELDS:
+                centroids = _FieldCentroids()
+                centroids.labels = header["labels"][field]
+                centroids.codes = {label: code for code, label in enumerate(centroids.labels)}
+                centroids.sums = saved[f"{field}_sums"]
+                centroids.counts = saved[f"{field}_counts"]
+                fields[field] = centroids
+        with self._lock:
+            self._fields = fields
+            self.vectors = header["vectors"]
+        return True
+    
+    def stats(self) -> Dict:
+        """Vectors folded in and tickets per label"""
+        with self._lock:
+            return {
+                "vectors": self.vectors,
+                **{
+                    f"{field}_counts": {
+                        label: int(count) for label, count in zip(centroids.labels, centroids.counts) if count > 0
+                    }
+                    for field, centroids in self._fields.items()
+                }
+            }
@@ -0,0 +1,158 @@
+"""
+Circuit Breaker
+Stops sending requests to Endee after repeated failures or slow calls,
+so callers fail fast (and can fall back) instead of each waiting out a
+full timeout while Endee is down
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Optional
+from src.metrics import CIRCUIT_STATE, CIRCUIT_TRANSITIONS
+
+# Gauge value per state
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probes
+    
+    Closed: requests flow; a failure (transport error, retryable status or
+    a call slower than slow_call_ms) bumps a counter that any fast success
+    resets. After failure_threshold consecutive failures the circuit opens.
+    
+    Open: requests are rejected with CircuitOpenError without touching the
+    network. After reset_seconds the next request goes through as a probe.
+    
+    Half-open: only the probe is let through (another one is allowed if it
+    never reports back within reset_seconds). A successful probe closes the
+    circuit, a failed one opens it for another reset_seconds.
+    """
+    
+    def __init__(
+        self,
+        name: str = "endee",
+        failure_threshold: Optional[int] = None,
+        slow_call_ms: Optional[float] = None,
+        reset_seconds: Optional[float] = None
+    ):
+        """
+        Initialize breaker
+        
+        Args:
+            name: Label for logs and metrics
+            failure_threshold: Consecutive failures that open the circuit
+                (default: ENDEE_BREAKER_FAILURES or 5, 0 = never open)
+            slow_call_ms: Calls slower than this count as failures
+                (default: ENDEE_BREAKER_SLOW_MS or 2000, 0 = latency is ignored)
+            reset_seconds: Time the circuit stays open before a probe
+                (default: ENDEE_BREAKER_RESET_SECONDS or 10)
+        """
+        if failure_threshold is None:
+            failure_threshold = int(os.getenv("ENDEE_BREAKER_FAILURES", "5"))
+        if slow_call_ms is None:
+            slow_call_ms = float(os.getenv("ENDEE_BREAKER_SLOW_MS", "2000"))
+        if reset_seconds is None:
+            reset_seconds = float(os.getenv("ENDEE_BREAKER_RESET_SECONDS", "10"))
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call = slow_call_ms / 1000.0
+        self.reset_seconds = reset_seconds
+        
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self._lock = threading.Lock()
+        
+        # Stats
+        self.rejected = 0
+        self.opened = 0
+        CIRCUIT_STATE.set(CIRCUIT_STATES["closed"], name)
+    
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are currently being short-circuited"""
+        return self.state != "closed"
+    
+    def _transition(self, state: str):
+        # Caller holds the lock
+        if state == self.state:
+            return
+        self.state = state
+        CIRCUIT_STATE.set(CIRCUIT_STATES[state], self.name)
+        CIRCUIT_TRANSITIONS.inc(self.name, state)
+        if state == "open":
+            self.opened += 1
+            self.opened_at = time.monotonic()
+            print(f"⚠️  {self.name} circuit open after {self.failures} failures; retrying in {self.reset_seconds:.0f}s")
+        elif state == "closed":
+            print(f"✓ {self.name} circuit closed")
+    
+    def allow(self) -> bool:
+        """
+        Whether a request may be sent now
+        
+        Returns:
+            True in the closed state or for a half-open probe, else False
+        """
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+                self._transition("half_open")
+                self.probe_started = now
+                return True
+            if self.state == "half_open" and now - self.probe_started >= self.reset_seconds:
+                self.probe_started = now  # the last probe never reported back
+                return True
+            self.rejected += 1
+            return False
+    
+    def record_success(self, seconds: float = 0.0):
+        """Report a completed call; a slow one counts as a failure"""
+        if self.slow_call > 0 and seconds > self.slow_call:
+            self.record_failure()
+            return
+        with self._lock:
+            self.failures = 0
+            self._transition("closed")
+    
+    def record_failure(self):
+        """Report a failed call (transport error, retryable status, slow call)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self._transition("open")
+    
+    def stats(self) -> Dict:
+        """
+        Get breaker statistics
+        
+        Returns:
+            Dict with state, settings, consecutive failures and rejection counts
+        """
+        return {
+            "state": self.state,
+            "failure_threshold": self.failure_threshold,
+            "slow_call_ms": self.slow_call * 1000.0,
+            "reset_seconds": self.reset_seconds,
+            "consecutive_failures": self.failures,
+            "times_opened": self.opened,
+            "rejected": self.rejected
+        }
@@ -4,10 +4,31 @@ Uses MiniLM embeddings and Endee vector search to classify support tickets
 """
 
 import os
-from typing import Dict, List
-from collections import Counter
-from sentence_transformers import SentenceTransformer
-from src.endee_client import EndeeClient
+import json
+import time
+import fcntl
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+from src.encoders import load_encoder
+from src.backends import create_vector_client, create_async_vector_client
+from src.endee_client import EndeeUnavailable
+from src.local_index import LocalIndex
+from src.metadata_store import MetadataStore
+from src.batcher import EmbeddingBatcher
+from src.embedding_cache import EmbeddingCache, model_identity
+from src.result_cache import ResultCache
+from src.metrics import ADAPTIVE_SEARCHES, CENTROID_ROUTES, DEGRADED_RESPONSES, STAGE_SECONDS
+from src.centroids import CentroidIndex
+from src.voting import vote_weights, weighted_vote
+
+# Max texts per model forward pass when encoding large batches
+ENCODE_BATCH_SIZE = 64
+
+# Where classifications come from while Endee is unavailable
+DEGRADED_FALLBACKS = ("centroids", "local", "none")
 
 
 class TicketClassifier:
@@ -22,19 +43,88 @@ class TicketClassifier:
         """
         print("🤖 Initializing Ticket Classifier...")
         
-        # Load MiniLM model
-        if os.path.exists(model_path):
-            self.model = SentenceTransformer(model_path)
-            print(f"  ✓ Loaded model from {model_path}")
-        else:
-            print(f"  ⚠️  Loading from Hugging Face...")
-            self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-            print(f"  ✓ Model loaded")
+        # Load MiniLM model (ENCODER_BACKEND picks torch or ONNX Runtime)
+        self.model, self.model_name = load_encoder(model_path)
         
-        # Initialize Endee client
-        self.endee = EndeeClient()
+        # Embedding cache shared with the indexer (keyed on model identity)
+        self.embedding_cache = EmbeddingCache(model_identity(self.model_name, self.model))
+        
+        # Initialize vector clients (sync for scripts, async for the API);
+        # VECTOR_BACKEND picks Endee or the in-process NumPy engine
+        self.metadata = MetadataStore()
+        self.endee = create_vector_client(metadata_store=self.metadata)
+        self.aendee = create_async_vector_client(self.endee)
         print("  ✓ Endee client initialized")
         
+        # Bounded pool for CPU-bound encoding so it never runs on the event loop
+        self.encode_workers = int(os.getenv("ENCODER_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self._encode_executor = ThreadPoolExecutor(
+            max_workers=self.encode_workers,
+            thread_name_prefix="encoder"
+        )
+        
+        # Small pool for the embedding cache's SQLite tier, so async cache
+        # hits never queue behind an encode batch on the encoder pool
+        self._cache_io_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("CACHE_IO_WORKERS", "2")),
+            thread_name_prefix="cache-io"
+        ) if self.embedding_cache.has_disk_tier else None
+        
+        # Coalesce concurrent encode calls into batched model calls
+        self.batcher = EmbeddingBatcher(
+            self._encode_texts,
+            self._encode_executor,
+            max_inflight_batches=self.encode_workers
+        )
+        
+        # Cache of finished classifications; any index change (here or, via
+        # the metadata store, in another process) invalidates it
+        self.result_cache = ResultCache(
+            lambda: (self.endee.index_version, self.aendee.index_version, self.metadata.generation())
+        )
+        
+        # Concurrent Endee searches per classify_batch call
+        self.search_concurrency = int(os.getenv("ENDEE_SEARCH_CONCURRENCY", str(self.endee.pool_size or 10)))
+        
+        # Similarity-weighted voting; with adaptive k, search VOTE_INITIAL_K
+        # neighbours first and widen to top_k only for close calls
+        self.vote_weighting = os.getenv("VOTE_WEIGHTING", "softmax")
+        self.vote_temperature = float(os.getenv("VOTE_TEMPERATURE", "0.1"))
+        self.initial_k = int(os.getenv("VOTE_INITIAL_K", "3"))
+        self.margin_threshold = float(os.getenv("VOTE_MARGIN_THRESHOLD", "0.5"))
+        vote_weights(np.zeros(1), self.vote_weighting)  # fail fast on a bad VOTE_WEIGHTING
+        
+        # Two-stage mode: answer from label centroids when the best category
+        # centroid clearly wins, and search Endee only for ambiguous tickets
+        self.centroid_prefilter = os.getenv("CENTROID_PREFILTER", "false").lower() == "true"
+        self.centroid_margin = float(os.getenv("CENTROID_MARGIN", "0.1"))
+        self.centroids = CentroidIndex()
+        
+        # Centroids are keyed on the metadata store generation and rebuilt in
+        # the background (at most every CENTROID_REFRESH_SECONDS) once any
+        # process, e.g. the indexer or another worker, changes the corpus
+        self.centroid_source = os.getenv("CENTROID_SOURCE", "./data/sample_tickets.json")
+        self.centroid_refresh_seconds = float(os.getenv("CENTROID_REFRESH_SECONDS", "5"))
+        self._centroid_generation = None
+        self._centroid_refresh = threading.Lock()
+        self._centroid_refreshed_at = 0.0
+        self.centroid_rebuilds = 0
+        
+        # Degraded mode (opt-in): while Endee is unreachable (or its circuit
+        # breaker is open), answer from the label centroids or a local replica
+        # index (LOCAL_INDEX_PATH) instead of returning "Unclassified"
+        self.breaker = getattr(self.endee, "breaker", None)
+        self.degraded_fallback = os.getenv("DEGRADED_FALLBACK", "none").lower() if self.breaker else "none"
+        if self.degraded_fallback not in DEGRADED_FALLBACKS:
+            raise ValueError(
+                f"Unknown DEGRADED_FALLBACK '{self.degraded_fallback}' (expected {', '.join(DEGRADED_FALLBACKS)})"
+            )
+        self.replica = LocalIndex(metadata_store=self.metadata) if self.degraded_fallback == "local" else None
+        
+        self.use_centroids = self.centroid_prefilter or self.degraded_fallback == "centroids"
+        if self.use_centroids:
+            self._build_centroids()
+        
         # Routing configuration
         self.routing_map = {
             "Authentication": "Security Team",
@@ -51,20 +141,515 @@ class TicketClassifier:
         Args:
             ticket_text: The ticket description
             top_k: Number of similar tickets to retrieve
-            
+        
         Returns:
             Classification result with category, priority, confidence
         """
-        # Generate embedding
-        embedding = self.model.encode(ticket_text, normalize_embeddings=True)
+        # Captured before encoding/searching so a concurrent index change can't be cached over
+        version = self.result_cache.version()
+        cached = self.result_cache.get(ticket_text, top_k)
+        if cached is not None:
+            return cached
+        
+        # Generate embedding (or reuse a cached one)
+        embedding = self._embed_many([ticket_text])[0]
+        
+        # Clear-cut tickets are answered from the centroids alone
+        classification = self._classify_by_centroids([embedding])[0]
+        if classification is not None:
+            self.result_cache.put(ticket_text, top_k, classification, version)
+            return classification
+        
+        # Search Endee for similar tickets (widening only for close calls)
+        try:
+            results = self._search_adaptive(self.endee.search, embedding, top_k)
+        except EndeeUnavailable:
+            return self._classify_degraded([embedding], top_k)[0]
+        
+        return self._finish(ticket_text, top_k, results, version)
+    
+    async def aclassify(self, ticket_text: str, top_k: int = 5) -> Dict:
+        """
+        Classify a support ticket without blocking the event loop
+        
+        Encoding is micro-batched with other concurrent requests on the
+        bounded encoder pool and the Endee search goes through the async client.
+        
+        Args:
+            ticket_text: The ticket description
+            top_k: Number of similar tickets to retrieve
+        
+        Returns:
+            Classification result with category, priority, confidence
+        """
+        # Captured before encoding/searching so a concurrent index change can't be cached over
+        version = self.result_cache.version()
+        cached = self.result_cache.get(ticket_text, top_k)
+        if cached is not None:
+            return cached
+        
+        # Memory hits are answered on the loop; only the SQLite tier goes to the cache I/O pool
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        embedding = self.embedding_cache.get(ticket_text, memory_only=True)
+        if embedding is None and self._cache_io_executor is not None:
+            embedding = await loop.run_in_executor(self._cache_io_executor, self.embedding_cache.get, ticket_text)
+        if embedding is None:
+            embedding = await self.batcher.encode(ticket_text)
+            if self._cache_io_executor is not None:
+                await loop.run_in_executor(self._cache_io_executor, self.embedding_cache.put, ticket_text, embedding)
+            else:
+                self.embedding_cache.put(ticket_text, embedding)
+        STAGE_SECONDS.observe(time.perf_counter() - started, "encode")
+        
+        classification = self._classify_by_centroids([embedding])[0]
+        if classification is not None:
+            self.result_cache.put(ticket_text, top_k, classification, version)
+            return classification
+        
+        try:
+            results = await self._asearch_adaptive(embedding, top_k)
+        except EndeeUnavailable:
+            return (await self._aclassify_degraded([embedding], top_k))[0]
+        
+        return self._finish(ticket_text, top_k, results, version)
+    
+    def classify_batch(self, ticket_texts: List[str], top_k: int = 5) -> List[Dict]:
+        """
+        Classify many tickets with one encode pass and concurrent searches
+        
+        Endee has no multi-query search endpoint, so the per-ticket
+        searches are fanned out over the pooled client instead; the local
+        engine scores the whole batch with one matrix product.
+        
+        Args:
+            ticket_texts: Ticket descriptions
+            top_k: Number of similar tickets to retrieve per ticket
+        
+        Returns:
+            One {"index", "result"} or {"index", "error"} dict per ticket, in input order
+        """
+        version = self.result_cache.version()
+        output, pending = self._cached_batch(ticket_texts, top_k)
+        if not pending:
+            return output
+        
+        texts = [ticket_texts[i] for i in pending]
+        embeddings = self._embed_many(texts)
+        positions = self._centroid_batch(pending, texts, embeddings, top_k, output, version)
+        if not positions:
+            return output
+        
+        # The local engine answers all queries with one matrix product
+        if hasattr(self.endee, "search_batch"):
+            try:
+                batch_results = self._search_batch_adaptive(
+                    self.endee.search_batch, [embeddings[p] for p in positions], top_k
+                )
+            except Exception as e:
+                return self._batch_error(output, pending, positions, e)
+            for position, results in zip(positions, batch_results):
+                index = pending[position]
+                output[index] = {"index": index, "result": self._finish(texts[position], top_k, results, version)}
+            return output
+        
+        def classify_one(position: int) -> Dict:
+            index = pending[position]
+            try:
+                results = self._search_adaptive(self.endee.search, embeddings[position], top_k)
+                return {"index": index, "result": self._finish(texts[position], top_k, results, version)}
+            except EndeeUnavailable:
+                return {"index": index, "result": self._classify_degraded([embeddings[position]], top_k)[0]}
+            except Exception as e:
+                return {"index": index, "error": str(e)}
+        
+        workers = min(self.search_concurrency, len(positions))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search") as pool:
+            for item in pool.map(classify_one, positions):
+                output[item["index"]] = item
+        return output
+    
+    async def aclassify_batch(self, ticket_texts: List[str], top_k: int = 5) -> List[Dict]:
+        """
+        Async version of classify_batch
+        
+        Args:
+            ticket_texts: Ticket descriptions
+            top_k: Number of similar tickets to retrieve per ticket
+        
+        Returns:
+            One {"index", "result"} or {"index", "error"} dict per ticket, in input order
+        """
+        version = self.result_cache.version()
+        output, pending = self._cached_batch(ticket_texts, top_k)
+        if not pending:
+            return output
+        
+        texts = [ticket_texts[i] for i in pending]
+        loop = asyncio.get_running_loop()
+        embeddings = await loop.run_in_executor(
+            self._encode_executor, self._embed_many, texts
+        )
+        positions = self._centroid_batch(pending, texts, embeddings, top_k, output, version)
+        if not positions:
+            return output
+        
+        if hasattr(self.aendee, "search_batch"):
+            # The local engine is in-process; run its (sync) batch search off the loop
+            try:
+                batch_results = await asyncio.to_thread(
+                    self._search_batch_adaptive, self.endee.search_batch, [embeddings[p] for p in positions], top_k
+                )
+            except Exception as e:
+                return self._batch_error(output, pending, positions, e)
+            for position, results in zip(positions, batch_results):
+                index = pending[position]
+                output[index] = {"index": index, "result": self._finish(texts[position], top_k, results, version)}
+            return output
+        
+        semaphore = asyncio.Semaphore(self.search_concurrency)
+        
+        async def classify_one(position: int) -> Dict:
+            index = pending[position]
+            try:
+                async with semaphore:
+                    results = await self._asearch_adaptive(embeddings[position], top_k)
+                return {"index": index, "result": self._finish(texts[position], top_k, results, version)}
+            except EndeeUnavailable:
+                return {"index": index, "result": (await self._aclassify_degraded([embeddings[position]], top_k))[0]}
+            except Exception as e:
+                return {"index": index, "error": str(e)}
+        
+        for item in await asyncio.gather(*(classify_one(p) for p in positions)):
+            output[item["index"]] = item
+        return output
+    
+    def _build_centroids(self):
+        """
+        Load the saved centroids, or seed them from the live corpus
+        
+        Centroids are saved next to the metadata store, tagged with the
+        model and the store generation, and reused until the corpus
+        changes; a file lock makes one worker build while the others wait
+        and load its result.
+        
+        Building: the local engine hands over its stored vectors; with
+        Endee the indexed tickets come from the sidecar metadata store and
+        are re-embedded (embedding cache hits when EMBED_CACHE_PATH is
+        shared with the indexer). Only when nothing is indexed yet is the
+        source file used.
+        """
+        path = os.path.join(self.metadata.path, "centroids.npz")
+        with open(f"{path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Read before seeding, so changes made meanwhile trigger another refresh
+            generation = self.metadata.generation()
+            state = {"model": self.embedding_cache.model_id, "generation": generation}
+            centroids = CentroidIndex()
+            if centroids.load(path, state):
+                print(f"  ✓ Centroids loaded from {path} ({centroids.vectors} tickets)")
+            else:
+                self._seed_centroids(centroids)
+                centroids.save(path, state)
+        self.centroids, self._centroid_generation = centroids, generation
+    
+    def _seed_centroids(self, centroids: CentroidIndex):
+        """Fold the indexed tickets (or, if none, the source file) into centroids"""
+        if hasattr(self.endee, "get_vectors"):
+            ids, vectors = self.endee.get_vectors("support_tickets")
+        else:
+            ids, vectors = self.metadata.ids(), None
+        if ids:
+            metadatas = [metadata or {} for metadata in self.metadata.lookup(ids)]
+            if vectors is None:
+                vectors = self._embed_many([metadata.get("text", "") for metadata in metadatas])
+            centroids.add(vectors, metadatas)
+            print(f"  ✓ Centroids built from {len(ids)} indexed tickets")
+            return
+        
+        source = self.centroid_source
+        if not os.path.exists(source):
+            print(f"  ⚠️  Centroid source {source} not found; centroids fill as tickets are indexed")
+            return
+        with open(source, "r") as f:
+            tickets = json.load(f)
+        centroids.add(self._embed_many([ticket["text"] for ticket in tickets]), tickets)
+        print(f"  ✓ Centroids built from {len(tickets)} tickets in {source} (nothing indexed yet)")
+    
+    def _refresh_centroids(self):
+        """
+        Start a background rebuild if the corpus changed since the centroids were built
+        
+        Costs two stat calls when nothing changed. Requests keep using the
+        current centroids until the rebuild (which may re-embed the corpus
+        with Endee) swaps in the new ones, so it never blocks the event loop.
+        """
+        if not self.use_centroids or self.metadata.generation() == self._centroid_generation:
+            return
+        if time.monotonic() - self._centroid_refreshed_at < self.centroid_refresh_seconds:
+            return
+        if not self._centroid_refresh.acquire(blocking=False):
+            return  # a rebuild is already running
+        self._centroid_refreshed_at = time.monotonic()
+        threading.Thread(target=self._rebuild_centroids, name="centroids", daemon=True).start()
+    
+    def _rebuild_centroids(self):
+        """Background half of _refresh_centroids"""
+        try:
+            self._build_centroids()
+            self.centroid_rebuilds += 1
+        except Exception as e:
+            print(f"⚠️  Centroid refresh failed: {e}")
+        finally:
+            self._centroid_refresh.release()
+    
+    def _classify_by_centroids(self, embeddings) -> List[Optional[Dict]]:
+        """
+        First-stage classification against the label centroids
+        
+        Args:
+            embeddings: Query embeddings, shape (n, dim)
         
-        # Search Endee for similar tickets
-        results = self.endee.search(
-            index_name="support_tickets",
-            query_vector=embedding.tolist(),
-            top_k=top_k
+        Returns:
+            One classification per embedding, or None where the category
+            margin is below CENTROID_MARGIN (or the prefilter is off)
+        """
+        if not self.centroid_prefilter:
+            return [None] * len(embeddings)
+        
+        with STAGE_SECONDS.time("centroid"):
+            output = self._centroid_votes(embeddings, self.centroid_margin)
+        answered = sum(1 for classification in output if classification is not None)
+        CENTROID_ROUTES.inc("centroid", amount=answered)
+        CENTROID_ROUTES.inc("search", amount=len(output) - answered)
+        return output
+    
+    def _centroid_votes(self, embeddings, margin: Optional[float] = None) -> List[Optional[Dict]]:
+        """
+        Vote over the category centroids
+        
+        Args:
+            embeddings: Query embeddings, shape (n, dim)
+            margin: Minimum score gap between the two best categories
+                (None accepts every vote, as long as any centroid exists)
+        
+        Returns:
+            One classification per embedding, or None where it is too close to call
+        """
+        self._refresh_centroids()
+        centroids = self.centroids
+        labels, scores = centroids.scores("category", embeddings)
+        if not labels or (margin is not None and len(labels) < 2):
+            return [None] * len(embeddings)
+        priority_labels, priority_scores = centroids.scores("priority", embeddings)
+        
+        if margin is not None:
+            top_two = np.partition(scores, -2, axis=1)[:, -2:]
+            confident = top_two[:, 1] - top_two[:, 0] >= margin
+        else:
+            confident = np.ones(len(scores), dtype=bool)
+        
+        output = []
+        for row, accepted, priority_row in zip(scores, confident, priority_scores):
+            if not accepted:
+                output.append(None)
+                continue
+            weights = vote_weights(row, "softmax", self.vote_temperature)
+            category, confidence, _ = weighted_vote(labels, weights)
+            output.append({
+                "category": category,
+                "priority": priority_labels[int(np.argmax(priority_row))],
+                "confidence": round(confidence, 3),
+                "routing_team": self.routing_map.get(category, "General Support"),
+                "similar_tickets": []
+            })
+        return output
+    
+    def _classify_degraded(self, embeddings, top_k: int) -> List[Dict]:
+        """
+        Classify without Endee, from the DEGRADED_FALLBACK source
+        
+        Results are flagged "degraded" and never cached, so normal answers
+        resume as soon as Endee is back.
+        
+        Args:
+            embeddings: Query embeddings, shape (n, dim)
+            top_k: Neighbours to vote over (local replica only)
+        
+        Returns:
+            One classification per embedding ("Unclassified" if the fallback has nothing)
+        """
+        if self.replica is not None:
+            output = [
+                self._build_result(results)
+                for results in self.replica.search_batch("support_tickets", embeddings, top_k)
+            ]
+        elif self.degraded_fallback == "centroids":
+            output = [
+                classification or self._build_result([])
+                for classification in self._centroid_votes(embeddings)
+            ]
+        else:
+            output = [self._build_result([]) for _ in embeddings]
+        
+        DEGRADED_RESPONSES.inc(self.degraded_fallback, amount=len(output))
+        for classification in output:
+            classification["degraded"] = True
+        return output
+    
+    async def _aclassify_degraded(self, embeddings, top_k: int) -> List[Dict]:
+        """_classify_degraded for the event loop: replica scans run in a worker thread"""
+        if self.replica is not None:
+            return await asyncio.to_thread(self._classify_degraded, embeddings, top_k)
+        return self._classify_degraded(embeddings, top_k)
+    
+    @property
+    def degraded(self) -> bool:
+        """Whether Endee requests are currently short-circuited"""
+        return self.breaker is not None and self.breaker.is_open
+    
+    def degraded_stats(self) -> Dict:
+        """Circuit breaker state and how many tickets were answered by the fallback"""
+        return {
+            "fallback": self.degraded_fallback,
+            "degraded_responses": int(DEGRADED_RESPONSES.value(self.degraded_fallback)),
+            **(self.breaker.stats() if self.breaker else {"state": "disabled"})
+        }
+    
+    def _centroid_batch(
+        self, pending: List[int], texts: List[str], embeddings, top_k: int, output: List[Dict], version
+    ) -> List[int]:
+        """Fill batch output for tickets the centroids settle; return positions still to search"""
+        remaining = []
+        for position, classification in enumerate(self._classify_by_centroids(embeddings)):
+            if classification is None:
+                remaining.append(position)
+                continue
+            self.result_cache.put(texts[position], top_k, classification, version)
+            output[pending[position]] = {"index": pending[position], "result": classification}
+        return remaining
+    
+    def centroid_stats(self) -> Dict:
+        """Prefilter settings, label counts and the share of tickets that skipped Endee"""
+        answered = CENTROID_ROUTES.value("centroid")
+        searched = CENTROID_ROUTES.value("search")
+        return {
+            "enabled": self.centroid_prefilter,
+            "margin": self.centroid_margin,
+            "answered_by_centroids": int(answered),
+            "sent_to_search": int(searched),
+            "skip_rate": round(answered / (answered + searched), 3) if answered + searched else 0.0,
+            "rebuilds": self.centroid_rebuilds,
+            **self.centroids.stats()
+        }
+    
+    def _first_k(self, top_k: int) -> int:
+        """Neighbours fetched by the first (cheap) search"""
+        if 0 < self.initial_k < top_k:
+            return self.initial_k
+        return top_k
+    
+    def _needs_wider_search(self, results: List[Dict], first_k: int, top_k: int) -> bool:
+        """Whether a first-pass result is too close a call to trust"""
+        if first_k >= top_k or len(results) < first_k:
+            return False  # already at top_k, or the index has no more neighbours
+        scores = np.fromiter((r['score'] for r in results), dtype=np.float64, count=len(results))
+        weights = vote_weights(scores, self.vote_weighting, self.vote_temperature)
+        _, _, margin = weighted_vote([r['metadata']['category'] for r in results], weights)
+        widen = margin < self.margin_threshold
+        ADAPTIVE_SEARCHES.inc("widened" if widen else "narrow")
+        return widen
+    
+    def _search_adaptive(self, search, embedding, top_k: int) -> List[Dict]:
+        """Search first_k neighbours, then top_k if the vote margin is small"""
+        first_k = self._first_k(top_k)
+        results = search(index_name="support_tickets", query_vector=embedding, top_k=first_k)
+        if self._needs_wider_search(results, first_k, top_k):
+            results = search(index_name="support_tickets", query_vector=embedding, top_k=top_k)
+        return results
+    
+    async def _asearch_adaptive(self, embedding, top_k: int) -> List[Dict]:
+        """Async version of _search_adaptive"""
+        first_k = self._first_k(top_k)
+        results = await self.aendee.search(index_name="support_tickets", query_vector=embedding, top_k=first_k)
+        if self._needs_wider_search(results, first_k, top_k):
+            results = await self.aendee.search(index_name="support_tickets", query_vector=embedding, top_k=top_k)
+        return results
+    
+    def _search_batch_adaptive(self, search_batch, embeddings, top_k: int) -> List[List[Dict]]:
+        """Batched _search_adaptive: one wide batch search for all close calls"""
+        first_k = self._first_k(top_k)
+        batch_results = search_batch("support_tickets", embeddings, first_k)
+        wide = [i for i, results in enumerate(batch_results) if self._needs_wider_search(results, first_k, top_k)]
+        if wide:
+            for i, results in zip(wide, search_batch("support_tickets", [embeddings[i] for i in wide], top_k)):
+                batch_results[i] = results
+        return batch_results
+    
+    def voting_stats(self) -> Dict:
+        """Voting settings and how often adaptive k had to widen"""
+        narrow = ADAPTIVE_SEARCHES.value("narrow")
+        widened = ADAPTIVE_SEARCHES.value("widened")
+        return {
+            "weighting": self.vote_weighting,
+            "temperature": self.vote_temperature,
+            "initial_k": self.initial_k,
+            "margin_threshold": self.margin_threshold,
+            "narrow_searches": int(narrow),
+            "widened_searches": int(widened),
+            "widen_rate": round(widened / (narrow + widened), 3) if narrow + widened else 0.0
+        }
+    
+    def _cached_batch(self, ticket_texts: List[str], top_k: int):
+        """Fill batch output from the result cache; return it and the indexes still to classify"""
+        output: List[Dict] = [None] * len(ticket_texts)
+        pending = []
+        for index, text in enumerate(ticket_texts):
+            cached = self.result_cache.get(text, top_k)
+            if cached is not None:
+                output[index] = {"index": index, "result": cached}
+            else:
+                pending.append(index)
+        return output, pending
+    
+    @staticmethod
+    def _batch_error(output: List[Dict], pending: List[int], positions: List[int], error: Exception) -> List[Dict]:
+        """Report a failed batch search as an error on every ticket it covered"""
+        for position in positions:
+            output[pending[position]] = {"index": pending[position], "error": str(error)}
+        return output
+    
+    def _finish(self, ticket_text: str, top_k: int, results: List[Dict], version) -> Dict:
+        """Build the classification and cache it unless the index changed since version (empty searches are not cached)"""
+        with STAGE_SECONDS.time("vote"):
+            classification = self._build_result(results)
+        if results:
+            self.result_cache.put(ticket_text, top_k, classification, version)
+        return classification
+    
+    def _embed_many(self, texts: List[str]):
+        """Embed texts, encoding only those missing from the cache"""
+        with STAGE_SECONDS.time("encode"):
+            return self.embedding_cache.get_or_encode(texts, self._encode_texts)
+    
+    def _encode_texts(self, texts: List[str]):
+        """Encode a batch of texts in one model call"""
+        return self.model.encode(
+            texts,
+            batch_size=min(len(texts), ENCODE_BATCH_SIZE),
+            normalize_embeddings=True
         )
+    
+    def _build_result(self, results: List[Dict]) -> Dict:
+        """
+        Turn Endee search results into a classification by voting
+        
+        Args:
+            results: Search results with scores and metadata
         
+        Returns:
+            Classification result with category, priority, confidence
+        """
         if not results:
             return {
                 "category": "Unclassified",
@@ -74,19 +659,11 @@ class TicketClassifier:
                 "similar_tickets": []
             }
         
-        # Extract categories and priorities
-        categories = [r['metadata']['category'] for r in results]
-        priorities = [r['metadata']['priority'] for r in results]
-        
-        # Vote for most common category/priority
-        category_counts = Counter(categories)
-        priority_counts = Counter(priorities)
-        
-        predicted_category = category_counts.most_common(1)[0][0]
-        predicted_priority = priority_counts.most_common(1)[0][0]
-        
-        # Calculate confidence (average similarity)
-        avg_similarity = sum(r['score'] for r in results) / len(results)
+        # Similarity-weighted vote; confidence is the winner's share of the weight
+        scores = np.fromiter((r['score'] for r in results), dtype=np.float64, count=len(results))
+        weights = vote_weights(scores, self.vote_weighting, self.vote_temperature)
+        predicted_category, confidence, _ = weighted_vote([r['metadata']['category'] for r in results], weights)
+        predicted_priority, _, _ = weighted_vote([r['metadata']['priority'] for r in results], weights)
         
         # Get routing team
         routing_team = self.routing_map.get(predicted_category, "General Support")
@@ -105,11 +682,65 @@ class TicketClassifier:
         return {
             "category": predicted_category,
             "priority": predicted_priority,
-            "confidence": round(avg_similarity, 3),
+            "confidence": round(confidence, 3),
             "routing_team": routing_team,
             "similar_tickets": similar_tickets
         }
     
+    async def warm_up(self, queries: int = 3) -> Dict[str, float]:
+        """
+        Run dummy encodes and searches so the first real requests are fast
+        
+        The encoder runs once per batch shape the API uses (a single
+        micro-batched ticket and a full encode batch), and `queries`
+        concurrent searches open that many pooled Endee connections.
+        Nothing is written to the embedding or result caches.
+        
+        Args:
+            queries: Dummy tickets to encode and search
+        
+        Returns:
+            Seconds spent per warm-up phase
+        """
+        texts = [f"Warm-up ticket {i}: I cannot log in and the reset link fails" for i in range(max(queries, 1))]
+        timings = {}
+        
+        started = time.perf_counter()
+        embeddings = [await self.batcher.encode(text) for text in texts]
+        await asyncio.get_running_loop().run_in_executor(
+            self._encode_executor, self._encode_texts, (texts * ENCODE_BATCH_SIZE)[:ENCODE_BATCH_SIZE]
+        )
+        timings["warmup_encode"] = time.perf_counter() - started
+        
+        # Endee being down doesn't fail startup; requests fall back to degraded mode
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            self.aendee.search(index_name="support_tickets", query_vector=embedding, top_k=5)
+            for embedding in embeddings
+        ), return_exceptions=True)
+        timings["warmup_search"] = time.perf_counter() - started
+        
+        # Load the replica (and build its compressed vectors) now, not on
+        # the first request that arrives while Endee is down
+        if self.replica is not None:
+            started = time.perf_counter()
+            await asyncio.to_thread(self.replica.search_batch, "support_tickets", embeddings[:1], 1)
+            timings["warmup_replica"] = time.perf_counter() - started
+        return timings
+    
+    async def aclose(self):
+        """Release Endee connections and the encoder pool"""
+        await self.batcher.stop()
+        await self.aendee.aclose()
+        self.endee.close()
+        if self.replica is not None:
+            self.replica.close()
+        self._encode_executor.shutdown(wait=False)
+        if self._cache_io_executor is not None:
+            self._cache_io_executor.shutdown(wait=True)
+        self.embedding_cache.close()
+        self.metadata.close()
+    
     def get_categories(self) -> List[str]:
         """Get list of available categories"""
         return list(self.routing_map.keys())
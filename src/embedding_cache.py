@@ -0,0 +1,291 @@
+"""
+Embedding Cache
+Content-hash keyed cache of ticket embeddings, shared by the classifier
+and the indexer. An in-process LRU tier sits in front of an optional
+SQLite tier on disk.
+"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+# Keys per SQLite IN (...) query (older SQLite builds cap bound parameters at 999)
+SQLITE_MAX_PARAMS = 900
+
+
+def normalize_text(text: str) -> str:
+    """Normalize ticket text so trivially different copies share a cache entry"""
+    return " ".join(text.lower().split())
+
+
+# Files that determine what an encoder outputs (weights, configs, tokenizer)
+MODEL_FILE_SUFFIXES = (".json", ".safetensors", ".bin", ".onnx", ".txt", ".model")
+# Alternative exports inside a sentence-transformers directory the torch backend never reads
+IGNORED_MODEL_DIRS = {"onnx", "openvino", ".git"}
+
+
+def _model_files(model_name: str) -> List[str]:
+    """Files on disk behind a load_encoder model name (none for a Hugging Face hub name)"""
+    if model_name.startswith("onnx:"):
+        model_file = model_name[len("onnx:"):]
+        model_dir = os.path.dirname(model_file)
+        return [model_file] + sorted(
+            os.path.join(model_dir, name) for name in os.listdir(model_dir) if name.endswith(".json")
+        )
+    if not os.path.isdir(model_name):
+        return []
+    files = []
+    for root, dirs, names in os.walk(model_name):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_MODEL_DIRS)
+        files += [os.path.join(root, name) for name in sorted(names) if name.endswith(MODEL_FILE_SUFFIXES)]
+    return files
+
+
+def model_identity(model_name: str, model) -> str:
+    """
+    Identity string for an encoder, used to scope cache entries
+    
+    Local models are identified by a hash of their weight, config and
+    tokenizer files, so re-exporting or fine-tuning a model in place
+    never serves embeddings from the old weights. Hub models are
+    identified by name.
+    
+    Args:
+        model_name: Name returned by load_encoder (directory, "onnx:<file>" or hub name)
+        model: The loaded encoder
+    
+    Returns:
+        "<name>@<dimension>", plus "#<content hash>" for local models
+    """
+    identity = f"{model_name}@{model.get_sentence_embedding_dimension()}"
+    files = _model_files(model_name)
+    if not files:
+        return identity
+    root = os.path.commonpath(files)
+    digest = hashlib.blake2b(digest_size=8)
+    for file_path in files:
+        digest.update(os.path.relpath(file_path, root).encode())
+        digest.update(b"\0")
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return f"{identity}#{digest.hexdigest()}"
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + optional SQLite) embedding cache"""
+    
+    def __init__(
+        self,
+        model_id: str,
+        max_entries: Optional[int] = None,
+        path: Optional[str] = None
+    ):
+        """
+        Initialize cache
+        
+        Args:
+            model_id: Identity of the encoder; part of every key so a model
+                swap never returns stale vectors
+            max_entries: In-memory LRU size (default: EMBED_CACHE_SIZE or 10000)
+            path: SQLite file for the disk tier (default: EMBED_CACHE_PATH, disabled if empty)
+        """
+        self.model_id = model_id
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("EMBED_CACHE_SIZE", "10000"))
+        self.path = path if path is not None else os.getenv("EMBED_CACHE_PATH", "")
+        
+        self._lru: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()  # LRU only; never held across disk I/O
+        self._db_lock = threading.Lock()
+        self._db = None
+        if self.path:
+            self._open_db()
+        
+        # Stats
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def _open_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        # Keys hash in the model identity, so processes running different
+        # models can share one file without ever reading each other's vectors
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB)")
+        self._db.commit()
+    
+    @property
+    def has_disk_tier(self) -> bool:
+        """Whether lookups can hit SQLite (and so may block on disk I/O)"""
+        return self._db is not None
+    
+    def key(self, text: str) -> bytes:
+        """Cache key for a ticket text under the current model"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.model_id.encode())
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode())
+        return digest.digest()
+    
+    def get(self, text: str, memory_only: bool = False) -> Optional[np.ndarray]:
+        """
+        Look up one embedding
+        
+        Args:
+            text: Ticket text
+            memory_only: Check only the in-memory LRU (never blocks on disk)
+        
+        Returns:
+            Cached embedding, or None on a miss
+        """
+        return self.get_many([text], memory_only)[0]
+    
+    def get_many(self, texts: List[str], memory_only: bool = False) -> List[Optional[np.ndarray]]:
+        """
+        Look up many embeddings (one disk query for all memory misses)
+        
+        Args:
+            texts: Ticket texts
+            memory_only: Check only the in-memory LRU; memory misses are not
+                counted as misses while a disk tier could still answer them
+        
+        Returns:
+            Cached embedding or None for each text, in order
+        """
+        keys = [self.key(text) for text in texts]
+        found: List[Optional[np.ndarray]] = [None] * len(texts)
+        disk_lookup = {}
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[i] = vector
+                    self.memory_hits += 1
+                else:
+                    disk_lookup.setdefault(key, []).append(i)
+        
+        if disk_lookup and self._db is not None:
+            if memory_only:
+                return found
+            rows = []
+            lookup_keys = list(disk_lookup)
+            with self._db_lock:
+                for start in range(0, len(lookup_keys), SQLITE_MAX_PARAMS):
+                    batch = lookup_keys[start:start + SQLITE_MAX_PARAMS]
+                    placeholders = ",".join("?" * len(batch))
+                    rows += self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        batch
+                    ).fetchall()
+            with self._lock:
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, vector)
+                    for i in disk_lookup.pop(key):
+                        found[i] = vector
+                        self.disk_hits += 1
+        
+        with self._lock:
+            self.misses += sum(len(indexes) for indexes in disk_lookup.values())
+        
+        return found
+    
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """
+        Store embeddings in both tiers
+        
+        Args:
+            texts: Ticket texts
+            vectors: Matching (n, dim) embeddings
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        keys = [self.key(text) for text in texts]
+        
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector.copy())
+        
+        if self._db is not None:
+            with self._db_lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in zip(keys, vectors)]
+                )
+                self._db.commit()
+    
+    def put(self, text: str, vector: np.ndarray):
+        """Store one embedding in both tiers"""
+        self.put_many([text], np.asarray(vector).reshape(1, -1))
+    
+    def get_or_encode(
+        self,
+        texts: List[str],
+        encode_fn: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Return embeddings for texts, encoding only the cache misses
+        
+        Args:
+            texts: Ticket texts
+            encode_fn: Encodes a list of texts into a (n, dim) array
+        
+        Returns:
+            (n, dim) float32 embedding matrix in input order
+        """
+        cached = self.get_many(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        
+        if missing:
+            # Encode each distinct missing text once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = np.asarray(encode_fn(unique_texts), dtype=np.float32)
+            self.put_many(unique_texts, encoded)
+            by_text = dict(zip(unique_texts, encoded))
+            for i in missing:
+                cached[i] = by_text[texts[i]]
+        
+        return np.stack(cached) if cached else np.empty((0, 0), dtype=np.float32)
+    
+    def _remember(self, key: bytes, vector: np.ndarray):
+        if self.max_entries <= 0:
+            return
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+    
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dict with entry counts, per-tier hits, misses and hit rate
+        """
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        stats = {
+            "model_id": self.model_id,
+            "memory_entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+        }
+        if self._db is not None:
+            with self._db_lock:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return stats
+    
+    def close(self):
+        """Close the disk tier"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,259 @@
+"""
+Encoder Backends
+Loads the MiniLM sentence encoder with either PyTorch (sentence-transformers)
+or ONNX Runtime (fp32 or dynamically quantized int8)
+
+Both backends expose the SentenceTransformer subset the project uses:
+encode(texts, batch_size=..., normalize_embeddings=...) and
+get_sentence_embedding_dimension(). Heavy imports (torch,
+sentence-transformers, onnxruntime) happen only when that backend is used.
+"""
+
+import os
+from typing import Dict, List, Tuple, Union
+import numpy as np
+
+HF_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+DEFAULT_MODEL_PATH = './dataset/minilm_model'
+DEFAULT_ONNX_PATH = './dataset/minilm_onnx'
+
+# all-MiniLM-L6-v2 truncates inputs at 256 word pieces
+MAX_SEQ_LENGTH = 256
+
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model_int8.onnx"
+
+# Encoders loaded by preload_encoder, keyed by (backend, model path)
+_PRELOADED: Dict[Tuple[str, str], Tuple[object, str]] = {}
+
+
+class OnnxEncoder:
+    """MiniLM encoder running on ONNX Runtime with sentence-transformers pooling"""
+    
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = 0):
+        """
+        Load an exported model
+        
+        Args:
+            model_dir: Directory written by export_onnx (model + tokenizer.json)
+            quantized: Use the int8 model instead of fp32
+            threads: Intra-op threads (0 lets ONNX Runtime decide)
+        """
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "ENCODER_BACKEND=onnx needs onnxruntime and tokenizers: "
+                "pip install onnxruntime tokenizers"
+            ) from e
+        
+        model_file = os.path.join(model_dir, ONNX_INT8_FILE if quantized else ONNX_FILE)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(
+                f"{model_file} not found. Export it with: "
+                f"python download_model.py --onnx{' --quantize' if quantized else ''}"
+            )
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.model_file = model_file
+        
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        
+        self._dimension = self.session.get_outputs()[0].shape[-1]
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+    
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Embed text(s) with mean pooling, like SentenceTransformer.encode
+        
+        Args:
+            sentences: One text or a list of texts
+            batch_size: Texts per ONNX Runtime call
+            normalize_embeddings: L2-normalize the output
+        
+        Returns:
+            (dim,) array for a single text, else (n, dim) float32 array
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, self._dimension), dtype=np.float32)
+        
+        # Sort by length so each batch pads as little as possible
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        output = np.empty((len(texts), self._dimension), dtype=np.float32)
+        
+        for start in range(0, len(texts), batch_size):
+            batch_positions = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch_positions])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            
+            token_embeddings = self.session.run(None, feeds)[0]
+            
+            # Mean pooling over real (non-padding) tokens
+            mask = attention_mask[..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            output[batch_positions] = summed / np.maximum(mask.sum(axis=1), 1e-9)
+        
+        if normalize_embeddings:
+            output /= np.maximum(np.linalg.norm(output, axis=1, keepdims=True), 1e-12)
+        
+        return output[0] if single else output
+
+
+def load_encoder(model_path: str = DEFAULT_MODEL_PATH, backend: str = None) -> Tuple[object, str]:
+    """
+    Load the configured encoder backend
+    
+    Args:
+        model_path: Local sentence-transformers directory (torch backend)
+        backend: "torch", "onnx" or "onnx-int8" (default: ENCODER_BACKEND or torch)
+    
+    Returns:
+        (encoder, model name) - the name identifies the exact weights/backend
+    """
+    backend = (backend or os.getenv("ENCODER_BACKEND", "torch")).lower()
+    
+    preloaded = _PRELOADED.get((backend, model_path))
+    if preloaded is not None:
+        print(f"  ✓ Using preloaded model ({preloaded[1]})")
+        return preloaded
+    
+    if backend in ("onnx", "onnx-int8"):
+        onnx_path = os.getenv("ONNX_MODEL_PATH", DEFAULT_ONNX_PATH)
+        encoder = OnnxEncoder(
+            onnx_path,
+            quantized=backend == "onnx-int8",
+            threads=int(os.getenv("ONNX_THREADS", "0"))
+        )
+        print(f"  ✓ Loaded ONNX model from {encoder.model_file}")
+        return encoder, f"onnx:{encoder.model_file}"
+    
+    if backend != "torch":
+        raise ValueError(f"Unknown ENCODER_BACKEND '{backend}' (expected torch, onnx or onnx-int8)")
+    
+    from sentence_transformers import SentenceTransformer
+    
+    if os.path.exists(model_path):
+        model = SentenceTransformer(model_path)
+        print(f"  ✓ Loaded model from {model_path}")
+        return model, model_path
+    
+    print(f"  ⚠️  Loading from Hugging Face...")
+    model = SentenceTransformer(HF_MODEL_NAME)
+    print(f"  ✓ Model loaded")
+    return model, HF_MODEL_NAME
+
+
+def preload_encoder(model_path: str = DEFAULT_MODEL_PATH, backend: str = None) -> bool:
+    """
+    Load the encoder once so that forked workers share its weights
+    
+    Later load_encoder calls with the same arguments (in this process or in
+    children forked from it) return the preloaded instance. Only the torch
+    backend is preloaded: ONNX Runtime sessions are not fork-safe, so each
+    worker creates its own.
+    
+    Args:
+        model_path: Local sentence-transformers directory
+        backend: Encoder backend (default: ENCODER_BACKEND or torch)
+    
+    Returns:
+        True if the encoder was preloaded
+    """
+    backend = (backend or os.getenv("ENCODER_BACKEND", "torch")).lower()
+    if backend != "torch":
+        return False
+    _PRELOADED[(backend, model_path)] = load_encoder(model_path, backend)
+    return True
+
+
+def export_onnx(model_path: str, output_dir: str = DEFAULT_ONNX_PATH, quantize: bool = False) -> str:
+    """
+    Export a sentence-transformers MiniLM directory to ONNX
+    
+    Writes model.onnx (token embeddings; pooling happens in OnnxEncoder)
+    and tokenizer.json, plus model_int8.onnx when quantize is set.
+    
+    Args:
+        model_path: Local model directory or Hugging Face name
+        output_dir: Where to write the ONNX files
+        quantize: Also write a dynamically int8-quantized model
+    
+    Returns:
+        Path of the exported fp32 model
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModel.from_pretrained(model_path).eval()
+    tokenizer.save_pretrained(output_dir)
+    
+    sample = tokenizer(["export sample", "a second, longer export sample"], padding=True, return_tensors="pt")
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+    
+    onnx_file = os.path.join(output_dir, ONNX_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            onnx_file,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            do_constant_folding=True
+        )
+    
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(onnx_file, os.path.join(output_dir, ONNX_INT8_FILE), weight_type=QuantType.QInt8)
+    
+    return onnx_file
+
+
+def check_parity(reference, candidate, texts: List[str]) -> Dict:
+    """
+    Compare two encoders' normalized embeddings on the same texts
+    
+    Args:
+        reference: Encoder treated as ground truth (usually torch)
+        candidate: Encoder under test (usually ONNX)
+        texts: Sample texts
+    
+    Returns:
+        Dict with min/mean cosine similarity and max absolute difference
+    """
+    expected = reference.encode(texts, normalize_embeddings=True)
+    actual = candidate.encode(texts, normalize_embeddings=True)
+    cosine = np.sum(expected * actual, axis=1)
+    return {
+        "texts": len(texts),
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "max_abs_diff": float(np.abs(expected - actual).max())
+    }
@@ -4,18 +4,138 @@ Handles all interactions with Endee vector database via HTTP
 """
 
 import os
+import json
+import time
+import asyncio
+import threading
+import weakref
+import functools
+import urllib.parse
 import requests
-from typing import List, Dict, Optional
+import httpx
+import msgpack
+import numpy as np
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional
 from dotenv import load_dotenv
+from src.metadata_store import MetadataStore, DEFAULT_CATEGORY, DEFAULT_PRIORITY, vector_ids
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.metrics import ENDEE_REQUEST_SECONDS, ENDEE_RESPONSES, INSERT_BATCH_SIZE, STAGE_SECONDS
 
 load_dotenv()
 
+# HTTP statuses worth retrying (Endee overloaded / restarting)
+RETRY_STATUSES = {429, 502, 503, 504}
 
-class EndeeClient:
-    """Client for interacting with Endee vector database via HTTP API"""
+
+def _unavailable_status(status_code: int) -> bool:
+    """Whether a status means Endee can't serve (overload or any 5xx): a breaker failure, not an answer"""
+    return status_code in RETRY_STATUSES or status_code >= 500
+
+# Statuses meaning Endee rejected a msgpack body (the request is resent as JSON)
+WIRE_FORMAT_REJECTED = {400, 415, 422}
+
+# Vector delete statuses that leave the id gone (404: it already was)
+DELETED_STATUSES = {200, 404}
+
+# Endpoints whose latency feeds the circuit breaker (inserts are slow by design)
+LATENCY_TRACKED_ENDPOINTS = {"search"}
+
+# Default per-endpoint timeouts in seconds (overridable via env)
+DEFAULT_TIMEOUTS = {
+    "create": 10.0,
+    "insert": 30.0,
+    "search": 10.0,
+    "stats": 10.0,
+    "delete": 10.0,
+    "delete_vector": 10.0,
+}
+
+
+class EndeeUnavailable(Exception):
+    """Endee could not answer: circuit open, connection failure, timeout, 5xx, or 429 after retries"""
+
+
+class EndeeSearchError(Exception):
+    """Endee answered a search, but with a client error or a body that can't be decoded"""
+
+
+def _msgpack_default(obj):
+    """msgpack hook: NumPy vectors go out as packed little-endian float32 bytes"""
+    if isinstance(obj, np.ndarray):
+        return np.ascontiguousarray(obj, dtype="<f4").tobytes()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def _json_default(obj):
+    """JSON hook: NumPy vectors go out as float lists (fallback wire format)"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+# Response decoders by media type, resolved once at import
+_unpack_msgpack = functools.partial(msgpack.unpackb, raw=False)
+RESPONSE_DECODERS = {
+    "application/msgpack": _unpack_msgpack,
+    "application/x-msgpack": _unpack_msgpack,
+    "application/vnd.msgpack": _unpack_msgpack,
+    "application/octet-stream": _unpack_msgpack,
+    "application/json": json.loads,
+}
+
+# First byte of a msgpack map (fixmap, map 16, map 32); JSON bodies start with ASCII
+MSGPACK_MAP_PREFIXES = frozenset(range(0x80, 0x90)) | {0xde, 0xdf}
+
+
+def _sniff_decoder(body: bytes):
+    """Decoder for a body with a missing or unrecognized Content-Type: msgpack maps by their first byte, else JSON"""
+    if body[:1] and body[0] in MSGPACK_MAP_PREFIXES:
+        return _unpack_msgpack
+    return json.loads
+
+
+def _decode_vector(vector) -> np.ndarray:
+    """Returned vector as float32: zero-copy view over msgpack bin, else one array conversion"""
+    if isinstance(vector, (bytes, bytearray, memoryview)):
+        return np.frombuffer(vector, dtype="<f4")
+    return np.asarray(vector, dtype=np.float32)
+
+
+def _endpoint_setting(setting: str, endpoint: str, default: float) -> float:
+    """
+    Read a per-endpoint setting from the environment
+    
+    Looks up ENDEE_<ENDPOINT>_<SETTING> first (e.g. ENDEE_SEARCH_TIMEOUT),
+    then the global ENDEE_<SETTING>, then falls back to the default.
+    """
+    value = os.getenv(f"ENDEE_{endpoint.upper()}_{setting.upper()}")
+    if value is None:
+        value = os.getenv(f"ENDEE_{setting.upper()}")
+    return float(value) if value not in (None, "") else default
+
+
+class _EndeeClientBase:
+    """Configuration and payload handling shared by the sync and async clients"""
     
-    def __init__(self):
-        """Initialize Endee HTTP client"""
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        metadata_store: Optional[MetadataStore] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Read connection settings from the environment
+        
+        Args:
+            pool_size: Max keep-alive connections to Endee (default: ENDEE_POOL_SIZE or 10)
+            metadata_store: Sidecar store for ticket metadata (default: opened from METADATA_STORE_PATH)
+            breaker: Circuit breaker to share with another client (default: a new one from ENDEE_BREAKER_*)
+        """
+        # Endee only keeps vectors; metadata lives in a local sidecar store
+        self.metadata = metadata_store or MetadataStore()
+        
         self.base_url = os.getenv("ENDEE_HOST", "http://localhost:8080")
         self.api_key = os.getenv("ENDEE_API_KEY", None)
         
@@ -24,10 +144,319 @@ class EndeeClient:
         if self.api_key:
             self.headers["Authorization"] = self.api_key
         
-        print(f"  ✓ Endee HTTP client initialized ({self.base_url})")
+        # Per-endpoint timeouts and retries
+        self.connect_timeout = float(os.getenv("ENDEE_CONNECT_TIMEOUT", "3.05"))
+        self.timeouts = {
+            endpoint: _endpoint_setting("timeout", endpoint, default)
+            for endpoint, default in DEFAULT_TIMEOUTS.items()
+        }
+        self.retries = {
+            endpoint: int(_endpoint_setting("retries", endpoint, 2))
+            for endpoint in DEFAULT_TIMEOUTS
+        }
+        self.retry_backoff = float(os.getenv("ENDEE_RETRY_BACKOFF", "0.2"))
+        self.pool_size = pool_size or int(os.getenv("ENDEE_POOL_SIZE", "10"))
+        
+        # Vector wire format: packed float32 in msgpack, or JSON float lists
+        self.wire_format = os.getenv("ENDEE_WIRE_FORMAT", "msgpack").lower()
+        
+        # Fail fast while Endee is down instead of waiting out every timeout
+        self.breaker = breaker or CircuitBreaker()
+        
+        self._stats_lock = threading.Lock()
+        self._retry_count = 0
+        
+        # Bumped on every successful index mutation (used to invalidate caches)
+        self.index_version = 0
+        
+        # Called as listener(index_name, ids, vectors, metadatas, previous) after
+        # each successful insert, and with vectors/metadatas None after a delete;
+        # previous holds the metadata the ids had before (None for new ids)
+        self.change_listeners: List[Callable] = []
+    
+    def _commit_insert(self, index_name: str, item_ids: List[str], vectors, metadatas: List[Dict]):
+        """Record a successful insert: sidecar metadata, cache version, listeners"""
+        previous = self.metadata.lookup(item_ids) if self.change_listeners else None
+        self.metadata.put_many(item_ids, metadatas, index_name)
+        self.index_version += 1
+        for listener in self.change_listeners:
+            listener(index_name, item_ids, vectors, metadatas, previous)
+    
+    def _commit_delete(self, index_name: str, deleted_ids: List[str]):
+        """Record successful deletes: sidecar tombstones, cache version, listeners"""
+        if not deleted_ids:
+            return
+        previous = self.metadata.lookup(deleted_ids) if self.change_listeners else None
+        self.metadata.delete_many(deleted_ids)
+        self.index_version += 1
+        for listener in self.change_listeners:
+            listener(index_name, deleted_ids, None, None, previous)
+    
+    @staticmethod
+    def _delete_vector_path(index_name: str, vector_id: str) -> str:
+        # Endee has no multi-id delete; each id is its own DELETE request
+        return f"/api/v1/index/{index_name}/vector/{urllib.parse.quote(vector_id, safe='')}/delete"
+    
+    def _check_circuit(self, endpoint: str):
+        if not self.breaker.allow():
+            ENDEE_RESPONSES.inc(endpoint, "circuit_open")
+            raise CircuitOpenError(f"Endee circuit is open; {endpoint} request not sent")
+    
+    def _record_response(self, endpoint: str, status_code: int, seconds: float):
+        """Count an HTTP response and report it to the circuit breaker"""
+        ENDEE_REQUEST_SECONDS.observe(seconds, endpoint)
+        ENDEE_RESPONSES.inc(endpoint, str(status_code))
+        if _unavailable_status(status_code):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success(seconds if endpoint in LATENCY_TRACKED_ENDPOINTS else 0.0)
+    
+    @staticmethod
+    def _raise_if_unavailable(status_code: int):
+        if _unavailable_status(status_code):
+            raise EndeeUnavailable(f"Endee answered {status_code}")
+    
+    def _count_retry(self):
+        with self._stats_lock:
+            self._retry_count += 1
+    
+    @staticmethod
+    def _create_payload(index_name: str, dimension: int, metric: str) -> Dict:
+        # Convert metric to Endee's space_type
+        space_type_map = {
+            "cosine": "cosine",
+            "euclidean": "l2",
+            "dot": "ip"  # inner product
+        }
+        space_type = space_type_map.get(metric, "cosine")
+        
+        # Endee API format from source code
+        return {
+            "index_name": index_name,
+            "dim": dimension,
+            "space_type": space_type
+        }
+    
+    @staticmethod
+    def _handle_create_response(index_name: str, payload: Dict, status_code: int, text: str) -> bool:
+        if status_code == 200:
+            print(f"✅ Created index '{index_name}' (dim: {payload['dim']}, space_type: {payload['space_type']})")
+            return True
+        elif "already exists" in text.lower() or status_code == 409:
+            print(f"ℹ️  Index '{index_name}' already exists")
+            return True
+        else:
+            print(f"❌ Error creating index ({status_code}): {text}")
+            return False
+    
+    @staticmethod
+    def _insert_items(vectors, item_ids: List[str]) -> List[Dict]:
+        # Build items array in Endee format
+        # From source: expects array of {id, vector, sparse_indices, sparse_values}
+        # Endee doesn't store metadata with vectors; it goes to the sidecar store
+        # Rows stay NumPy views; they are packed straight into the request body
+        matrix = np.asarray(vectors, dtype="<f4")
+        return [
+            {"id": vector_id, "vector": matrix[i]}
+            for i, vector_id in enumerate(item_ids)
+        ]
+    
+    @staticmethod
+    def _search_payload(query_vector, top_k: int, filters: Optional[Dict], include_vectors: bool = False) -> Dict:
+        # Endee API format (from source code line 650: expects "k" and "vector")
+        payload = {
+            "vector": np.asarray(query_vector, dtype="<f4"),
+            "k": top_k,
+            "include_vectors": include_vectors
+        }
+        
+        if filters:
+            payload["filter"] = filters  # TODO: Convert to Endee filter format if needed
+        return payload
+    
+    @staticmethod
+    def _encode_body(payload, wire_format: str):
+        """Serialize a payload holding NumPy vectors; returns (body, content type)"""
+        if wire_format == "msgpack":
+            return msgpack.packb(payload, default=_msgpack_default, use_bin_type=True), "application/msgpack"
+        return json.dumps(payload, default=_json_default, separators=(",", ":")).encode(), "application/json"
+    
+    def _wire_format_fallback(self, response_status: int) -> bool:
+        """Whether a msgpack request should be resent as JSON"""
+        return self.wire_format == "msgpack" and response_status in WIRE_FORMAT_REJECTED
+    
+    def _use_json_wire_format(self):
+        if self.wire_format != "json":
+            self.wire_format = "json"
+            print("ℹ️  Endee rejected msgpack vectors; using JSON from now on")
+    
+    @staticmethod
+    def _decode_response(response):
+        """
+        Decode an Endee response body according to its Content-Type
+        
+        Bodies with a missing or unknown Content-Type (e.g. text/plain
+        from an older server or a proxy) are sniffed instead.
+        
+        Raises:
+            ValueError: Malformed body
+        """
+        media_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        decoder = RESPONSE_DECODERS.get(media_type) or _sniff_decoder(response.content)
+        return decoder(response.content)
+    
+    def _parse_search_results(self, data: Dict) -> List[Dict]:
+        # Convert Endee format to our expected format
+        # Endee returns: {results: [{id, distance, vector?, ...}]}
+        items = data.get("results", [])
+        
+        # One batched sidecar lookup for all hits
+        with STAGE_SECONDS.time("metadata"):
+            metadatas = self.metadata.lookup([str(item.get("id", "")) for item in items])
+        
+        results = []
+        for item, metadata in zip(items, metadatas):
+            # Convert distance to similarity score (closer to 1 is more similar for cosine)
+            # For cosine: similarity = 1 - distance
+            distance = item.get("distance", 1.0)
+            score = 1.0 - distance if distance < 1.0 else 0.0
+            
+            if metadata is None:
+                metadata = {
+                    "text": f"Similar ticket (id: {item.get('id', 'unknown')})",
+                    "category": DEFAULT_CATEGORY,
+                    "priority": DEFAULT_PRIORITY
+                }
+            
+            result = {
+                "id": item.get("id"),
+                "score": score,
+                "metadata": metadata
+            }
+            if item.get("vector") is not None:
+                result["vector"] = _decode_vector(item["vector"])
+            results.append(result)
+        return results
+
+
+class EndeeClient(_EndeeClientBase):
+    """Client for interacting with Endee vector database via HTTP API"""
+    
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        metadata_store: Optional[MetadataStore] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Initialize Endee HTTP client
+        
+        Args:
+            pool_size: Max keep-alive connections to Endee (default: ENDEE_POOL_SIZE or 10)
+            metadata_store: Sidecar store for ticket metadata (default: opened from METADATA_STORE_PATH)
+            breaker: Circuit breaker to share with another client (default: a new one)
+        """
+        super().__init__(pool_size, metadata_store, breaker)
+        
+        # Pooled keep-alive session (one TCP connection reused across requests)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.headers["Connection"] = "keep-alive"
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.pool_size,
+            pool_block=os.getenv("ENDEE_POOL_BLOCK", "false").lower() == "true",
+            max_retries=0  # retries are handled per endpoint in _request
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._adapter = adapter
+        
+        print(f"  ✓ Endee HTTP client initialized ({self.base_url}, pool size: {self.pool_size})")
+    
+    def _request(self, endpoint: str, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session with endpoint timeout and retries
+        
+        Args:
+            endpoint: Endpoint key (create, insert, search, stats, delete, delete_vector)
+            method: HTTP method
+            path: URL path below the Endee host
+            **kwargs: Passed through to requests.Session.request
+        
+        Returns:
+            The final response (after retries)
+        
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+        """
+        timeout = (self.connect_timeout, self.timeouts[endpoint])
+        retries = self.retries[endpoint]
+        url = f"{self.base_url}{path}"
+        
+        for attempt in range(retries + 1):
+            self._check_circuit(endpoint)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                ENDEE_RESPONSES.inc(endpoint, "error")
+                self.breaker.record_failure()
+                if attempt == retries:
+                    raise
+            else:
+                self._record_response(endpoint, response.status_code, time.perf_counter() - started)
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+            
+            self._count_retry()
+            time.sleep(self.retry_backoff * (2 ** attempt))
+    
+    def _send_vectors(self, endpoint: str, path: str, payload) -> requests.Response:
+        """POST a vector-carrying payload in the configured wire format (JSON fallback)"""
+        body, content_type = self._encode_body(payload, self.wire_format)
+        response = self._request(endpoint, "POST", path, data=body, headers={"Content-Type": content_type})
+        
+        if self._wire_format_fallback(response.status_code):
+            body, content_type = self._encode_body(payload, "json")
+            response = self._request(endpoint, "POST", path, data=body, headers={"Content-Type": content_type})
+            if response.status_code == 200:
+                self._use_json_wire_format()
+        return response
+    
+    def pool_stats(self) -> Dict:
+        """
+        Get connection pool counters
+        
+        A "hit" is a request served on an already-open keep-alive connection,
+        a "miss" is a request that had to open a new TCP connection.
+        
+        Returns:
+            Dict with pool size, request, hit/miss and retry counts
+        """
+        pools = self._adapter.poolmanager.pools
+        total_requests = 0
+        total_connections = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                total_requests += pool.num_requests
+                total_connections += pool.num_connections
+        
+        return {
+            "pool_size": self.pool_size,
+            "requests": total_requests,
+            "hits": max(total_requests - total_connections, 0),
+            "misses": total_connections,
+            "retries": self._retry_count
+        }
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
     
     def create_index(
-        self, 
+        self,
         index_name: str = "support_tickets",
         dimension: int = 384,
         metric: str = "cosine"
@@ -39,43 +468,20 @@ class EndeeClient:
             index_name: Name of the index
             dimension: Vector dimension (384 for MiniLM)
             metric: Distance metric (cosine, euclidean, dot)
-            
+        
         Returns:
             bool: True if successful
         """
         try:
-            # Convert metric to Endee's space_type
-            space_type_map = {
-                "cosine": "cosine",
-                "euclidean": "l2",
-                "dot": "ip"  # inner product
-            }
-            space_type = space_type_map.get(metric, "cosine")
-            
-            # Endee API format from source code
-            payload = {
-                "index_name": index_name,
-                "dim": dimension,
-                "space_type": space_type
-            }
+            payload = self._create_payload(index_name, dimension, metric)
             
-            response = requests.post(
-                f"{self.base_url}/api/v1/index/create",
-                json=payload,
-                headers=self.headers,
-                timeout=10
+            response = self._request(
+                "create", "POST", "/api/v1/index/create",
+                json=payload
             )
             
-            if response.status_code == 200:
-                print(f"✅ Created index '{index_name}' (dim: {dimension}, space_type: {space_type})")
-                return True
-            elif "already exists" in response.text.lower() or response.status_code == 409:
-                print(f"ℹ️  Index '{index_name}' already exists")
-                return True
-            else:
-                print(f"❌ Error creating index ({response.status_code}): {response.text}")
-                return False
-                
+            return self._handle_create_response(index_name, payload, response.status_code, response.text)
+        
         except requests.exceptions.ConnectionError:
             print("❌ Cannot connect to Endee server. Is it running?")
             print("   Start it with: docker compose -f docker-compose-endee.yml up -d")
@@ -99,14 +505,14 @@ class EndeeClient:
             vector: Embedding vector (384-dim for MiniLM)
             metadata: Associated metadata (category, priority, text, etc.)
             vector_id: Optional ID for the vector
-            
+        
         Returns:
             bool: True if successful
         """
         try:
             # Endee expects an array, so wrap single item
            return self.batch_insert(index_name, [vector], [metadata], [vector_id] if vector_id else None)
-                
+        
         except Exception as e:
             print(f"❌ Error inserting vector: {e}")
             return False
@@ -123,53 +529,111 @@ class EndeeClient:
         
         Args:
             index_name: Name of the index
-            vectors: List of embedding vectors
+            vectors: List of embedding vectors or an (n, dim) array (sent without tolist())
             metadatas: List of metadata dicts
-            ids: Optional list of IDs
-            
+            ids: Optional list of IDs (missing ones are derived from the ticket, see vector_ids)
+        
         Returns:
             bool: True if successful
         """
         try:
-            # Build items array in Endee format
-            # From source: expects array of {id, vector, sparse_indices, sparse_values}
-            # We'll attach metadata as custom fields (Endee doesn't explicitly store metadata in vector insert)
-            items = []
-            for i, (vector, metadata) in enumerate(zip(vectors, metadatas)):
-                item = {
-                    "id": ids[i] if ids and i < len(ids) else str(i),
-                    "vector": vector
-                }
-                # Note: Endee doesn't have built-in metadata storage in the vector insert API
-                # Metadata would need to be stored separately or reconstructed from responses
-                # For now, we'll just insert the vectors
-                items.append(item)
+            item_ids = vector_ids(ids, metadatas[:len(vectors)])
+            INSERT_BATCH_SIZE.observe(len(item_ids))
+            items = self._insert_items(vectors, item_ids)
             
-            # Send as JSON array directly
-            response = requests.post(
-                f"{self.base_url}/api/v1/index/{index_name}/vector/insert",
-                json=items,
-                headers=self.headers,
-                timeout=30
+            response = self._send_vectors(
+                "insert", f"/api/v1/index/{index_name}/vector/insert", items
             )
             
             if response.status_code == 200:
+                self._commit_insert(index_name, item_ids, vectors[:len(item_ids)], metadatas[:len(item_ids)])
                 print(f"✅ Inserted {len(vectors)} vectors")
                 return True
             else:
                 print(f"❌ Error batch inserting ({response.status_code}): {response.text}")
                 return False
-                
+        
         except Exception as e:
             print(f"❌ Error batch inserting: {e}")
             return False
     
+    def upsert(
+        self,
+        index_name: str,
+        vectors: List[List[float]],
+        metadatas: List[Dict],
+        ids: List[str],
+        batch_size: int = 500
+    ) -> bool:
+        """
+        Insert or replace tickets by id, batch_size at a time
+        
+        Endee's insert replaces the vector of an id it already holds, and
+        the sidecar row is shadowed, so an upsert is a keyed batch_insert.
+        
+        Args:
+            index_name: Name of the index
+            vectors: Embedding vectors (or an (n, dim) array)
+            metadatas: Metadata dicts
+            ids: One id per vector (required: upserts are keyed by id)
+            batch_size: Vectors per insert request
+        
+        Returns:
+            bool: True if every batch succeeded
+        """
+        if not ids or len(ids) < len(metadatas):
+            raise ValueError("upsert needs one id per vector")
+        return all(
+            self.batch_insert(index_name, vectors[start:start + batch_size],
+                              metadatas[start:start + batch_size], ids[start:start + batch_size])
+            for start in range(0, len(metadatas), batch_size)
+        )
+    
+    def delete_vectors(self, index_name: str, ids: List[str], batch_size: int = 500) -> bool:
+        """
+        Delete tickets by id
+        
+        Each batch is sent as concurrent per-id DELETEs over the connection
+        pool, then committed to the sidecar store in one append.
+        
+        Args:
+            index_name: Name of the index
+            ids: Ids to delete (ids Endee doesn't know count as deleted)
+            batch_size: Ids per committed batch
+        
+        Returns:
+            bool: True if every id was deleted
+        """
+        def delete_one(vector_id: str) -> int:
+            return self._request("delete_vector", "DELETE", self._delete_vector_path(index_name, vector_id)).status_code
+        
+        try:
+            deleted = 0
+            for start in range(0, len(ids), batch_size):
+                batch = list(ids[start:start + batch_size])
+                with ThreadPoolExecutor(max_workers=min(self.pool_size, len(batch)), thread_name_prefix="delete") as pool:
+                    statuses = list(pool.map(delete_one, batch))
+                done = [vector_id for vector_id, status in zip(batch, statuses) if status in DELETED_STATUSES]
+                self._commit_delete(index_name, done)
+                deleted += len(done)
+                if len(done) < len(batch):
+                    failed = sorted({status for status in statuses if status not in DELETED_STATUSES})
+                    print(f"❌ Error deleting {len(batch) - len(done)} vectors (status {failed})")
+                    return False
+            print(f"✅ Deleted {deleted} vectors")
+            return True
+        
+        except Exception as e:
+            print(f"❌ Error deleting vectors: {e}")
+            return False
+    
     def search(
         self,
         index_name: str,
         query_vector: List[float],
         top_k: int = 5,
-        filters: Optional[Dict] = None
+        filters: Optional[Dict] = None,
+        include_vectors: bool = False
     ) -> List[Dict]:
         """
         Search for similar vectors in Endee
@@ -179,66 +643,37 @@ class EndeeClient:
             query_vector: Query embedding vector
             top_k: Number of results to return
             filters: Optional metadata filters
-            
+            include_vectors: Also return each hit's stored vector (float32 array)
+        
         Returns:
             List of results with scores and metadata
+        
+        Raises:
+            EndeeUnavailable: If Endee is down, overloaded or the circuit is open
+            EndeeSearchError: If Endee rejects the search or its response is malformed
         """
         try:
-            # Endee API format (from source code line 650: expects "k" and "vector")
-            payload = {
-                "vector": query_vector,
-                "k": top_k,
-                "include_vectors": False  # We don't need vectors back
-            }
+            payload = self._search_payload(query_vector, top_k, filters, include_vectors)
             
-            if filters:
-                payload["filter"] = filters  # TODO: Convert to Endee filter format if needed
-            
-            response = requests.post(
-                f"{self.base_url}/api/v1/index/{index_name}/search",
-                json=payload,
-                headers=self.headers,
-                timeout=10
-            )
+            with STAGE_SECONDS.time("search"):
+                response = self._send_vectors(
+                    "search", f"/api/v1/index/{index_name}/search", payload
+                )
+                data = self._decode_response(response) if response.status_code == 200 else None
             
             if response.status_code == 200:
-                # Endee returns MessagePack, need to decode
-                # For now, try JSON fallback or handle msgpack
-                try:
-                    # Try to decode as msgpack first
-                    import msgpack
-                    data = msgpack.unpackb(response.content, raw=False)
-                except:
-                    # Fallback to JSON
-                    data = response.json()
-                
-                # Convert Endee format to our expected format
-                # Endee returns: {results: [{id, distance, vector?, ...}]}
-                results = []
-                for item in data.get("results", []):
-                    # Convert distance to similarity score (closer to 1 is more similar for cosine)
-                    # For cosine: similarity = 1 - distance
-                    distance = item.get("distance", 1.0)
-                    score = 1.0 - distance if distance < 1.0 else 0.0
-                    
-                    results.append({
-                        "score": score,
-                        "metadata": {
-                            "text": f"Similar ticket (id: {item.get('id', 'unknown')})",
-                            "category": "Unknown",  # Endee doesn't store metadata with vectors
-                            "priority": "Medium"
-                        }
-                    })
-                return results
-            else:
-                print(f"❌ Error searching ({response.status_code}): {response.text}")
-                return []
-                
+                return self._parse_search_results(data)
+            self._raise_if_unavailable(response.status_code)
+            raise EndeeSearchError(f"Endee search failed ({response.status_code}): {response.text}")
+        
+        except (EndeeUnavailable, EndeeSearchError):
+            raise
+        except (CircuitOpenError, requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            raise EndeeUnavailable(str(e)) from e
+        except ValueError as e:
+            raise EndeeSearchError(f"Undecodable Endee search response: {e}") from e
         except Exception as e:
-            print(f"❌ Error searching: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            raise EndeeSearchError(f"Endee search failed: {e}") from e
     
     def get_stats(self, index_name: str = "support_tickets") -> Dict:
         """
@@ -246,23 +681,21 @@ class EndeeClient:
         
         Args:
             index_name: Name of the index
-            
+        
         Returns:
             Dict with statistics
         """
         try:
             # Endee API: GET /api/v1/index/{index_name}/stats
-            response = requests.get(
-                f"{self.base_url}/api/v1/index/{index_name}/stats",
-                headers=self.headers,
-                timeout=10
+            response = self._request(
+                "stats", "GET", f"/api/v1/index/{index_name}/stats"
             )
             
             if response.status_code == 200:
-                return response.json()
+                return self._decode_response(response)
             else:
                 return {"error": f"HTTP {response.status_code}"}
-                
+        
         except Exception as e:
             return {"error": str(e)}
     
@@ -272,25 +705,295 @@ class EndeeClient:
         
         Args:
             index_name: Name of the index to delete
-            
+        
         Returns:
             bool: True if successful
         """
         try:
             # Endee API: DELETE /api/v1/index/{index_name}
-            response = requests.delete(
-                f"{self.base_url}/api/v1/index/{index_name}",
-                headers=self.headers,
-                timeout=10
+            response = self._request(
+                "delete", "DELETE", f"/api/v1/index/{index_name}"
+            )
+            
+            if response.status_code == 200:
+                self.index_version += 1
+                self.metadata.delete_index(index_name)
+                print(f"✅ Deleted index '{index_name}'")
+                return True
+            else:
+                print(f"❌ Error deleting index: {response.text}")
+                return False
+        
+        except Exception as e:
+            print(f"❌ Error deleting index: {e}")
+            return False
+
+
+class AsyncEndeeClient(_EndeeClientBase):
+    """
+    Asyncio client for Endee, mirroring EndeeClient
+    
+    Built on a pooled httpx.AsyncClient so a single event loop can keep
+    many searches in flight without blocking on network I/O.
+    """
+    
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        metadata_store: Optional[MetadataStore] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Initialize async Endee HTTP client
+        
+        Args:
+            pool_size: Max keep-alive connections to Endee (default: ENDEE_POOL_SIZE or 10)
+            metadata_store: Sidecar store for ticket metadata (default: opened from METADATA_STORE_PATH)
+            breaker: Circuit breaker to share with another client (default: a new one)
+        """
+        super().__init__(pool_size, metadata_store, breaker)
+        
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size
+            )
+        )
+        
+        # Track which network streams we've seen to count connection reuse
+        self._seen_streams = weakref.WeakSet()
+        self._requests = 0
+        self._hits = 0
+        
+        print(f"  ✓ Async Endee HTTP client initialized ({self.base_url}, pool size: {self.pool_size})")
+    
+    async def _request(self, endpoint: str, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the pooled client with endpoint timeout and retries
+        
+        Args:
+            endpoint: Endpoint key (create, insert, search, stats, delete, delete_vector)
+            method: HTTP method
+            path: URL path below the Endee host
+            **kwargs: Passed through to httpx.AsyncClient.request
+        
+        Returns:
+            The final response (after retries)
+        
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+        """
+        timeout = httpx.Timeout(self.timeouts[endpoint], connect=self.connect_timeout)
+        retries = self.retries[endpoint]
+        
+        for attempt in range(retries + 1):
+            self._check_circuit(endpoint)
+            started = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, timeout=timeout, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException):
+                ENDEE_RESPONSES.inc(endpoint, "error")
+                self.breaker.record_failure()
+                if attempt == retries:
+                    raise
+            else:
+                self._record_response(endpoint, response.status_code, time.perf_counter() - started)
+                self._track_connection(response)
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+            
+            self._count_retry()
+            await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+    
+    async def _send_vectors(self, endpoint: str, path: str, payload) -> httpx.Response:
+        """POST a vector-carrying payload in the configured wire format (JSON fallback)"""
+        body, content_type = self._encode_body(payload, self.wire_format)
+        response = await self._request(endpoint, "POST", path, content=body, headers={"Content-Type": content_type})
+        
+        if self._wire_format_fallback(response.status_code):
+            body, content_type = self._encode_body(payload, "json")
+            response = await self._request(endpoint, "POST", path, content=body, headers={"Content-Type": content_type})
+            if response.status_code == 200:
+                self._use_json_wire_format()
+        return response
+    
+    def _track_connection(self, response: httpx.Response):
+        stream = response.extensions.get("network_stream")
+        self._requests += 1
+        if stream is None:
+            return
+        if stream in self._seen_streams:
+            self._hits += 1
+        else:
+            self._seen_streams.add(stream)
+    
+    def pool_stats(self) -> Dict:
+        """
+        Get connection pool counters (same shape as EndeeClient.pool_stats)
+        
+        Returns:
+            Dict with pool size, request, hit/miss and retry counts
+        """
+        return {
+            "pool_size": self.pool_size,
+            "requests": self._requests,
+            "hits": self._hits,
+            "misses": self._requests - self._hits,
+            "retries": self._retry_count
+        }
+    
+    async def aclose(self):
+        """Close all pooled connections"""
+        await self.client.aclose()
+    
+    async def create_index(
+        self,
+        index_name: str = "support_tickets",
+        dimension: int = 384,
+        metric: str = "cosine"
+    ) -> bool:
+        """Create a vector index in Endee (see EndeeClient.create_index)"""
+        try:
+            payload = self._create_payload(index_name, dimension, metric)
+            response = await self._request("create", "POST", "/api/v1/index/create", json=payload)
+            return self._handle_create_response(index_name, payload, response.status_code, response.text)
+        except httpx.ConnectError:
+            print("❌ Cannot connect to Endee server. Is it running?")
+            return False
+        except Exception as e:
+            print(f"❌ Error creating index: {e}")
+            return False
+    
+    async def batch_insert(
+        self,
+        index_name: str,
+        vectors: List[List[float]],
+        metadatas: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> bool:
+        """Insert multiple vectors at once (see EndeeClient.batch_insert)"""
+        try:
+            item_ids = vector_ids(ids, metadatas[:len(vectors)])
+            INSERT_BATCH_SIZE.observe(len(item_ids))
+            items = self._insert_items(vectors, item_ids)
+            response = await self._send_vectors(
+                "insert", f"/api/v1/index/{index_name}/vector/insert", items
             )
             
             if response.status_code == 200:
+                self._commit_insert(index_name, item_ids, vectors[:len(item_ids)], metadatas[:len(item_ids)])
+                print(f"✅ Inserted {len(vectors)} vectors")
+                return True
+            else:
+                print(f"❌ Error batch inserting ({response.status_code}): {response.text}")
+                return False
+        except Exception as e:
+            print(f"❌ Error batch inserting: {e}")
+            return False
+    
+    async def upsert(
+        self,
+        index_name: str,
+        vectors: List[List[float]],
+        metadatas: List[Dict],
+        ids: List[str],
+        batch_size: int = 500
+    ) -> bool:
+        """Insert or replace tickets by id (see EndeeClient.upsert)"""
+        if not ids or len(ids) < len(metadatas):
+            raise ValueError("upsert needs one id per vector")
+        for start in range(0, len(metadatas), batch_size):
+            if not await self.batch_insert(index_name, vectors[start:start + batch_size],
+                                           metadatas[start:start + batch_size], ids[start:start + batch_size]):
+                return False
+        return True
+    
+    async def delete_vectors(self, index_name: str, ids: List[str], batch_size: int = 500) -> bool:
+        """Delete tickets by id (see EndeeClient.delete_vectors)"""
+        semaphore = asyncio.Semaphore(self.pool_size)
+        
+        async def delete_one(vector_id: str) -> int:
+            async with semaphore:
+                response = await self._request("delete_vector", "DELETE", self._delete_vector_path(index_name, vector_id))
+            return response.status_code
+        
+        try:
+            deleted = 0
+            for start in range(0, len(ids), batch_size):
+                batch = list(ids[start:start + batch_size])
+                statuses = await asyncio.gather(*(delete_one(vector_id) for vector_id in batch))
+                done = [vector_id for vector_id, status in zip(batch, statuses) if status in DELETED_STATUSES]
+                self._commit_delete(index_name, done)
+                deleted += len(done)
+                if len(done) < len(batch):
+                    failed = sorted({status for status in statuses if status not in DELETED_STATUSES})
+                    print(f"❌ Error deleting {len(batch) - len(done)} vectors (status {failed})")
+                    return False
+            print(f"✅ Deleted {deleted} vectors")
+            return True
+        except Exception as e:
+            print(f"❌ Error deleting vectors: {e}")
+            return False
+    
+    async def search(
+        self,
+        index_name: str,
+        query_vector: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict] = None,
+        include_vectors: bool = False
+    ) -> List[Dict]:
+        """Search for similar vectors in Endee (see EndeeClient.search)"""
+        try:
+            payload = self._search_payload(query_vector, top_k, filters, include_vectors)
+            started = time.perf_counter()
+            response = await self._send_vectors(
+                "search", f"/api/v1/index/{index_name}/search", payload
+            )
+            data = self._decode_response(response) if response.status_code == 200 else None
+            STAGE_SECONDS.observe(time.perf_counter() - started, "search")
+            
+            if response.status_code == 200:
+                return self._parse_search_results(data)
+            self._raise_if_unavailable(response.status_code)
+            raise EndeeSearchError(f"Endee search failed ({response.status_code}): {response.text}")
+        except (EndeeUnavailable, EndeeSearchError):
+            raise
+        except (CircuitOpenError, httpx.ConnectError, httpx.TimeoutException) as e:
+            raise EndeeUnavailable(str(e)) from e
+        except ValueError as e:
+            raise EndeeSearchError(f"Undecodable Endee search response: {e}") from e
+        except Exception as e:
+            raise EndeeSearchError(f"Endee search failed: {e}") from e
+    
+    async def get_stats(self, index_name: str = "support_tickets") -> Dict:
+        """Get index statistics (see EndeeClient.get_stats)"""
+        try:
+            response = await self._request("stats", "GET", f"/api/v1/index/{index_name}/stats")
+            
+            if response.status_code == 200:
+                return self._decode_response(response)
+            else:
+                return {"error": f"HTTP {response.status_code}"}
+        except Exception as e:
+            return {"error": str(e)}
+    
+    async def delete_index(self, index_name: str) -> bool:
+        """Delete an index (see EndeeClient.delete_index)"""
+        try:
+            response = await self._request("delete", "DELETE", f"/api/v1/index/{index_name}")
+            
+            if response.status_code == 200:
+                self.index_version += 1
+                # Tombstoning a large index's ids is file I/O; keep it off the loop
+                await asyncio.to_thread(self.metadata.delete_index, index_name)
                 print(f"✅ Deleted index '{index_name}'")
                 return True
             else:
                 print(f"❌ Error deleting index: {response.text}")
                 return False
-                
         except Exception as e:
             print(f"❌ Error deleting index: {e}")
             return False
@@ -0,0 +1,392 @@
+"""
+Fake Endee Server
+Localhost stand-in for the Endee HTTP API used by EndeeClient (create,
+insert, search, stats, delete, delete_vector) for offline tests and benchmarks
+
+Vectors are kept in memory and searched exactly with NumPy; search
+answers are msgpack like the real server. Latency, error responses,
+rate limits and a concurrency cap can be injected so retry, pooling and
+batching behaviour is reproducible.
+"""
+
+import re
+import json
+import urllib.parse
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple, Union
+import msgpack
+import numpy as np
+
+MSGPACK_TYPE = "application/msgpack"
+JSON_TYPE = "application/json"
+
+# (method, path pattern) -> endpoint key, matching EndeeClient's endpoint names
+ROUTES = [
+    ("POST", re.compile(r"^/api/v1/index/create$"), "create"),
+    ("POST", re.compile(r"^/api/v1/index/(?P<name>[^/]+)/vector/insert$"), "insert"),
+    ("POST", re.compile(r"^/api/v1/index/(?P<name>[^/]+)/search$"), "search"),
+    ("GET", re.compile(r"^/api/v1/index/(?P<name>[^/]+)/stats$"), "stats"),
+    ("DELETE", re.compile(r"^/api/v1/index/(?P<name>[^/]+)$"), "delete"),
+    ("DELETE", re.compile(r"^/api/v1/index/(?P<name>[^/]+)/vector/(?P<vector_id>[^/]+)/delete$"), "delete_vector"),
+]
+
+# (status, headers, body) as returned by FakeEndee.handle
+Reply = Tuple[int, Dict[str, str], bytes]
+
+
+class _FakeIndex:
+    """One in-memory index: id -> row in a growable float32 matrix"""
+    
+    def __init__(self, dimension: int, space_type: str):
+        self.dimension = dimension
+        self.space_type = space_type
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.matrix = np.empty((0, dimension), dtype=np.float32)
+    
+    def upsert(self, ids: List[str], vectors: np.ndarray):
+        new = [i for i, vector_id in enumerate(ids) if vector_id not in self.rows]
+        needed = len(self.ids) + len(new)
+        if needed > len(self.matrix):
+            grown = np.empty((max(needed, 2 * len(self.matrix), 1024), self.dimension), dtype=np.float32)
+            grown[:len(self.ids)] = self.matrix[:len(self.ids)]
+            self.matrix = grown
+        for i, vector_id in enumerate(ids):
+            row = self.rows.get(vector_id)
+            if row is None:
+                row = self.rows[vector_id] = len(self.ids)
+                self.ids.append(vector_id)
+            self.matrix[row] = vectors[i]
+    
+    def remove(self, vector_id: str) -> bool:
+        """Drop one id, moving the last row into its slot"""
+        row = self.rows.pop(vector_id, None)
+        if row is None:
+            return False
+        last = len(self.ids) - 1
+        if row != last:
+            self.matrix[row] = self.matrix[last]
+            self.ids[row] = self.ids[last]
+            self.rows[self.ids[row]] = row
+        self.ids.pop()
+        return True
+    
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float, np.ndarray]]:
+        count = len(self.ids)
+        if count == 0 or k <= 0:
+            return []
+        corpus = self.matrix[:count]
+        if self.space_type == "l2":
+            distances = np.sum((corpus - query) ** 2, axis=1)
+        elif self.space_type == "ip":
+            distances = 1.0 - corpus @ query
+        else:
+            norms = np.linalg.norm(corpus, axis=1) * max(float(np.linalg.norm(query)), 1e-12)
+            distances = 1.0 - (corpus @ query) / np.maximum(norms, 1e-12)
+        k = min(k, count)
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return [(self.ids[row], float(distances[row]), corpus[row]) for row in top]
+
+
+class FakeEndee:
+    """In-memory Endee API with fault injection, served over localhost HTTP"""
+    
+    def __init__(
+        self,
+        latency_ms: Union[float, Dict[str, float]] = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit: float = 0.0,
+        max_concurrency: int = 0,
+        reject_msgpack: bool = False,
+        seed: int = 0
+    ):
+        """
+        Configure the fake server
+        
+        Args:
+            latency_ms: Added delay per request, or a dict of endpoint -> delay
+                (endpoints: create, insert, search, stats, delete, delete_vector)
+            jitter_ms: Extra uniformly random delay (0..jitter_ms)
+            error_rate: Fraction of requests answered with error_status
+            error_status: Status used for injected errors (e.g. 500, 502, 503)
+            rate_limit: Requests per second before answering 429 (0 = unlimited)
+            max_concurrency: Requests served at once before answering 503 (0 = unlimited)
+            reject_msgpack: Answer 415 to msgpack request bodies (tests the JSON fallback)
+            seed: Random seed so injected errors and jitter are repeatable
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.max_concurrency = max_concurrency
+        self.reject_msgpack = reject_msgpack
+        
+        self.indexes: Dict[str, _FakeIndex] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._tokens = max(rate_limit, 1.0)
+        self._refilled_at = time.monotonic()
+        self._inflight = 0
+        self.counts: Dict[str, int] = {}
+        self.server: Optional[ThreadingHTTPServer] = None
+    
+    # Fault injection
+    
+    def _latency(self, endpoint: str) -> float:
+        if isinstance(self.latency_ms, dict):
+            delay = self.latency_ms.get(endpoint, 0.0)
+        else:
+            delay = self.latency_ms
+        if self.jitter_ms:
+            with self._lock:
+                delay += self._random.uniform(0, self.jitter_ms)
+        return delay / 1000
+    
+    def _take_token(self) -> bool:
+        """Token bucket holding up to one second of requests"""
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(max(self.rate_limit, 1.0), self._tokens + (now - self._refilled_at) * self.rate_limit)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+    
+    def _inject_error(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+    
+    def _count(self, endpoint: str, status: int):
+        key = f"{endpoint}:{status}"
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+    
+    # Request handling
+    
+    def handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Reply:
+        """
+        Answer one request (everything except transport; usable without HTTP)
+        
+        Args:
+            method: HTTP method
+            path: Request path
+            headers: Request headers with lower-case names
+            body: Raw request body
+        
+        Returns:
+            (status, response headers, response body)
+        """
+        for route_method, pattern, endpoint in ROUTES:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            return self._reply("unknown", 404, b"Not found")
+        
+        if not self._take_token():
+            reply = self._reply(endpoint, 429, b"Rate limit exceeded")
+            reply[1]["Retry-After"] = "1"
+            return reply
+        
+        delay = self._latency(endpoint)
+        if delay:
+            time.sleep(delay)
+        
+        if self._inject_error():
+            return self._reply(endpoint, self.error_status, b"Injected error")
+        
+        try:
+            content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+            if content_type == MSGPACK_TYPE and self.reject_msgpack:
+                return self._reply(endpoint, 415, b"Unsupported media type")
+            payload = None
+            if method == "POST":
+                payload = msgpack.unpackb(body, raw=False) if content_type == MSGPACK_TYPE else json.loads(body or b"null")
+            params = {key: urllib.parse.unquote(value) for key, value in match.groupdict().items()}
+            name = params.pop("name", None)
+            return getattr(self, f"_{endpoint}")(name, payload, **params)
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(endpoint, 400, f"Bad request: {e}".encode())
+    
+    def _reply(self, endpoint: str, status: int, body: bytes, content_type: str = "text/plain") -> Reply:
+        self._count(endpoint, status)
+        return status, {"Content-Type": content_type}, body
+    
+    def _index(self, name: str) -> Optional[_FakeIndex]:
+        with self._lock:
+            return self.indexes.get(name)
+    
+    def _create(self, name, payload) -> Reply:
+        with self._lock:
+            if payload["index_name"] in self.indexes:
+                exists = True
+            else:
+                exists = False
+                self.indexes[payload["index_name"]] = _FakeIndex(
+                    int(payload["dim"]), payload.get("space_type", "cosine")
+                )
+        if exists:
+            return self._reply("create", 409, b"Index already exists")
+        return self._reply("create", 200, b"Index created")
+    
+    def _insert(self, name, items) -> Reply:
+        index = self._index(name)
+        if index is None:
+            return self._reply("insert", 404, b"Index not found")
+        vectors = np.stack([_vector(item["vector"], index.dimension) for item in items]) if items else None
+        if items:
+            with self._lock:
+                index.upsert([str(item["id"]) for item in items], vectors)
+        return self._reply("insert", 200, b"OK")
+    
+    def _search(self, name, payload) -> Reply:
+        index = self._index(name)
+        if index is None:
+            return self._reply("search", 404, b"Index not found")
+        query = _vector(payload["vector"], index.dimension)
+        with self._lock:
+            hits = index.search(query, int(payload.get("k", 10)))
+        include_vectors = payload.get("include_vectors", False)
+        results = []
+        for vector_id, distance, vector in hits:
+            result = {"id": vector_id, "distance": distance}
+            if include_vectors:
+                result["vector"] = vector.astype("<f4").tobytes()
+            results.append(result)
+        return self._reply("search", 200, msgpack.packb({"results": results}, use_bin_type=True), MSGPACK_TYPE)
+    
+    def _stats(self, name, payload) -> Reply:
+        index = self._index(name)
+        if index is None:
+            return self._reply("stats", 404, b"Index not found")
+        stats = {
+            "index_name": name,
+            "dim": index.dimension,
+            "space_type": index.space_type,
+            "total_elements": len(index.ids)
+        }
+        return self._reply("stats", 200, json.dumps(stats).encode(), JSON_TYPE)
+    
+    def _delete(self, name, payload) -> Reply:
+        with self._lock:
+            deleted = self.indexes.pop(name, None) is not None
+        if not deleted:
+            return self._reply("delete", 404, b"Index not found")
+        return self._reply("delete", 200, b"Index deleted")
+    
+    def _delete_vector(self, name, payload, vector_id: str) -> Reply:
+        index = self._index(name)
+        if index is None:
+            return self._reply("delete_vector", 404, b"Index not found")
+        with self._lock:
+            removed = index.remove(vector_id)
+        if not removed:
+            return self._reply("delete_vector", 404, b"Vector not found")
+        return self._reply("delete_vector", 200, b"Vector deleted")
+    
+    # HTTP transport
+    
+    def _handler(self):
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def _serve(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                with fake._lock:
+                    overloaded = bool(fake.max_concurrency) and fake._inflight >= fake.max_concurrency
+                    if not overloaded:
+                        fake._inflight += 1
+                if overloaded:
+                    status, headers, reply = fake._reply("overloaded", 503, b"Too many concurrent requests")
+                else:
+                    try:
+                        status, headers, reply = fake.handle(
+                            self.command,
+                            self.path,
+                            {key.lower(): value for key, value in self.headers.items()},
+                            body
+                        )
+                    finally:
+                        with fake._lock:
+                            fake._inflight -= 1
+                
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+            
+            do_GET = do_POST = do_DELETE = _serve
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Serve on a background thread
+        
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        
+        Returns:
+            Base URL to use as ENDEE_HOST
+        """
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_port}"
+    
+    def stop(self):
+        """Stop serving"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+    
+    def __enter__(self) -> "FakeEndee":
+        return self
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def stats(self) -> Dict:
+        """
+        Get request counters
+        
+        Returns:
+            Dict with "endpoint:status" counts and vectors per index
+        """
+        with self._lock:
+            return {
+                "responses": dict(self.counts),
+                "indexes": {name: len(index.ids) for name, index in self.indexes.items()}
+            }
+
+
+def _vector(value, dimension: int) -> np.ndarray:
+    """Decode a request vector: msgpack bin (packed float32) or a float list"""
+    if isinstance(value, (bytes, bytearray)):
+        vector = np.frombuffer(value, dtype="<f4")
+    else:
+        vector = np.asarray(value, dtype=np.float32)
+    if vector.shape != (dimension,):
+        raise ValueError(f"expected a {dimension}-dim vector, got shape {vector.shape}")
+    return vector
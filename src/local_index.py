@@ -0,0 +1,776 @@
+"""
+Local Vector Index
+In-process NumPy brute-force (exact kNN) engine with the same interface
+as EndeeClient. Useful for small corpora (no network hop) and as a local
+stand-in for Endee in tests.
+
+Each index is a directory holding a contiguous, memory-mapped float32
+matrix (vectors.f32), an append-only id list (ids.txt), an append-only
+list of deleted rows (tombstones.txt), an append-only list of rows
+overwritten in place (updates.txt) and a small meta.json with the
+dimension and metric. Writers in different processes (API workers, the
+indexer) serialize on an flock of write.lock; readers need no lock.
+Metadata goes to the shared sidecar MetadataStore, exactly like EndeeClient.
+
+With LOCAL_INDEX_CODEC=float16 or pq each process also keeps a compressed
+copy of the vectors in memory (see src/vector_codecs.py) and scans that
+instead of the float32 file; only the best LOCAL_INDEX_RERANK candidates
+per query are read back from vectors.f32 and rescored exactly.
+"""
+
+import os
+import json
+import time
+import fcntl
+import shutil
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from src.metadata_store import MetadataStore, DEFAULT_CATEGORY, DEFAULT_PRIORITY, vector_ids
+from src.metrics import INSERT_BATCH_SIZE, STAGE_SECONDS
+from src.vector_codecs import VECTOR_CODECS, create_codec
+
+# Rows allocated when an index file is first created
+INITIAL_CAPACITY = 1024
+
+# Rows encoded per codec call when compressing the index
+ENCODE_BATCH_SIZE = 65536
+
+# Writers train the PQ codebook once this many rows exist, on a sample of at most PQ_TRAIN_ROWS
+PQ_MIN_TRAIN_ROWS = 10000
+PQ_TRAIN_ROWS = 20000
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows of the k best scores per column, best first; (rows, scores), both (k, queries)"""
+    if k < scores.shape[0]:
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[0])[:, None], scores.shape)
+    top_scores = np.take_along_axis(scores, top, axis=0)
+    order = np.argsort(-top_scores, axis=0)
+    return np.take_along_axis(top, order, axis=0), np.take_along_axis(top_scores, order, axis=0)
+
+
+def _rerank(matrix: np.ndarray, queries: np.ndarray, candidates: np.ndarray, metric: str, k: int):
+    """Exact top k among candidate rows (candidates, queries); reads only those rows of matrix"""
+    vectors = matrix[candidates]  # (candidates, queries, dim)
+    if metric == "l2":
+        exact = -np.square(vectors - queries[None, :, :]).sum(axis=2)
+    else:
+        exact = np.einsum("cqd,qd->cq", vectors, queries)
+    top, top_scores = _top_k(exact, k)
+    return np.take_along_axis(candidates, top, axis=0), top_scores
+
+
+class _IndexData:
+    """Storage for one local index"""
+    
+    def __init__(self, path: str, dimension: int, metric: str, codec: str = "float32"):
+        self.path = path
+        self.dimension = dimension
+        self.metric = metric
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._ids_path = os.path.join(path, "ids.txt")
+        self._tombstones_path = os.path.join(path, "tombstones.txt")
+        self._updates_path = os.path.join(path, "updates.txt")
+        self._write_lock_path = os.path.join(path, "write.lock")
+        
+        for file_path in (self._vectors_path, self._ids_path, self._tombstones_path, self._updates_path):
+            open(file_path, "ab").close()
+        
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self._ids_offset = 0
+        self.dead_rows: List[int] = []
+        self._dead_array = np.empty(0, dtype=np.intp)
+        self._tombstones_offset = 0
+        self._updates_offset = 0
+        self.matrix: Optional[np.memmap] = None
+        
+        # Compressed in-memory copy of rows [0, encoded) (None with float32);
+        # built by the first search (the API warm-up), so writer-only
+        # processes never pay for it. PQ codebooks are trained by writers.
+        self.codec = create_codec(codec, dimension)
+        self.codes: Optional[np.ndarray] = None
+        self.encoded = 0
+        
+        self._map()
+        self.refresh()
+    
+    @classmethod
+    def create(cls, path: str, dimension: int, metric: str, codec: str = "float32") -> "_IndexData":
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"dim": dimension, "metric": metric}, f)
+        return cls(path, dimension, metric, codec)
+    
+    @classmethod
+    def open(cls, path: str, codec: str = "float32") -> Optional["_IndexData"]:
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        return cls(path, meta["dim"], meta["metric"], codec)
+    
+    @property
+    def capacity(self) -> int:
+        return 0 if self.matrix is None else self.matrix.shape[0]
+    
+    def _map(self):
+        """(Re)map the vectors file"""
+        rows = os.path.getsize(self._vectors_path) // (4 * self.dimension)
+        if rows == 0:
+            self.matrix = None
+            return
+        self.matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dimension))
+    
+    def _ensure_capacity(self, rows: int):
+        if rows <= self.capacity:
+            return
+        new_capacity = max(rows, 2 * self.capacity, INITIAL_CAPACITY)
+        if self.matrix is not None:
+            self.matrix.flush()
+        with open(self._vectors_path, "r+b") as f:
+            f.truncate(new_capacity * 4 * self.dimension)
+        self._map()
+    
+    @property
+    def live_count(self) -> int:
+        return len(self.rows)
+    
+    @staticmethod
+    def _read_lines(path: str, offset: int):
+        """Complete lines appended after offset; returns (lines, bytes consumed)"""
+        if os.path.getsize(path) == offset:
+            return [], 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            tail = f.read()
+        complete = tail.rfind(b"\n") + 1
+        return tail[:complete].decode("utf-8").split("\n")[:-1], complete
+    
+    def _refresh_ids(self):
+        new_ids, consumed = self._read_lines(self._ids_path, self._ids_offset)
+        for vector_id in new_ids:
+            self.rows[vector_id] = len(self.ids)
+            self.ids.append(vector_id)
+        self._ids_offset += consumed
+        if len(self.ids) > self.capacity:
+            self._map()
+    
+    def refresh(self):
+        """Pick up rows appended (or deleted) by another process"""
+        self._refresh_ids()
+        
+        dead, consumed = self._read_lines(self._tombstones_path, self._tombstones_offset)
+        dead = [int(row) for row in dead]
+        updated, updates_consumed = self._read_lines(self._updates_path, self._updates_offset)
+        updated = [int(row) for row in updated]
+        # Tombstones and updates always refer to rows already committed in
+        # ids.txt, but possibly committed after the read above
+        if max(dead + updated, default=-1) >= len(self.ids):
+            self._refresh_ids()
+        
+        self._mark_dead(dead)
+        self._tombstones_offset += consumed
+        self._reencode(updated)
+        self._updates_offset += updates_consumed
+    
+    @property
+    def approximate(self) -> bool:
+        """Whether searches scan the compressed copy (every committed row is encoded)"""
+        return self.codec is not None and self.codec.trained and self.encoded == len(self.ids)
+    
+    @property
+    def _codebook_path(self) -> str:
+        return os.path.join(self.path, f"pq_{self.codec.subvectors}x{self.codec.centroids}.npy")
+    
+    def _train_codec(self) -> bool:
+        """
+        Load the index's shared PQ codebook, or train (and save) it once enough rows exist
+        
+        Called by writers after an append; a file lock makes one process
+        train while concurrent writers wait and load its codebook.
+        """
+        if self.codec.load(self._codebook_path):
+            return True
+        if self.live_count < PQ_MIN_TRAIN_ROWS:
+            return False
+        with open(f"{self._codebook_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self.codec.load(self._codebook_path):
+                    return True
+                rows = np.fromiter(self.rows.values(), dtype=np.intp, count=self.live_count)
+                sample = np.sort(np.random.default_rng(0).choice(rows, min(len(rows), PQ_TRAIN_ROWS), replace=False))
+                started = time.perf_counter()
+                self.codec.train(self.matrix[sample])
+                self.codec.save(self._codebook_path)
+                print(f"  ✓ Trained PQ codebook on {len(sample)} vectors in {time.perf_counter() - started:.1f}s")
+                return True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _encode_new_rows(self):
+        """Extend the compressed copy to every committed row (searchers only load the codebook)"""
+        if self.codec is None or self.encoded == len(self.ids):
+            return
+        if not self.codec.trained and not self.codec.load(self._codebook_path):
+            return  # no codebook trained yet; searches stay exact
+        count = len(self.ids)
+        if self.codes is None or count > len(self.codes):
+            codes = np.empty((max(count, 2 * self.encoded, INITIAL_CAPACITY),) + self.codec.code_shape,
+                             dtype=self.codec.code_dtype)
+            if self.codes is not None:
+                codes[:self.encoded] = self.codes[:self.encoded]
+            self.codes = codes
+        for start in range(self.encoded, count, ENCODE_BATCH_SIZE):
+            stop = min(start + ENCODE_BATCH_SIZE, count)
+            self.codes[start:stop] = self.codec.encode(self.matrix[start:stop])
+        self.encoded = count
+    
+    def _reencode(self, rows: List[int]):
+        """Refresh the codes of rows overwritten in place"""
+        rows = [row for row in rows if row < self.encoded]
+        if rows:
+            self.codes[rows] = self.codec.encode(self.matrix[rows])
+    
+    def _mark_dead(self, rows: List[int]):
+        for row in rows:
+            if self.rows.get(self.ids[row]) == row:
+                del self.rows[self.ids[row]]
+        if rows:
+            self.dead_rows.extend(rows)
+            self._dead_array = np.asarray(self.dead_rows, dtype=np.intp)
+    
+    @contextmanager
+    def _writing(self):
+        """
+        Exclusive write access across processes (callers hold the LocalIndex lock)
+        
+        Inside, ids, tombstones, updates and the mapping are current, so
+        new rows start at the true end of the index and the file offsets
+        only ever advance past this process's own appends.
+        """
+        with open(self._write_lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                if os.path.getsize(self._vectors_path) > self.capacity * 4 * self.dimension:
+                    self._map()  # another writer grew the file
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def delete(self, ids: List[str]) -> List[str]:
+        """Tombstone the rows of ids; returns the ids that existed"""
+        with self._writing():
+            found = [vector_id for vector_id in ids if vector_id in self.rows]
+            rows = [self.rows[vector_id] for vector_id in found]
+            if rows:
+                lines = "".join(f"{row}\n" for row in rows).encode("utf-8")
+                with open(self._tombstones_path, "ab") as f:
+                    f.write(lines)
+                self._mark_dead(rows)
+                self._tombstones_offset += len(lines)
+        return found
+    
+    def append(self, vectors: np.ndarray, ids: List[str]):
+        """Write vectors (overwriting rows of ids that already exist; within a batch the last copy of an id wins)"""
+        last = {vector_id: i for i, vector_id in enumerate(ids)}
+        if len(last) < len(ids):
+            positions = sorted(last.values())
+            vectors, ids = vectors[positions], [ids[i] for i in positions]
+        
+        with self._writing():
+            new_ids = []
+            new_positions = []
+            overwritten = []
+            for i, vector_id in enumerate(ids):
+                row = self.rows.get(vector_id)
+                if row is not None:
+                    self.matrix[row] = vectors[i]
+                    overwritten.append(row)
+                else:
+                    new_ids.append(vector_id)
+                    new_positions.append(i)
+            
+            if new_ids:
+                start = len(self.ids)
+                self._ensure_capacity(start + len(new_ids))
+                self.matrix[start:start + len(new_ids)] = vectors[new_positions]
+                self.matrix.flush()
+                
+                # Ids are written last: they mark rows as committed for other readers
+                id_lines = "".join(f"{vector_id}\n" for vector_id in new_ids).encode("utf-8")
+                with open(self._ids_path, "ab") as f:
+                    f.write(id_lines)
+                for offset, vector_id in enumerate(new_ids):
+                    self.rows[vector_id] = start + offset
+                    self.ids.append(vector_id)
+                self._ids_offset += len(id_lines)
+            elif self.matrix is not None:
+                self.matrix.flush()
+            
+            if overwritten:
+                # Other processes re-encode these rows of their compressed copies
+                update_lines = "".join(f"{row}\n" for row in overwritten).encode("utf-8")
+                with open(self._updates_path, "ab") as f:
+                    f.write(update_lines)
+                self._updates_offset += len(update_lines)
+                if self.codec is not None:
+                    self._reencode(overwritten)
+        
+        # Outside the write lock: other writers keep appending while one trains
+        if self.codec is not None and not self.codec.trained:
+            self._train_codec()
+    
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """Similarity of every stored vector to every query, shape (n, queries); approximate with a codec"""
+        self._encode_new_rows()
+        count = len(self.ids)
+        if self.approximate:
+            similarity = self.codec.scores(self.codes[:count], queries, self.metric)
+        else:
+            corpus = self.matrix[:count]
+            similarity = corpus @ queries.T
+            if self.metric == "l2":
+                # Negative squared distance, so larger is still more similar
+                similarity = 2 * similarity - np.einsum("ij,ij->i", corpus, corpus)[:, None] \
+                    - np.einsum("ij,ij->i", queries, queries)[None, :]
+        if len(self._dead_array):
+            similarity[self._dead_array] = -np.inf  # deleted rows never make the top k
+        return similarity
+
+
+class LocalIndex:
+    """NumPy exact-kNN engine, drop-in replacement for EndeeClient"""
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        metadata_store: Optional[MetadataStore] = None,
+        codec: Optional[str] = None,
+        rerank: Optional[int] = None
+    ):
+        """
+        Initialize local index
+        
+        Args:
+            path: Directory holding all local indexes (default: LOCAL_INDEX_PATH or ./dataset/local_index)
+            metadata_store: Sidecar store for ticket metadata (default: opened from METADATA_STORE_PATH)
+            codec: In-memory vector copy searched first: float32 (exact, none), float16 or pq
+                (default: LOCAL_INDEX_CODEC or float32)
+            rerank: Candidates per query rescored exactly from the float32 file with a codec
+                (default: LOCAL_INDEX_RERANK or 50, 0 = return approximate scores)
+        
+        Raises:
+            ValueError: On an unknown codec
+        """
+        self.path = path or os.getenv("LOCAL_INDEX_PATH", "./dataset/local_index")
+        self.metadata = metadata_store or MetadataStore()
+        self.codec = (codec or os.getenv("LOCAL_INDEX_CODEC", "float32")).lower()
+        if self.codec not in VECTOR_CODECS:
+            raise ValueError(f"Unknown LOCAL_INDEX_CODEC '{self.codec}' (expected {', '.join(VECTOR_CODECS)})")
+        self.rerank = int(os.getenv("LOCAL_INDEX_RERANK", "50")) if rerank is None else rerank
+        self.pool_size = 0
+        self.index_version = 0
+        self.change_listeners: List[Callable] = []
+        self._indexes: Dict[str, _IndexData] = {}
+        self._lock = threading.RLock()
+        os.makedirs(self.path, exist_ok=True)
+        print(f"  ✓ Local vector index initialized ({self.path}, {self.codec} vectors)")
+    
+    def _index(self, index_name: str) -> Optional[_IndexData]:
+        data = self._indexes.get(index_name)
+        if data is None:
+            data = _IndexData.open(os.path.join(self.path, index_name), self.codec)
+            if data is not None:
+                self._indexes[index_name] = data
+        else:
+            data.refresh()
+        return data
+    
+    def pool_stats(self) -> Dict:
+        """No network connections are used by the local engine"""
+        return {"pool_size": 0, "requests": 0, "hits": 0, "misses": 0, "retries": 0}
+    
+    def close(self):
+        """Flush memory-mapped vectors"""
+        with self._lock:
+            for data in self._indexes.values():
+                if data.matrix is not None:
+                    data.matrix.flush()
+    
+    def create_index(
+        self,
+        index_name: str = "support_tickets",
+        dimension: int = 384,
+        metric: str = "cosine"
+    ) -> bool:
+        """
+        Create a local vector index
+        
+        Args:
+            index_name: Name of the index
+            dimension: Vector dimension (384 for MiniLM)
+            metric: Distance metric (cosine, euclidean, dot)
+        
+        Returns:
+            bool: True if successful
+        """
+        space_type = {"cosine": "cosine", "euclidean": "l2", "dot": "ip"}.get(metric, "cosine")
+        with self._lock:
+            if self._index(index_name) is not None:
+                print(f"ℹ️  Index '{index_name}' already exists")
+                return True
+            self._indexes[index_name] = _IndexData.create(
+                os.path.join(self.path, index_name), dimension, space_type, self.codec
+            )
+        print(f"✅ Created index '{index_name}' (dim: {dimension}, space_type: {space_type})")
+        return True
+    
+    def insert_vector(
+        self,
+        index_name: str,
+        vector: List[float],
+        metadata: Dict,
+        vector_id: Optional[str] = None
+    ) -> bool:
+        """Insert a single vector (see batch_insert)"""
+        return self.batch_insert(index_name, [vector], [metadata], [vector_id] if vector_id else None)
+    
+    def batch_insert(
+        self,
+        index_name: str,
+        vectors: List[List[float]],
+        metadatas: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Append vectors to the index (existing ids are overwritten in place)
+        
+        Args:
+            index_name: Name of the index
+            vectors: List of embedding vectors (or an (n, dim) array)
+            metadatas: List of metadata dicts
+            ids: Optional list of IDs
+        
+        Returns:
+            bool: True if successful
+        """
+        try:
+            matrix = np.asarray(vectors, dtype=np.float32).reshape(len(metadatas), -1)
+            ids = vector_ids(ids, metadatas)
+            INSERT_BATCH_SIZE.observe(len(ids))
+            
+            with self._lock:
+                data = self._index(index_name)
+                if data is None:
+                    data = _IndexData.create(
+                        os.path.join(self.path, index_name), matrix.shape[1], "cosine", self.codec
+                    )
+                    self._indexes[index_name] = data
+                if data.metric == "cosine":
+                    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                    matrix = matrix / np.maximum(norms, 1e-12)
+                data.append(matrix, ids)
+            
+            previous = self.metadata.lookup(ids) if self.change_listeners else None
+            self.metadata.put_many(ids, metadatas, index_name)
+            self.index_version += 1
+            for listener in self.change_listeners:
+                listener(index_name, ids, matrix, metadatas, previous)
+            print(f"✅ Inserted {len(matrix)} vectors")
+            return True
+        except Exception as e:
+            print(f"❌ Error batch inserting: {e}")
+            return False
+    
+    def upsert(
+        self,
+        index_name: str,
+        vectors: List[List[float]],
+        metadatas: List[Dict],
+        ids: List[str],
+        batch_size: int = 500
+    ) -> bool:
+        """
+        Insert or replace tickets by id, batch_size at a time
+        
+        Args:
+            index_name: Name of the index
+            vectors: Embedding vectors (or an (n, dim) array)
+            metadatas: Metadata dicts
+            ids: One id per vector (required: upserts are keyed by id)
+            batch_size: Vectors per batch_insert call
+        
+        Returns:
+            bool: True if every batch succeeded
+        """
+        if not ids or len(ids) < len(metadatas):
+            raise ValueError("upsert needs one id per vector")
+        return all(
+            self.batch_insert(index_name, vectors[start:start + batch_size],
+                              metadatas[start:start + batch_size], ids[start:start + batch_size])
+            for start in range(0, len(metadatas), batch_size)
+        )
+    
+    def delete_vectors(self, index_name: str, ids: List[str], batch_size: int = 500) -> bool:
+        """
+        Delete tickets by id (rows are tombstoned, not compacted)
+        
+        Args:
+            index_name: Name of the index
+            ids: Ids to delete (unknown ids are ignored)
+            batch_size: Unused; deletes are a single append (kept for interface compatibility)
+        
+        Returns:
+            bool: True if successful
+        """
+        try:
+            with self._lock:
+                data = self._index(index_name)
+                if data is None:
+                    print(f"❌ Index '{index_name}' not found")
+                    return False
+                deleted = data.delete(list(ids))
+            
+            previous = self.metadata.lookup(deleted) if self.change_listeners else None
+            self.metadata.delete_many(deleted)
+            self.index_version += 1
+            for listener in self.change_listeners:
+                listener(index_name, deleted, None, None, previous)
+            print(f"✅ Deleted {len(deleted)} vectors")
+            return True
+        except Exception as e:
+            print(f"❌ Error deleting vectors: {e}")
+            return False
+    
+    def get_vectors(self, index_name: str) -> Tuple[List[str], np.ndarray]:
+        """
+        All live ids and vectors of an index, in insertion order
+        
+        Args:
+            index_name: Name of the index
+        
+        Returns:
+            (ids, (n, dim) array); read-only, a view of the index file when nothing was deleted
+        """
+        with self._lock:
+            data = self._index(index_name)
+            if data is None or not data.live_count:
+                return [], np.zeros((0, 0), dtype=np.float32)
+            rows = np.fromiter(data.rows.values(), dtype=np.intp, count=data.live_count)
+            rows.sort()
+            ids = [data.ids[row] for row in rows]
+            matrix = data.matrix[rows] if len(data.dead_rows) else np.asarray(data.matrix[:len(ids)])
+        matrix.flags.writeable = False
+        return ids, matrix
+    
+    def search(
+        self,
+        index_name: str,
+        query_vector: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict] = None,
+        include_vectors: bool = False
+    ) -> List[Dict]:
+        """
+        Top-k search (exact, or compressed scan plus exact rerank with a codec)
+        
+        Args:
+            index_name: Name of the index to search
+            query_vector: Query embedding vector
+            top_k: Number of results to return
+            filters: Unsupported, accepted for interface compatibility
+            include_vectors: Also return each hit's stored vector (float32 array)
+        
+        Returns:
+            List of results with scores and metadata
+        """
+        return self.search_batch(index_name, [query_vector], top_k, include_vectors)[0]
+    
+    def search_batch(
+        self,
+        index_name: str,
+        query_vectors: List[List[float]],
+        top_k: int = 5,
+        include_vectors: bool = False
+    ) -> List[List[Dict]]:
+        """
+        Top-k search for many queries with one matrix product
+        
+        With a codec the compressed copy is scanned instead (asymmetric
+        distance computation) and the best max(top_k, rerank) candidates
+        per query are rescored exactly from the float32 file.
+        
+        Args:
+            index_name: Name of the index to search
+            query_vectors: Query embedding vectors (or a (q, dim) array)
+            top_k: Number of results per query
+            include_vectors: Also return each hit's stored vector (float32 array)
+        
+        Returns:
+            One result list per query, in input order
+        """
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        
+        started = time.perf_counter()
+        with self._lock:
+            data = self._index(index_name)
+            if data is None or not data.live_count:
+                return [[] for _ in range(len(queries))]
+            if data.metric == "cosine":
+                queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+            scores = data.scores(queries)
+            approximate = data.approximate
+            ids = data.ids
+            matrix = data.matrix
+            metric = data.metric
+            live_count = data.live_count
+        
+        k = min(top_k, live_count)
+        if approximate and self.rerank:
+            candidates, _ = _top_k(scores, min(max(k, self.rerank), live_count))
+            top, top_scores = _rerank(matrix, queries, candidates, metric, k)
+        else:
+            top, top_scores = _top_k(scores, k)
+        STAGE_SECONDS.observe(time.perf_counter() - started, "search")
+        
+        # One batched metadata lookup for every hit of every query
+        hit_ids = [ids[row] for row in top.T.ravel()]
+        with STAGE_SECONDS.time("metadata"):
+            metadatas = self.metadata.lookup(hit_ids)
+        
+        results = []
+        for q in range(top.shape[1]):
+            hits = []
+            for j in range(k):
+                position = q * k + j
+                metadata = metadatas[position] or {
+                    "text": f"Similar ticket (id: {hit_ids[position]})",
+                    "category": DEFAULT_CATEGORY,
+                    "priority": DEFAULT_PRIORITY
+                }
+                hit = {
+                    "id": hit_ids[position],
+                    "score": float(top_scores[j, q]),
+                    "metadata": metadata
+                }
+                if include_vectors:
+                    hit["vector"] = np.array(matrix[top[j, q]])
+                hits.append(hit)
+            results.append(hits)
+        return results
+    
+    def get_stats(self, index_name: str = "support_tickets") -> Dict:
+        """
+        Get index statistics
+        
+        Args:
+            index_name: Name of the index
+        
+        Returns:
+            Dict with statistics
+        """
+        with self._lock:
+            data = self._index(index_name)
+            if data is None:
+                return {"error": f"Index '{index_name}' not found"}
+            return {
+                "backend": "local",
+                "index_name": index_name,
+                "dimension": data.dimension,
+                "space_type": data.metric,
+                "total_elements": data.live_count,
+                "deleted_elements": len(data.dead_rows),
+                "capacity": data.capacity,
+                "matrix_bytes": len(data.ids) * data.dimension * 4,
+                "codec": self.codec,
+                "code_bytes": data.encoded * data.codec.bytes_per_vector if data.codec else 0,
+                "approximate_search": data.approximate,
+                "rerank": self.rerank if data.approximate else 0
+            }
+    
+    def delete_index(self, index_name: str) -> bool:
+        """
+        Delete an index (use with caution!)
+        
+        Args:
+            index_name: Name of the index to delete
+        
+        Returns:
+            bool: True if successful
+        """
+        with self._lock:
+            data = self._index(index_name)
+            self._indexes.pop(index_name, None)
+            ids = list(data.rows) if data is not None else []
+            if data is not None and data.matrix is not None:
+                del data.matrix
+            index_path = os.path.join(self.path, index_name)
+            if not os.path.exists(index_path):
+                print(f"❌ Error deleting index: '{index_name}' not found")
+                return False
+            shutil.rmtree(index_path)
+            self.index_version += 1
+            self.metadata.delete_index(index_name, ids)
+        print(f"✅ Deleted index '{index_name}'")
+        return True
+
+
+class AsyncLocalIndex:
+    """Async facade over a LocalIndex (matrix products run off the event loop)"""
+    
+    def __init__(self, index: LocalIndex):
+        """
+        Wrap a LocalIndex
+        
+        Args:
+            index: The (shared) local index to delegate to
+        """
+        self.index = index
+        self.metadata = index.metadata
+        self.pool_size = 0
+        self.change_listeners = index.change_listeners
+    
+    @property
+    def index_version(self) -> int:
+        return self.index.index_version
+    
+    def pool_stats(self) -> Dict:
+        return self.index.pool_stats()
+    
+    async def aclose(self):
+        self.index.close()
+    
+    async def create_index(self, *args, **kwargs) -> bool:
+        return await asyncio.to_thread(self.index.create_index, *args, **kwargs)
+    
+    async def batch_insert(self, *args, **kwargs) -> bool:
+        return await asyncio.to_thread(self.index.batch_insert, *args, **kwargs)
+    
+    async def upsert(self, *args, **kwargs) -> bool:
+        return await asyncio.to_thread(self.index.upsert, *args, **kwargs)
+    
+    async def delete_vectors(self, *args, **kwargs) -> bool:
+        return await asyncio.to_thread(self.index.delete_vectors, *args, **kwargs)
+    
+    async def search(self, *args, **kwargs) -> List[Dict]:
+        return await asyncio.to_thread(self.index.search, *args, **kwargs)
+    
+    async def search_batch(self, *args, **kwargs) -> List[List[Dict]]:
+        return await asyncio.to_thread(self.index.search_batch, *args, **kwargs)
+    
+    async def get_stats(self, *args, **kwargs) -> Dict:
+        return self.index.get_stats(*args, **kwargs)
+    
+    async def delete_index(self, *args, **kwargs) -> bool:
+        return await asyncio.to_thread(self.index.delete_index, *args, **kwargs)
@@ -0,0 +1,386 @@
+"""
+Local Metadata Store
+Sidecar store for ticket metadata keyed by vector id
+
+Endee only stores vectors, so category/priority/text live here. The store
+is a directory of append-only files:
+    
+    ids.txt      one vector id per line (row i <-> line i, written last)
+    records.bin  fixed-width rows: text offset/length + interned category/priority codes
+    texts.bin    UTF-8 ticket texts, memory-mapped for reads
+    vocab.json   category and priority strings, indexed by their integer codes
+    epoch        one byte per change that appends no row (see mark_changed)
+    indexes/     <index>.txt: ids written through each vector index, one per line
+    write.lock   flock held by whichever process is appending
+
+Re-inserting an id appends a new row that shadows the old one; deleting
+an id appends a tombstone row (category code TOMBSTONE) that hides it.
+Deleting a vector index tombstones every id recorded for it.
+Writers in different processes (API workers, the indexer) take the file
+lock, so their rows, text offsets and label codes never interleave;
+readers need no lock.
+"""
+
+import os
+import json
+import mmap
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+
+RECORD_DTYPE = np.dtype([
+    ("text_offset", "<u8"),
+    ("text_length", "<u4"),
+    ("category", "<u2"),
+    ("priority", "<u2"),
+])
+
+DEFAULT_CATEGORY = "Unknown"
+DEFAULT_PRIORITY = "Medium"
+
+# Category code marking a deleted id
+TOMBSTONE = np.iinfo(RECORD_DTYPE["category"]).max
+
+
+def vector_ids(ids: Optional[List[str]], metadatas: List[Dict]) -> List[str]:
+    """
+    Ids for a batch of tickets, stable across batches and runs
+    
+    Explicit ids win. Missing ones are derived from the ticket itself:
+    ticket_<id> when it carries an "id", else a hash of its text, so
+    re-indexing the same ticket updates it instead of adding a duplicate.
+    
+    Args:
+        ids: Explicit ids (may be None or shorter than metadatas)
+        metadatas: Ticket metadata dicts
+    
+    Returns:
+        One id per metadata dict
+    """
+    result = []
+    for i, metadata in enumerate(metadatas):
+        if ids and i < len(ids) and ids[i]:
+            result.append(str(ids[i]))
+        elif metadata.get("id") is not None:
+            result.append(f"ticket_{metadata['id']}")
+        else:
+            digest = hashlib.sha1(str(metadata.get("text", "")).encode("utf-8")).hexdigest()
+            result.append(f"text_{digest[:16]}")
+    return result
+
+
+class MetadataStore:
+    """Append-only, memory-mapped metadata store with interned labels"""
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) a metadata store
+        
+        Args:
+            path: Store directory (default: METADATA_STORE_PATH or ./dataset/metadata)
+        """
+        self.path = path or os.getenv("METADATA_STORE_PATH", "./dataset/metadata")
+        os.makedirs(self.path, exist_ok=True)
+        self._ids_path = os.path.join(self.path, "ids.txt")
+        self._records_path = os.path.join(self.path, "records.bin")
+        self._texts_path = os.path.join(self.path, "texts.bin")
+        self._vocab_path = os.path.join(self.path, "vocab.json")
+        # Grows by one byte per change no row records (e.g. a deleted index)
+        self._epoch_path = os.path.join(self.path, "epoch")
+        self._write_lock_path = os.path.join(self.path, "write.lock")
+        self._indexes_path = os.path.join(self.path, "indexes")
+        os.makedirs(self._indexes_path, exist_ok=True)
+        
+        for file_path in (self._ids_path, self._records_path, self._texts_path, self._epoch_path):
+            open(file_path, "ab").close()
+        
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._records = np.empty(0, dtype=RECORD_DTYPE)
+        self._count = 0
+        self._ids_offset = 0
+        self._texts_map: Optional[mmap.mmap] = None
+        self._texts_file = open(self._texts_path, "rb")
+        
+        self._load_vocab()
+        with self._lock:
+            self._refresh()
+    
+    def _load_vocab(self):
+        if os.path.exists(self._vocab_path):
+            with open(self._vocab_path, "r") as f:
+                vocab = json.load(f)
+        else:
+            vocab = {"categories": [], "priorities": []}
+        self.categories: List[str] = vocab["categories"]
+        self.priorities: List[str] = vocab["priorities"]
+        self._category_codes = {name: code for code, name in enumerate(self.categories)}
+        self._priority_codes = {name: code for code, name in enumerate(self.priorities)}
+    
+    def _save_vocab(self):
+        tmp_path = f"{self._vocab_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"categories": self.categories, "priorities": self.priorities}, f)
+        os.replace(tmp_path, self._vocab_path)
+    
+    def _intern(self, value: str, names: List[str], codes: Dict[str, int]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = len(names)
+            names.append(value)
+            codes[value] = code
+        return code
+    
+    @contextmanager
+    def _writing(self):
+        """
+        Exclusive write access across threads and processes
+        
+        Inside, the in-memory rows and vocab are current and records.bin
+        holds exactly the committed rows, so appends start from the true
+        end of every file.
+        """
+        with self._lock, open(self._write_lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                self._load_vocab()
+                # Drop records a crashed writer appended without committing their ids
+                committed = self._count * RECORD_DTYPE.itemsize
+                if os.path.getsize(self._records_path) > committed:
+                    os.truncate(self._records_path, committed)
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _refresh(self):
+        """Pick up rows appended since the last refresh (possibly by another process)"""
+        with open(self._ids_path, "rb") as f:
+            f.seek(self._ids_offset)
+            tail = f.read()
+        complete = tail.rfind(b"\n") + 1
+        if complete == 0:
+            return
+        new_ids = tail[:complete].decode("utf-8").split("\n")[:-1]
+        
+        new_records = np.fromfile(
+            self._records_path,
+            dtype=RECORD_DTYPE,
+            count=len(new_ids),
+            offset=self._count * RECORD_DTYPE.itemsize
+        )
+        if len(new_records) < len(new_ids):
+            return  # writer is mid-append; try again next time
+        
+        self._index_rows(new_ids, new_records["category"], self._count)
+        self._append_records(new_records)
+        self._ids_offset += complete
+        
+        live = new_records[new_records["category"] != TOMBSTONE]
+        if live.size and (
+            live["category"].max() >= len(self.categories)
+            or live["priority"].max() >= len(self.priorities)
+        ):
+            self._load_vocab()
+    
+    def _index_rows(self, ids: List[str], categories: np.ndarray, start: int):
+        """Point ids at their newest row (tombstones remove the id)"""
+        for row, (vector_id, category) in enumerate(zip(ids, categories), start=start):
+            if category == TOMBSTONE:
+                self._rows.pop(vector_id, None)
+            else:
+                self._rows[vector_id] = row
+    
+    def _append_records(self, records: np.ndarray):
+        needed = self._count + len(records)
+        if needed > len(self._records):
+            grown = np.empty(max(needed, 2 * len(self._records), 1024), dtype=RECORD_DTYPE)
+            grown[:self._count] = self._records[:self._count]
+            self._records = grown
+        self._records[self._count:needed] = records
+        self._count = needed
+    
+    def put_many(self, ids: List[str], metadatas: List[Dict], index_name: Optional[str] = None):
+        """
+        Append metadata for a batch of vector ids
+        
+        Args:
+            ids: Vector ids (no newlines)
+            metadatas: Dicts with category, priority and text
+            index_name: Vector index the ids were written to (recorded for delete_index)
+        """
+        if not ids:
+            return
+        
+        with self._writing():
+            vocab_size = (len(self.categories), len(self.priorities))
+            records = np.empty(len(ids), dtype=RECORD_DTYPE)
+            blobs = []
+            offset = os.path.getsize(self._texts_path)
+            for i, metadata in enumerate(metadatas):
+                blob = str(metadata.get("text", "")).encode("utf-8")
+                records[i] = (
+                    offset,
+                    len(blob),
+                    self._intern(metadata.get("category", DEFAULT_CATEGORY), self.categories, self._category_codes),
+                    self._intern(metadata.get("priority", DEFAULT_PRIORITY), self.priorities, self._priority_codes),
+                )
+                blobs.append(blob)
+                offset += len(blob)
+            
+            # Order matters for concurrent readers: vocab, texts and records
+            # must be on disk before the ids that reference them
+            if (len(self.categories), len(self.priorities)) != vocab_size:
+                self._save_vocab()
+            with open(self._texts_path, "ab") as f:
+                f.write(b"".join(blobs))
+            self._append_rows(ids, records)
+            if index_name is not None:
+                with open(self._index_ids_path(index_name), "ab") as f:
+                    f.write("".join(f"{vector_id}\n" for vector_id in ids).encode("utf-8"))
+    
+    def delete_many(self, ids: List[str]):
+        """
+        Delete metadata for a batch of vector ids (unknown ids are ignored)
+        
+        Args:
+            ids: Vector ids
+        """
+        with self._writing():
+            self._tombstone(ids)
+    
+    def delete_index(self, index_name: str, ids: Optional[List[str]] = None) -> int:
+        """
+        Delete the metadata of a deleted vector index
+        
+        Tombstones every id put_many recorded for the index, so its tickets
+        stop showing up in ids() (and in centroids seeded from it).
+        
+        Args:
+            index_name: Name of the deleted index
+            ids: Further ids known to belong to it (e.g. from a local index
+                written before ids were recorded per index)
+        
+        Returns:
+            Number of ids deleted
+        """
+        index_ids_path = self._index_ids_path(index_name)
+        with self._writing():
+            recorded = []
+            if os.path.exists(index_ids_path):
+                with open(index_ids_path, "rb") as f:
+                    recorded = f.read().decode("utf-8").split("\n")[:-1]
+            deleted = self._tombstone(list(dict.fromkeys(recorded + list(ids or []))))
+            if os.path.exists(index_ids_path):
+                os.remove(index_ids_path)
+        self.mark_changed()
+        return deleted
+    
+    def _index_ids_path(self, index_name: str) -> str:
+        return os.path.join(self._indexes_path, f"{index_name}.txt")
+    
+    def _tombstone(self, ids: List[str]) -> int:
+        """Append tombstones for the live ids among ids (caller is inside _writing)"""
+        ids = [vector_id for vector_id in ids if vector_id in self._rows]
+        if ids:
+            records = np.zeros(len(ids), dtype=RECORD_DTYPE)
+            records["category"] = TOMBSTONE
+            self._append_rows(ids, records)
+        return len(ids)
+    
+    def _append_rows(self, ids: List[str], records: np.ndarray):
+        """Append records, then the ids that commit them (caller is inside _writing)"""
+        with open(self._records_path, "ab") as f:
+            records.tofile(f)
+        id_lines = "".join(f"{vector_id}\n" for vector_id in ids).encode("utf-8")
+        with open(self._ids_path, "ab") as f:
+            f.write(id_lines)
+        
+        self._index_rows(ids, records["category"], self._count)
+        self._append_records(records)
+        self._ids_offset += len(id_lines)
+    
+    def lookup(self, ids: List[str]) -> List[Optional[Dict]]:
+        """
+        Fetch metadata for many vector ids in one pass
+        
+        Args:
+            ids: Vector ids
+        
+        Returns:
+            Metadata dict (category, priority, text) or None per id, in order
+        """
+        with self._lock:
+            # One stat() tells us whether another process appended rows
+            if os.path.getsize(self._ids_path) != self._ids_offset:
+                self._refresh()
+            rows = [self._rows.get(vector_id) for vector_id in ids]
+            
+            found = [i for i, row in enumerate(rows) if row is not None]
+            records = self._records[[rows[i] for i in found]]
+            texts = self._read_texts(records)
+            categories, priorities = self.categories, self.priorities
+        
+        results: List[Optional[Dict]] = [None] * len(ids)
+        for i, record, text in zip(found, records, texts):
+            results[i] = {
+                "category": categories[record["category"]],
+                "priority": priorities[record["priority"]],
+                "text": text
+            }
+        return results
+    
+    def _read_texts(self, records: np.ndarray) -> List[str]:
+        if not len(records):
+            return []
+        end = int((records["text_offset"] + records["text_length"]).max())
+        if end == 0:
+            return [""] * len(records)
+        if self._texts_map is None or len(self._texts_map) < end:
+            if self._texts_map is not None:
+                self._texts_map.close()
+            self._texts_map = mmap.mmap(self._texts_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return [
+            self._texts_map[int(offset):int(offset) + int(length)].decode("utf-8")
+            for offset, length in zip(records["text_offset"], records["text_length"])
+        ]
+    
+    def ids(self) -> List[str]:
+        """All live (not deleted) ids, oldest row first"""
+        with self._lock:
+            if os.path.getsize(self._ids_path) != self._ids_offset:
+                self._refresh()
+            return sorted(self._rows, key=self._rows.get)
+    
+    def generation(self) -> int:
+        """Changes whenever any process appends or deletes metadata or calls mark_changed (two stat calls)"""
+        return os.path.getsize(self._ids_path) + os.path.getsize(self._epoch_path)
+    
+    def mark_changed(self):
+        """Signal a change other processes must notice (their caches key on generation)"""
+        with open(self._epoch_path, "ab") as f:
+            f.write(b".")
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def stats(self) -> Dict:
+        """Get store statistics"""
+        return {
+            "path": self.path,
+            "ids": len(self._rows),
+            "rows": self._count,
+            "categories": len(self.categories),
+            "priorities": len(self.priorities),
+            "text_bytes": os.path.getsize(self._texts_path)
+        }
+    
+    def close(self):
+        """Release the memory map and file handle"""
+        if self._texts_map is not None:
+            self._texts_map.close()
+            self._texts_map = None
+        self._texts_file.close()
@@ -0,0 +1,308 @@
+"""
+Metrics
+Lightweight Prometheus-style counters, gauges and histograms plus the
+/metrics text rendering. Recording is a lock and a few integer updates,
+cheap enough to leave on in production.
+
+Metrics are per process: with `main.py --production` each scrape of
+/metrics is answered by one worker.
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds (1 ms .. 10 s)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Vectors per insert request
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Content type of render() output (the response adds charset=utf-8)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Every metric created in this process, in creation order
+REGISTRY: List["_Metric"] = []
+
+
+class _Metric:
+    """Base class: a named metric family with fixed label names"""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+    
+    def _labels(self, labelvalues: Tuple) -> str:
+        if not self.labelnames:
+            return ""
+        pairs = ",".join(
+            f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, labelvalues)
+        )
+        return "{" + pairs + "}"
+    
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += self.samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+    
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+    
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{self._labels(labels)} {_format(value)}" for labels, value in values]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (e.g. requests in flight)"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+    
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+    
+    def dec(self, *labelvalues, amount: float = 1):
+        self.inc(*labelvalues, amount=-amount)
+    
+    def set(self, value: float, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+    
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+    
+    @contextmanager
+    def track_inprogress(self, *labelvalues):
+        self.inc(*labelvalues)
+        try:
+            yield
+        finally:
+            self.dec(*labelvalues)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{self._labels(labels)} {_format(value)}" for labels, value in values]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (latencies, sizes)"""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Tuple, list] = {}
+    
+    def observe(self, value: float, *labelvalues):
+        # Buckets are stored non-cumulatively; render() accumulates them
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+    
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the duration of the with-block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+    
+    def count(self, *labelvalues) -> int:
+        state = self._values.get(labelvalues)
+        return sum(state[0]) if state else 0
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        
+        lines = []
+        for labels, counts, total in values:
+            label_pairs = self._labels(labels)[1:-1]
+            prefix = f"{label_pairs}," if label_pairs else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            suffix = f"{{{label_pairs}}}" if label_pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {_format(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# Classification pipeline
+STAGE_SECONDS = Histogram(
+    "ticket_classifier_stage_seconds",
+    "Time spent in each classification stage (encode, centroid, search, metadata, vote)",
+    ["stage"]
+)
+ADAPTIVE_SEARCHES = Counter(
+    "ticket_classifier_adaptive_searches_total",
+    "Adaptive-k searches that stopped at VOTE_INITIAL_K (narrow) or widened to top_k",
+    ["path"]
+)
+DEGRADED_RESPONSES = Counter(
+    "ticket_classifier_degraded_responses_total",
+    "Tickets classified without Endee (circuit open or Endee unreachable), by fallback used",
+    ["fallback"]
+)
+CENTROID_ROUTES = Counter(
+    "ticket_classifier_centroid_routes_total",
+    "Tickets answered from label centroids (centroid) vs sent on to the kNN search (search)",
+    ["path"]
+)
+
+# API requests
+HTTP_REQUESTS = Counter(
+    "ticket_classifier_http_requests_total",
+    "API requests by path and status code",
+    ["path", "status"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "ticket_classifier_http_request_seconds",
+    "API request latency by path",
+    ["path"]
+)
+HTTP_IN_FLIGHT = Gauge(
+    "ticket_classifier_http_requests_in_flight",
+    "API requests currently being served, by path",
+    ["path"]
+)
+STARTUP_SECONDS = Gauge(
+    "ticket_classifier_startup_seconds",
+    "Time spent in each startup phase (import, classifier, warmup_encode, warmup_search, warmup_replica, total)",
+    ["phase"]
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "ticket_classifier_admission_queue_depth",
+    "Classify requests waiting for a concurrency slot"
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "ticket_classifier_admission_wait_seconds",
+    "Time queued classify requests waited for a slot (admitted or not)"
+)
+ADMISSION_SHED = Counter(
+    "ticket_classifier_admission_shed_total",
+    "Classify requests rejected by admission control (queue_full, deadline, timeout)",
+    ["reason"]
+)
+
+# Endee client
+ENDEE_RESPONSES = Counter(
+    "endee_http_responses_total",
+    "Endee HTTP responses by endpoint and status (\"error\" = connection failure or timeout, \"circuit_open\" = not sent)",
+    ["endpoint", "status"]
+)
+ENDEE_REQUEST_SECONDS = Histogram(
+    "endee_http_request_seconds",
+    "Latency of individual Endee HTTP attempts by endpoint",
+    ["endpoint"]
+)
+CIRCUIT_STATE = Gauge(
+    "endee_circuit_state",
+    "Circuit breaker state (0 = closed, 1 = half-open, 2 = open)",
+    ["name"]
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "endee_circuit_transitions_total",
+    "Circuit breaker state changes by the state entered",
+    ["name", "state"]
+)
+INSERT_BATCH_SIZE = Histogram(
+    "vector_insert_batch_size",
+    "Vectors per batch_insert call",
+    buckets=BATCH_SIZE_BUCKETS
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts, latency and in-flight gauges
+    
+    Only the given paths get their own label (everything else is "other"),
+    which keeps label cardinality bounded. Being plain ASGI, it leaves
+    streaming request and response bodies untouched.
+    """
+    
+    def __init__(self, app, paths: Sequence[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"] if scope["path"] in self.paths else "other"
+        status = [500]
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc(path)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(path)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, path)
+            HTTP_REQUESTS.inc(path, str(status[0]))
@@ -0,0 +1,138 @@
+"""
+Classification Result Cache
+Bounded TTL + LRU cache of classify() results, keyed on normalized ticket
+text and top_k, and invalidated whenever the index changes
+"""
+
+import os
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+from src.embedding_cache import normalize_text
+
+
+class ResultCache:
+    """TTL and size bounded result cache with index-version invalidation"""
+    
+    def __init__(
+        self,
+        version_fn: Callable[[], Hashable],
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize cache
+        
+        Args:
+            version_fn: Returns the current index version; any change clears the cache
+            max_entries: Max cached results (default: RESULT_CACHE_SIZE or 5000, 0 disables)
+            ttl_seconds: Result lifetime (default: RESULT_CACHE_TTL or 300)
+        """
+        self.version_fn = version_fn
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("RESULT_CACHE_SIZE", "5000"))
+        self.ttl = ttl_seconds if ttl_seconds is not None else float(os.getenv("RESULT_CACHE_TTL", "300"))
+        
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = version_fn()
+        
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+    
+    def version(self) -> Hashable:
+        """The current index version; capture it before computing a result and pass it to put"""
+        return self.version_fn()
+    
+    def _check_version(self):
+        version = self.version_fn()
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+            self.invalidations += 1
+    
+    def get(self, text: str, top_k: int) -> Optional[Dict]:
+        """
+        Look up a cached classification
+        
+        Args:
+            text: Ticket text
+            top_k: top_k the result was computed with
+        
+        Returns:
+            A copy of the cached result, or None
+        """
+        if self.max_entries <= 0:
+            return None
+        key = (normalize_text(text), top_k)
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(result)
+    
+    def put(self, text: str, top_k: int, result: Dict, version: Optional[Hashable] = None):
+        """
+        Cache a classification
+        
+        Args:
+            text: Ticket text
+            top_k: top_k the result was computed with
+            result: Classification result
+            version: version() from before the result was computed; if the
+                index changed since, the result may be stale and is dropped
+        """
+        if self.max_entries <= 0:
+            return
+        key = (normalize_text(text), top_k)
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._check_version()
+            if version is not None and version != self._version:
+                self.stale_puts += 1
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+    
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dict with size, hit/miss counts, hit rate and invalidations
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts
+        }
@@ -0,0 +1,181 @@
+"""
+Production Server
+Preloads the encoder in a parent process and forks API workers that share
+its weights copy-on-write and accept connections on one listening socket
+"""
+
+import os
+import gc
+import sys
+import time
+import signal
+import multiprocessing
+from typing import List, Optional
+import uvicorn
+
+# Set in every worker; src/api.py exits on a failed startup only when supervised
+SUPERVISED_ENV = "API_SUPERVISED"
+
+# Thread-pool settings read by BLAS/OpenMP when torch or NumPy is imported
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+# Seconds a worker gets to finish in-flight requests on shutdown
+SHUTDOWN_TIMEOUT = 30
+
+# Restart delay after a worker exits, doubled per consecutive rapid exit up to the max
+RESTART_BACKOFF_SECONDS = 1.0
+MAX_RESTART_BACKOFF_SECONDS = 60.0
+
+# A worker that exits within MIN_HEALTHY_UPTIME seconds failed rapidly; a slot
+# stops restarting after MAX_RAPID_FAILURES of those in a row
+MIN_HEALTHY_UPTIME = 30.0
+MAX_RAPID_FAILURES = 5
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity/cgroup pinning)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    """Worker count: API_WORKERS, else one per available CPU"""
+    return int(os.getenv("API_WORKERS", "0")) or available_cpus()
+
+
+def limit_threads(threads: int):
+    """
+    Cap math-library threads so workers don't oversubscribe cores
+    
+    Must run before torch/NumPy are imported; explicit env settings win.
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+    os.environ.setdefault("ONNX_THREADS", str(threads))
+    # One in-flight encode batch per worker; parallelism comes from the workers
+    os.environ.setdefault("ENCODER_WORKERS", "1")
+
+
+def _run_worker(config: uvicorn.Config, sock, threads: int):
+    """Worker entry point (runs in the forked child)"""
+    # Let uvicorn install its own graceful-shutdown handlers
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    
+    # A worker whose classifier fails to load exits so this supervisor restarts it
+    os.environ[SUPERVISED_ENV] = "1"
+    
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+    
+    # The classifier (Endee pool, caches, encoder threads) is built per
+    # worker by the app's startup handler; only the weights are inherited
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = None, log_level: str = "info"):
+    """
+    Run the API with N forked workers sharing one preloaded model
+    
+    Workers that exit are restarted with exponential backoff per slot.
+    A slot whose workers keep dying right after start is given up on,
+    and once every slot has given up the server exits with status 1.
+    
+    Args:
+        host: Interface to bind
+        port: Port to bind
+        workers: Worker processes (default: API_WORKERS or the CPU count)
+        log_level: uvicorn log level
+    """
+    workers = workers or default_workers()
+    threads = max(1, available_cpus() // workers)
+    limit_threads(threads)
+    
+    # Heavy imports happen only after the thread limits are in place
+    from src.encoders import preload_encoder
+    
+    print(f"🚀 Starting {workers} workers ({threads} threads each) on {host}:{port}")
+    started = time.time()
+    if preload_encoder():
+        print(f"  ✓ Model preloaded in parent ({time.time() - started:.1f}s)")
+    else:
+        print("  ℹ️  Encoder backend is loaded per worker (not fork-safe)")
+    
+    config = uvicorn.Config("src.api:app", host=host, port=port, log_level=log_level)
+    config.load()  # import the app once so workers inherit it
+    sock = config.bind_socket()
+    
+    # Keep the inherited heap out of GC passes so workers don't touch
+    # (and thereby copy) pages that only hold shared objects
+    gc.collect()
+    gc.freeze()
+    
+    context = multiprocessing.get_context("fork")
+    
+    def spawn() -> multiprocessing.Process:
+        process = context.Process(target=_run_worker, args=(config, sock, threads), daemon=False)
+        process.start()
+        return process
+    
+    # Per slot: the worker (None while waiting to restart or given up),
+    # when it started, its consecutive rapid failures and when to restart it
+    processes: List[Optional[multiprocessing.Process]] = [spawn() for _ in range(workers)]
+    started_at = [time.monotonic()] * workers
+    rapid_failures = [0] * workers
+    restart_at: List[Optional[float]] = [None] * workers
+    stopping = False
+    failed = False
+    
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+    
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    
+    # Supervise: replace workers that die unexpectedly, backing off per slot
+    while not stopping:
+        now = time.monotonic()
+        for i, process in enumerate(processes):
+            if stopping:
+                break
+            if process is None:
+                if restart_at[i] is not None and now >= restart_at[i]:
+                    processes[i], started_at[i], restart_at[i] = spawn(), now, None
+                continue
+            if process.is_alive():
+                continue
+            
+            if now - started_at[i] < MIN_HEALTHY_UPTIME:
+                rapid_failures[i] += 1
+            else:
+                rapid_failures[i] = 0
+            processes[i] = None
+            if rapid_failures[i] >= MAX_RAPID_FAILURES:
+                print(f"❌ Worker {process.pid} exited ({process.exitcode}); slot {i} failed "
+                      f"{rapid_failures[i]} times in a row, not restarting it")
+                continue
+            delay = min(RESTART_BACKOFF_SECONDS * 2 ** max(rapid_failures[i] - 1, 0), MAX_RESTART_BACKOFF_SECONDS)
+            restart_at[i] = now + delay
+            print(f"⚠️  Worker {process.pid} exited ({process.exitcode}), restarting in {delay:g}s")
+        
+        if all(process is None and restart_at[i] is None for i, process in enumerate(processes)):
+            print("❌ Every worker slot gave up after repeated startup failures")
+            stopping = failed = True
+        time.sleep(0.5)
+    
+    print("\n🛑 Shutting down workers...")
+    running = [process for process in processes if process is not None]
+    for process in running:
+        if process.is_alive():
+            process.terminate()
+    deadline = time.time() + SHUTDOWN_TIMEOUT
+    for process in running:
+        process.join(max(0.0, deadline - time.time()))
+        if process.is_alive():
+            process.kill()
+            process.join()
+    sock.close()
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,306 @@
+"""
+Corpus Snapshots
+Versioned on-disk snapshot of the indexed tickets and their embeddings,
+so an index can be rebuilt (or shipped to another environment) with bulk
+I/O only: no JSON parsing of the corpus and no model load.
+
+A snapshot is a directory:
+    
+    manifest.json     format version, counts, dimension, model, label vocab, file checksums
+    embeddings.npy    float32 (n, dim) matrix, memory-mappable
+    ids.npy           vector ids (fixed-width unicode)
+    category.npy      uint16 category code per row (names in the manifest)
+    priority.npy      uint16 priority code per row
+    text_offsets.npy  uint64 (n + 1) byte offsets into texts.bin
+    texts.bin         UTF-8 ticket texts, back to back
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from src.metadata_store import DEFAULT_CATEGORY, DEFAULT_PRIORITY
+
+SNAPSHOT_FORMAT = "endee-ticket-snapshot"
+SNAPSHOT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_FILES = ("embeddings.npy", "ids.npy", "category.npy", "priority.npy", "text_offsets.npy", "texts.bin")
+
+# Bytes per read when copying or hashing snapshot files
+COPY_BUFFER_SIZE = 1 << 20
+
+# Ids converted per chunk when turning the scratch id list into ids.npy
+ID_CHUNK_ROWS = 65536
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SnapshotWriter:
+    """
+    Streams tickets into a new snapshot directory
+    
+    Rows are appended in batches to scratch files (vectors, ids, label
+    codes and text offsets alike), so memory stays bounded by one batch
+    plus the label vocabularies; close() turns them into .npy arrays and
+    writes the manifest last, which makes a snapshot without a manifest
+    incomplete.
+    """
+    
+    def __init__(self, path: str, model_id: str, metric: str = "cosine"):
+        """
+        Start a snapshot
+        
+        Args:
+            path: Snapshot directory (must not exist, or be empty)
+            model_id: Encoder identity the embeddings were made with (see model_identity)
+            metric: Distance metric the embeddings are meant for
+        """
+        if os.path.isdir(path) and os.listdir(path):
+            raise FileExistsError(f"Snapshot directory {path} is not empty")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.model_id = model_id
+        self.metric = metric
+        self.dimension: Optional[int] = None
+        self.count = 0
+        
+        self.categories: List[str] = []
+        self.priorities: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self._priority_codes: Dict[str, int] = {}
+        self._id_width = 1
+        self._text_bytes = 0
+        
+        self._texts_file = open(os.path.join(path, "texts.bin"), "wb")
+        # Raw rows per .npy file, prefixed with a header on close
+        self._scratch = {
+            name: open(os.path.join(path, f"{name}.tmp"), "wb")
+            for name in ("embeddings.npy", "ids.npy", "category.npy", "priority.npy", "text_offsets.npy")
+        }
+        self._scratch["text_offsets.npy"].write(np.zeros(1, dtype="<u8").tobytes())
+    
+    @staticmethod
+    def _codes(values: List[str], names: List[str], codes: Dict[str, int]) -> np.ndarray:
+        """Intern labels, extending names with any new ones"""
+        result = np.fromiter(
+            (codes.setdefault(value, len(codes)) for value in values),
+            dtype=np.uint16, count=len(values)
+        )
+        names.extend(list(codes)[len(names):])
+        return result
+    
+    def add(self, ids: List[str], vectors, metadatas: List[Dict]):
+        """
+        Append a batch of tickets
+        
+        Args:
+            ids: Vector id per ticket
+            vectors: Embeddings, shape (n, dim)
+            metadatas: Metadata dict per ticket (category, priority, text)
+        """
+        vectors = np.ascontiguousarray(vectors, dtype="<f4").reshape(len(ids), -1)
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dim vectors, got {vectors.shape[1]}")
+        
+        category = self._codes(
+            [m.get("category") or DEFAULT_CATEGORY for m in metadatas], self.categories, self._category_codes
+        )
+        priority = self._codes(
+            [m.get("priority") or DEFAULT_PRIORITY for m in metadatas], self.priorities, self._priority_codes
+        )
+        encoded = [str(m.get("text", "")).encode("utf-8") for m in metadatas]
+        lengths = np.fromiter((len(text) for text in encoded), dtype=np.uint64, count=len(encoded))
+        
+        ids = [str(vector_id) for vector_id in ids]
+        offsets = np.uint64(self._text_bytes) + np.cumsum(lengths, dtype=np.uint64)
+        self._texts_file.write(b"".join(encoded))
+        self._scratch["embeddings.npy"].write(vectors.tobytes())
+        # Ids are newline-separated until close() knows the widest one
+        self._scratch["ids.npy"].write("".join(f"{vector_id}\n" for vector_id in ids).encode("utf-8"))
+        self._scratch["category.npy"].write(category.astype("<u2").tobytes())
+        self._scratch["priority.npy"].write(priority.astype("<u2").tobytes())
+        self._scratch["text_offsets.npy"].write(offsets.astype("<u8").tobytes())
+        self._text_bytes += int(lengths.sum())
+        self._id_width = max([self._id_width] + [len(vector_id) for vector_id in ids])
+        self.count += len(ids)
+    
+    def _write_array(self, name: str, descr: str, shape: Tuple[int, ...]):
+        """Prefix a scratch file's raw rows with an .npy header (one streaming copy)"""
+        raw_path = os.path.join(self.path, f"{name}.tmp")
+        with open(os.path.join(self.path, name), "wb") as out:
+            np.lib.format.write_array_header_1_0(out, {"descr": descr, "fortran_order": False, "shape": shape})
+            with open(raw_path, "rb") as raw:
+                shutil.copyfileobj(raw, out, COPY_BUFFER_SIZE)
+        os.remove(raw_path)
+    
+    def _write_ids(self):
+        """Convert the scratch id lines to a fixed-width unicode .npy, a chunk at a time"""
+        raw_path = os.path.join(self.path, "ids.npy.tmp")
+        descr = f"<U{self._id_width}"
+        with open(os.path.join(self.path, "ids.npy"), "wb") as out, \
+                open(raw_path, "r", encoding="utf-8", newline="\n") as raw:
+            np.lib.format.write_array_header_1_0(out, {"descr": descr, "fortran_order": False, "shape": (self.count,)})
+            chunk = []
+            for line in raw:
+                chunk.append(line[:-1])
+                if len(chunk) == ID_CHUNK_ROWS:
+                    out.write(np.array(chunk, dtype=descr).tobytes())
+                    chunk = []
+            if chunk:
+                out.write(np.array(chunk, dtype=descr).tobytes())
+        os.remove(raw_path)
+    
+    def close(self, source: Optional[str] = None) -> Dict:
+        """
+        Finish the snapshot
+        
+        Args:
+            source: Where the tickets came from (recorded in the manifest)
+        
+        Returns:
+            The manifest
+        """
+        self._texts_file.close()
+        for scratch in self._scratch.values():
+            scratch.close()
+        self._write_array("embeddings.npy", "<f4", (self.count, self.dimension or 0))
+        self._write_ids()
+        self._write_array("category.npy", "<u2", (self.count,))
+        self._write_array("priority.npy", "<u2", (self.count,))
+        self._write_array("text_offsets.npy", "<u8", (self.count + 1,))
+        
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "source": source,
+            "count": self.count,
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "model": self.model_id,
+            "categories": self.categories,
+            "priorities": self.priorities,
+            "files": {
+                name: {
+                    "bytes": os.path.getsize(os.path.join(self.path, name)),
+                    "sha256": _sha256(os.path.join(self.path, name))
+                }
+                for name in SNAPSHOT_FILES
+            }
+        }
+        tmp_path = os.path.join(self.path, f"{MANIFEST_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST_FILE))
+        return manifest
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot directory"""
+    
+    def __init__(self, path: str):
+        """
+        Open a snapshot
+        
+        Args:
+            path: Snapshot directory written by SnapshotWriter
+        
+        Raises:
+            ValueError: If the directory is not a complete snapshot of a supported version
+        """
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise ValueError(f"{path} has no {MANIFEST_FILE} (not a snapshot, or an unfinished one)")
+        with open(manifest_path, "r") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a ticket snapshot")
+        if self.manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Snapshot version {self.manifest.get('version')} is not supported (expected {SNAPSHOT_VERSION})"
+            )
+        for name, info in self.manifest["files"].items():
+            size = os.path.getsize(os.path.join(path, name))
+            if size != info["bytes"]:
+                raise ValueError(f"{name} is {size} bytes, manifest says {info['bytes']} (truncated copy?)")
+        
+        self.path = path
+        self.count = self.manifest["count"]
+        self.dimension = self.manifest["dimension"]
+        self.categories = self.manifest["categories"]
+        self.priorities = self.manifest["priorities"]
+        
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, name), mmap_mode="r")
+        
+        self.embeddings = load("embeddings.npy")
+        self.ids = load("ids.npy")
+        self.category = load("category.npy")
+        self.priority = load("priority.npy")
+        self.text_offsets = load("text_offsets.npy")
+        # np.memmap refuses empty files
+        if self.manifest["files"]["texts.bin"]["bytes"]:
+            self._texts = np.memmap(os.path.join(path, "texts.bin"), dtype=np.uint8, mode="r")
+        else:
+            self._texts = np.zeros(0, dtype=np.uint8)
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def verify(self) -> List[str]:
+        """
+        Check every file against its manifest checksum
+        
+        Returns:
+            Names of files whose contents don't match (empty if the snapshot is intact)
+        """
+        return [
+            name for name, info in self.manifest["files"].items()
+            if _sha256(os.path.join(self.path, name)) != info["sha256"]
+        ]
+    
+    def texts(self, start: int, stop: int) -> List[str]:
+        """Ticket texts of rows [start, stop)"""
+        offsets = self.text_offsets[start:stop + 1]
+        blob = self._texts[int(offsets[0]):int(offsets[-1])].tobytes()
+        base = int(offsets[0])
+        return [
+            blob[int(begin) - base:int(end) - base].decode("utf-8")
+            for begin, end in zip(offsets[:-1], offsets[1:])
+        ]
+    
+    def metadatas(self, start: int, stop: int) -> List[Dict]:
+        """Metadata dicts (category, priority, text) of rows [start, stop)"""
+        return [
+            {"category": self.categories[category], "priority": self.priorities[priority], "text": text}
+            for category, priority, text in zip(
+                self.category[start:stop], self.priority[start:stop], self.texts(start, stop)
+            )
+        ]
+    
+    def iter_batches(self, batch_size: int = 500, start: int = 0) -> Iterator[Tuple[List[str], np.ndarray, List[Dict]]]:
+        """
+        Walk the snapshot in row order
+        
+        Args:
+            batch_size: Rows per batch
+            start: First row (to resume an interrupted restore)
+        
+        Yields:
+            (ids, embeddings view of shape (n, dim), metadatas) per batch
+        """
+        for begin in range(start, self.count, batch_size):
+            end = min(begin + batch_size, self.count)
+            yield self.ids[begin:end].tolist(), self.embeddings[begin:end], self.metadatas(begin, end)
@@ -0,0 +1,267 @@
+"""
+Vector Codecs
+Compressed in-memory copies of the local index vectors: float16 (2x
+smaller) and product quantization (PQ, 32x smaller at the default 48
+subvectors). Search scores queries against the codes directly with
+asymmetric distance computation (the query stays float32, only the
+stored vectors are approximated); LocalIndex then rescores the best
+candidates exactly from the float32 file.
+
+Product quantization splits each vector into `subvectors` slices and
+replaces every slice by the id (one byte) of its nearest k-means
+centroid in that slice's codebook. A query builds one lookup table of
+query-slice x centroid similarities per slice, and a stored vector's
+score is the sum of its table entries.
+"""
+
+import os
+from typing import Optional
+import numpy as np
+
+VECTOR_CODECS = ("float32", "float16", "pq")
+
+# Float32 elements materialized per scoring chunk (bounds scratch memory)
+CHUNK_ELEMENTS = 1 << 22
+
+# Codes per ADC chunk (keeps the transposed code columns in cache)
+PQ_CHUNK_ROWS = 16384
+
+
+def _chunk_rows(row_elements: int) -> int:
+    return max(256, CHUNK_ELEMENTS // max(row_elements, 1))
+
+
+class Float16Codec:
+    """Half-precision copy of each vector; scored with float32 matrix products, chunk by chunk"""
+    
+    name = "float16"
+    trained = True
+    
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.code_shape = (dimension,)
+        self.code_dtype = np.float16
+    
+    @property
+    def bytes_per_vector(self) -> int:
+        return 2 * self.dimension
+    
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float32).astype(np.float16)
+    
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32)
+    
+    def scores(self, codes: np.ndarray, queries: np.ndarray, metric: str) -> np.ndarray:
+        """
+        Approximate similarity of every code to every query
+        
+        Args:
+            codes: Encoded vectors, shape (n, dim)
+            queries: Float32 queries, shape (q, dim)
+            metric: cosine, ip or l2 (l2 scores are negative squared distances)
+        
+        Returns:
+            Scores of shape (n, q)
+        """
+        similarity = np.empty((len(codes), len(queries)), dtype=np.float32)
+        step = _chunk_rows(self.dimension)
+        for start in range(0, len(codes), step):
+            chunk = codes[start:start + step].astype(np.float32)
+            block = chunk @ queries.T
+            if metric == "l2":
+                block = 2 * block - np.einsum("ij,ij->i", chunk, chunk)[:, None] \
+                    - np.einsum("ij,ij->i", queries, queries)[None, :]
+            similarity[start:start + step] = block
+        return similarity
+
+
+class PQCodec:
+    """Product quantizer with one 256-centroid codebook per subvector (one byte per subvector)"""
+    
+    name = "pq"
+    
+    def __init__(
+        self,
+        dimension: int,
+        subvectors: Optional[int] = None,
+        centroids: int = 256,
+        iterations: int = 15
+    ):
+        """
+        Initialize an untrained quantizer
+        
+        Args:
+            dimension: Vector dimension
+            subvectors: Slices per vector, must divide dimension
+                (default: LOCAL_INDEX_PQ_SUBVECTORS or 48); also the bytes per vector
+            centroids: Codebook size per slice (at most 256, codes are uint8)
+            iterations: k-means iterations when training
+        
+        Raises:
+            ValueError: If subvectors doesn't divide dimension or centroids > 256
+        """
+        if subvectors is None:
+            subvectors = int(os.getenv("LOCAL_INDEX_PQ_SUBVECTORS", "48"))
+        if subvectors <= 0 or dimension % subvectors:
+            raise ValueError(f"PQ subvectors ({subvectors}) must divide the dimension ({dimension})")
+        if not 1 <= centroids <= 256:
+            raise ValueError(f"PQ centroids must be between 1 and 256, got {centroids}")
+        self.dimension = dimension
+        self.subvectors = subvectors
+        self.subdimension = dimension // subvectors
+        self.centroids = centroids
+        self.iterations = iterations
+        self.code_shape = (subvectors,)
+        self.code_dtype = np.uint8
+        # (subvectors, centroids, subdimension) once trained
+        self.codebook: Optional[np.ndarray] = None
+    
+    @property
+    def trained(self) -> bool:
+        return self.codebook is not None
+    
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.subvectors
+    
+    def _slices(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, dim) -> (subvectors, n, subdimension)"""
+        return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.subvectors, self.subdimension) \
+            .transpose(1, 0, 2)
+    
+    @staticmethod
+    def _nearest(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """Index of the nearest center for every point (squared L2)"""
+        distances = np.einsum("ij,ij->i", centers, centers)[None, :] - 2 * points @ centers.T
+        return np.argmin(distances, axis=1)
+    
+    def train(self, vectors: np.ndarray, seed: int = 0):
+        """
+        Learn the codebooks with k-means on each slice
+        
+        Args:
+            vectors: Training sample, shape (n, dim); n should be well above centroids
+            seed: Seed for the centroid initialization
+        """
+        rng = np.random.default_rng(seed)
+        slices = self._slices(vectors)
+        count = slices.shape[1]
+        k = min(self.centroids, count)
+        codebook = np.zeros((self.subvectors, self.centroids, self.subdimension), dtype=np.float32)
+        for s in range(self.subvectors):
+            points = slices[s]
+            centers = points[rng.choice(count, k, replace=False)].copy()
+            for _ in range(self.iterations):
+                assignment = self._nearest(points, centers)
+                sizes = np.bincount(assignment, minlength=k)
+                sums = np.stack([
+                    np.bincount(assignment, weights=points[:, d], minlength=k)
+                    for d in range(self.subdimension)
+                ], axis=1)
+                filled = sizes > 0
+                centers[filled] = sums[filled] / sizes[filled, None]
+                # Re-seed empty clusters from random points
+                empty = np.flatnonzero(~filled)
+                if len(empty):
+                    centers[empty] = points[rng.choice(count, len(empty), replace=False)]
+            codebook[s, :k] = centers
+            # Unused codebook entries (tiny samples) are copies, never nearer than a real centroid
+            codebook[s, k:] = centers[0]
+        self.codebook = codebook
+    
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest centroid id per slice, shape (n, subvectors) uint8"""
+        slices = self._slices(vectors)
+        codes = np.empty((slices.shape[1], self.subvectors), dtype=np.uint8)
+        for s in range(self.subvectors):
+            codes[:, s] = self._nearest(slices[s], self.codebook[s])
+        return codes
+    
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstruct (approximate) float32 vectors from codes"""
+        parts = self.codebook[np.arange(self.subvectors)[None, :], codes.astype(np.intp)]
+        return parts.reshape(len(codes), self.dimension)
+    
+    def lookup_tables(self, queries: np.ndarray, metric: str) -> np.ndarray:
+        """
+        Per-slice query x centroid similarities
+        
+        Returns:
+            Tables of shape (subvectors, centroids, q): entry [s, c] is what
+            centroid c of slice s contributes to each query's score
+        """
+        slices = self._slices(queries)  # (subvectors, q, subdimension)
+        tables = np.einsum("scd,sqd->scq", self.codebook, slices)
+        if metric == "l2":
+            tables = 2 * tables - np.einsum("scd,scd->sc", self.codebook, self.codebook)[:, :, None] \
+                - np.einsum("sqd,sqd->sq", slices, slices)[:, None, :]
+        return np.ascontiguousarray(tables, dtype=np.float32)
+    
+    def scores(self, codes: np.ndarray, queries: np.ndarray, metric: str) -> np.ndarray:
+        """
+        Asymmetric distance computation: sum of lookup-table entries per code
+        
+        Args:
+            codes: Encoded vectors, shape (n, subvectors)
+            queries: Float32 queries, shape (q, dim)
+            metric: cosine, ip or l2 (l2 scores are negative squared distances)
+        
+        Returns:
+            Scores of shape (n, q)
+        """
+        tables = self.lookup_tables(queries, metric)
+        similarity = np.empty((len(codes), len(queries)), dtype=np.float32)
+        step = min(PQ_CHUNK_ROWS, _chunk_rows(len(queries)))
+        for start in range(0, len(codes), step):
+            # One contiguous code column per slice, then one table lookup per slice
+            columns = np.ascontiguousarray(codes[start:start + step].T)
+            block = np.take(tables[0], columns[0], axis=0)
+            for s in range(1, self.subvectors):
+                block += np.take(tables[s], columns[s], axis=0)
+            similarity[start:start + step] = block
+        return similarity
+    
+    def save(self, path: str):
+        """Atomically write the trained codebook (.npy)"""
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, self.codebook)
+        os.replace(tmp_path, path)
+    
+    def load(self, path: str) -> bool:
+        """
+        Read a codebook written by save
+        
+        Returns:
+            False if the file is missing or was trained with other settings
+        """
+        if not os.path.exists(path):
+            return False
+        codebook = np.load(path)
+        if codebook.shape != (self.subvectors, self.centroids, self.subdimension):
+            return False
+        self.codebook = codebook.astype(np.float32)
+        return True
+
+
+def create_codec(name: str, dimension: int):
+    """
+    Build the codec for a locally held vector matrix
+    
+    Args:
+        name: float32, float16 or pq
+        dimension: Vector dimension
+    
+    Returns:
+        Float16Codec, PQCodec, or None for float32 (vectors are used as stored)
+    
+    Raises:
+        ValueError: On an unknown codec name
+    """
+    if name not in VECTOR_CODECS:
+        raise ValueError(f"Unknown vector codec '{name}' (expected {', '.join(VECTOR_CODECS)})")
+    if name == "float16":
+        return Float16Codec(dimension)
+    if name == "pq":
+        return PQCodec(dimension)
+    return None
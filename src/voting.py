@@ -0,0 +1,57 @@
+"""
+Voting
+Similarity-weighted kNN voting used to turn search results into a label
+with a confidence and a margin over the runner-up
+"""
+
+from typing import List, Tuple
+import numpy as np
+
+VOTE_WEIGHTINGS = ("softmax", "distance", "uniform")
+
+
+def vote_weights(scores: np.ndarray, weighting: str = "softmax", temperature: float = 0.1) -> np.ndarray:
+    """
+    Weight neighbours by similarity
+    
+    Args:
+        scores: Similarity of each neighbour to the query (higher is closer)
+        weighting: "softmax" (exp(score / temperature)), "distance"
+            (1 / (1 - score)) or "uniform" (plain majority vote)
+        temperature: Softmax temperature; lower trusts the closest neighbours more
+    
+    Returns:
+        Non-negative weight per neighbour
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if weighting == "softmax":
+        return np.exp((scores - scores.max()) / max(temperature, 1e-6))
+    if weighting == "distance":
+        return 1.0 / np.maximum(1.0 - scores, 1e-6)
+    if weighting == "uniform":
+        return np.ones_like(scores)
+    raise ValueError(f"Unknown VOTE_WEIGHTING '{weighting}' (expected {', '.join(VOTE_WEIGHTINGS)})")
+
+
+def weighted_vote(labels: List[str], weights: np.ndarray) -> Tuple[str, float, float]:
+    """
+    Pick the label with the most weight
+    
+    Ties go to the label seen first (i.e. the closer neighbour).
+    
+    Args:
+        labels: Label of each neighbour, closest first
+        weights: Weight of each neighbour (from vote_weights)
+    
+    Returns:
+        (winning label, its share of the total weight, share margin over the runner-up)
+    """
+    codes = {}
+    inverse = np.fromiter((codes.setdefault(label, len(codes)) for label in labels), dtype=np.intp, count=len(labels))
+    totals = np.bincount(inverse, weights=weights, minlength=len(codes))
+    shares = totals / max(totals.sum(), 1e-12)
+    
+    order = np.argsort(-shares, kind="stable")
+    winner = int(order[0])
+    runner_up = float(shares[order[1]]) if len(order) > 1 else 0.0
+    return list(codes)[winner], float(shares[winner]), float(shares[winner]) - runner_up
@@ -0,0 +1,138 @@
+"""
+Shared Test Fixtures
+Temp-dir metadata stores, an in-process fake Endee server and a hashing
+stand-in for MiniLM, so the suite runs without Endee, a model download or
+any state outside tmp_path
+"""
+
+import json
+import time
+import hashlib
+import pytest
+import numpy as np
+import src.classifier
+from src.fake_endee import FakeEndee
+from src.local_index import LocalIndex
+from src.metadata_store import MetadataStore
+
+SAMPLE_TICKETS = "./data/sample_tickets.json"
+
+
+class HashEncoder:
+    """Deterministic bag-of-words encoder with the SentenceTransformer subset the project uses"""
+    
+    def __init__(self, dimension: int = 64):
+        self.dimension = dimension
+        self.calls = []
+        self.delay = 0.0
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+    
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs):
+        texts = [sentences] if isinstance(sentences, str) else list(sentences)
+        self.calls.append(texts)
+        time.sleep(self.delay)
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimension] += 1.0
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors[0] if isinstance(sentences, str) else vectors
+
+
+@pytest.fixture(autouse=True)
+def isolated_env(tmp_path, monkeypatch):
+    """Keep every default path inside tmp_path and make retries instant"""
+    monkeypatch.setenv("METADATA_STORE_PATH", str(tmp_path / "metadata"))
+    monkeypatch.setenv("LOCAL_INDEX_PATH", str(tmp_path / "local_index"))
+    monkeypatch.setenv("EMBED_CACHE_PATH", "")
+    monkeypatch.setenv("ENDEE_RETRY_BACKOFF", "0")
+
+
+@pytest.fixture
+def metadata_store(tmp_path):
+    store = MetadataStore(str(tmp_path / "metadata"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def fake_endee(monkeypatch):
+    """A FakeEndee served on a free localhost port, with ENDEE_HOST pointing at it"""
+    fake = FakeEndee()
+    monkeypatch.setenv("ENDEE_HOST", fake.start())
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    """The HashEncoder every TicketClassifier built in the test loads"""
+    encoder = HashEncoder()
+    monkeypatch.setattr(src.classifier, "load_encoder", lambda model_path: (encoder, "hash-encoder"))
+    return encoder
+
+
+@pytest.fixture
+def sample_tickets():
+    with open(SAMPLE_TICKETS) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def make_classifier(encoder, sample_tickets, monkeypatch):
+    """Build TicketClassifiers on the local engine with the sample tickets indexed"""
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    monkeypatch.setenv("ENCODER_WORKERS", "1")
+    ticket_classifier = src.classifier.TicketClassifier
+    built = []
+    
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        if not built:
+            store = MetadataStore()
+            texts = [ticket["text"] for ticket in sample_tickets]
+            LocalIndex(metadata_store=store).batch_insert(
+                "support_tickets", encoder.encode(texts, normalize_embeddings=True), sample_tickets
+            )
+            store.close()
+        classifier = ticket_classifier()
+        encoder.calls.clear()
+        built.append(classifier)
+        return classifier
+    
+    yield make
+    for classifier in built:
+        classifier._encode_executor.shutdown(wait=True)
+        if classifier._cache_io_executor is not None:
+            classifier._cache_io_executor.shutdown(wait=True)
+        classifier.embedding_cache.close()
+        classifier.metadata.close()
+
+
+@pytest.fixture
+def api_client(make_classifier, monkeypatch):
+    """A TestClient for src.api whose startup builds a make_classifier() classifier"""
+    from fastapi.testclient import TestClient
+    import src.api as api
+    
+    monkeypatch.setattr(api, "startup", api._Startup())
+    monkeypatch.setattr(api, "WARMUP_QUERIES", 1)
+    monkeypatch.setattr(src.classifier, "TicketClassifier", lambda: make_classifier())
+    
+    def start(wait_ready: bool = True) -> TestClient:
+        client = TestClient(api.app)
+        client.__enter__()
+        started.append(client)
+        deadline = time.monotonic() + 10
+        while wait_ready and api.startup.state == "starting" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return client
+    
+    started = []
+    yield start
+    for client in started:
+        client.__exit__(None, None, None)
@@ -0,0 +1,97 @@
+"""
+Admission Control Tests
+FIFO slot handoff, queue and deadline shedding, and cancellation of
+queued requests in AdmissionController
+"""
+
+import asyncio
+import pytest
+from src.admission import AdmissionController, AdmissionRejected
+
+
+async def hold(controller: AdmissionController, name: str, seconds: float, order: list):
+    async with controller.admit():
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+
+def test_slots_are_handed_to_waiters_in_arrival_order():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=10, deadline_ms=2000)
+        order = []
+        first = asyncio.create_task(hold(controller, "first", 0.05, order))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(hold(controller, f"waiter{i}", 0.0, order)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert controller.active == 1 and len(controller._waiters) == 3
+        await asyncio.gather(first, *waiters)
+        return controller, order
+    
+    controller, order = asyncio.run(run())
+    assert order == ["first", "waiter0", "waiter1", "waiter2"]
+    assert controller.active == 0
+    assert controller.admitted == 4
+
+
+def test_full_queue_is_rejected_with_429():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=0, deadline_ms=2000)
+        holder = asyncio.create_task(hold(controller, "holder", 0.05, []))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.admit():
+                pass
+        await holder
+        return controller, rejected.value
+    
+    controller, rejected = asyncio.run(run())
+    assert rejected.status_code == 429 and rejected.reason == "queue_full"
+    assert controller.shed["queue_full"] == 1
+    assert controller.active == 0
+
+
+def test_waiter_past_its_deadline_is_rejected_with_503():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=10, deadline_ms=50)
+        holder = asyncio.create_task(hold(controller, "holder", 0.2, []))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.admit():
+                pass
+        await holder
+        return controller, rejected.value
+    
+    controller, rejected = asyncio.run(run())
+    assert rejected.status_code == 503 and rejected.reason == "timeout"
+    assert rejected.retry_after >= 1
+    assert controller.active == 0 and not controller._waiters
+
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    async def run():
+        controller = AdmissionController(max_concurrency=1, max_queue=10, deadline_ms=2000)
+        order = []
+        holder = asyncio.create_task(hold(controller, "holder", 0.05, order))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(hold(controller, "cancelled", 0.0, order))
+        last = asyncio.create_task(hold(controller, "last", 0.0, order))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(holder, last)
+        return controller, order, cancelled
+    
+    controller, order, cancelled = asyncio.run(run())
+    assert cancelled.cancelled()
+    assert order == ["holder", "last"]
+    assert controller.active == 0
+
+
+def test_disabled_controller_admits_everything():
+    async def run():
+        controller = AdmissionController(max_concurrency=0, max_queue=0, deadline_ms=0)
+        order = []
+        await asyncio.gather(*(hold(controller, str(i), 0.01, order) for i in range(5)))
+        return controller, order
+    
+    controller, order = asyncio.run(run())
+    assert len(order) == 5 and controller.active == 0
@@ -0,0 +1,162 @@
+"""
+API Endpoint Tests
+Health and readiness probes around background startup, classification
+and NDJSON streaming, run through FastAPI's TestClient against the local
+engine
+"""
+
+import json
+import asyncio
+from unittest import mock
+import src.api as api
+import src.classifier
+from src.admission import AdmissionController
+
+
+def test_probes_report_ready_after_warm_up(api_client):
+    client = api_client()
+    
+    assert client.get("/health/live").json() == {"status": "alive"}
+    ready = client.get("/health/ready")
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+    assert {"import", "classifier", "warmup_encode", "total"} <= set(ready.json()["startup_seconds"])
+    assert client.get("/health").json() == {"status": "healthy", "classifier": "ready"}
+
+
+def test_unsupervised_load_failure_is_reported_not_fatal(api_client, monkeypatch):
+    def fail():
+        raise FileNotFoundError("model directory missing")
+    
+    monkeypatch.delenv("API_SUPERVISED", raising=False)
+    monkeypatch.setattr(src.classifier, "TicketClassifier", fail)
+    client = api_client()
+    
+    live = client.get("/health/live")
+    assert live.status_code == 503
+    assert live.json() == {"status": "failed", "error": "model directory missing"}
+    assert client.get("/health/ready").status_code == 503
+    assert client.post("/classify", json={"text": "I cannot log in to my account"}).status_code == 503
+
+
+def test_supervised_load_failure_exits_the_worker(api_client, monkeypatch):
+    exits = []
+    
+    def fail():
+        raise RuntimeError("boom")
+    
+    monkeypatch.setenv("API_SUPERVISED", "1")
+    monkeypatch.setattr(src.classifier, "TicketClassifier", fail)
+    monkeypatch.setattr(api.os, "_exit", exits.append)
+    api_client()
+    
+    assert exits == [1]
+
+
+def test_classify(api_client):
+    client = api_client()
+    
+    response = client.post("/classify", json={"text": "Cannot login, the password reset fails"})
+    
+    assert response.status_code == 200
+    assert response.json()["category"] == "Authentication"
+    assert response.json()["routing_team"] == "Security Team"
+    assert client.post("/classify", json={"text": "short"}).status_code == 422
+
+
+async def _lines(chunks, max_line_bytes):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+    return [line async for line in api._iter_lines(stream(), max_line_bytes)]
+
+
+def test_iter_lines_splits_across_chunk_boundaries():
+    chunks = [b'{"text": "a"}\n{"te', b'xt": "b"}', b"\n\n", b'"c"']
+    
+    assert asyncio.run(_lines(chunks, 64)) == [b'{"text": "a"}', b'{"text": "b"}', b"", b'"c"']
+
+
+def test_iter_lines_drops_long_lines_without_buffering_them():
+    buffered = []
+    
+    class Spy(bytearray):
+        def __iadd__(self, other):
+            result = super().__iadd__(other)
+            buffered.append(len(self))
+            return result
+    
+    chunks = [b"ok\n"] + [b"x" * 1000] * 50 + [b"\nafter\n", b"y" * 10]
+    with mock.patch.object(api, "bytearray", Spy, create=True):
+        lines = asyncio.run(_lines(chunks, 100))
+    
+    assert lines == [b"ok", None, b"after", b"y" * 10]
+    assert max(buffered) <= 100
+    assert asyncio.run(_lines([b"z" * 60, b"z" * 40 + b"\n"], 100)) == [b"z" * 100]
+
+
+def test_stream_answers_every_line_in_order(api_client):
+    client = api_client()
+    body = "\n".join([
+        json.dumps({"id": "t1", "text": "Cannot login, the password reset fails"}),
+        "not json",
+        json.dumps("I was charged twice for my subscription"),
+        json.dumps({"id": "t4", "text": "short"}),
+    ])
+    
+    response = client.post("/classify/stream", content=body, headers={"Content-Type": "application/x-ndjson"})
+    
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["line"] for item in items] == [1, 2, 3, 4]
+    assert items[0]["id"] == "t1" and items[0]["result"]["category"] == "Authentication"
+    assert items[1]["error"].startswith("Invalid JSON")
+    assert items[2]["result"]["category"] == "Billing"
+    assert items[3] == {"line": 4, "id": "t4", "error": "Ticket text must be 10-2000 characters"}
+
+
+def test_stream_chunks_go_through_admission(api_client, monkeypatch):
+    client = api_client()
+    full = AdmissionController(max_concurrency=1, max_queue=0)
+    full.active = 1  # the only slot is taken and nothing may queue
+    monkeypatch.setattr(api, "admission", full)
+    
+    response = client.post("/classify/stream", content=json.dumps("I was charged twice for my subscription"))
+    
+    assert response.status_code == 200
+    assert json.loads(response.text) == {
+        "line": 1, "id": None, "error": "Server overloaded (queue_full), retry later", "retry_after": 1
+    }
+    assert client.post("/classify", json={"text": "I was charged twice"}).status_code == 429
+    assert full.stats()["shed"]["queue_full"] == 2
+
+
+def test_batch_reports_invalid_items_individually(api_client):
+    client = api_client()
+    
+    response = client.post("/classify/batch", json={"texts": [
+        "Cannot login, the password reset fails", 42, "short", None, "I was charged twice for my subscription"
+    ], "top_k": 3})
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 3)
+    results = body["results"]
+    assert [item["index"] for item in results] == [0, 1, 2, 3, 4]
+    assert results[0]["result"]["category"] == "Authentication"
+    assert results[1]["error"] == results[3]["error"] == "Ticket text must be a string"
+    assert results[2]["error"] == "Ticket text must be 10-2000 characters"
+    assert results[4]["result"]["category"] == "Billing"
+    assert client.post("/classify/batch", json={"texts": []}).status_code == 422
+
+
+def test_batch_search_failures_are_reported_per_item(api_client, monkeypatch):
+    client = api_client()
+    
+    def fail(*args, **kwargs):
+        raise RuntimeError("index file unreadable")
+    monkeypatch.setattr(api.classifier.endee, "search_batch", fail)
+    
+    body = client.post("/classify/batch", json={"texts": ["My invoice total is wrong this month"]}).json()
+    
+    assert body["failed"] == 1
+    assert body["results"][0]["error"] == "index file unreadable"
@@ -0,0 +1,77 @@
+"""
+Embedding Batcher Tests
+Coalescing of concurrent encode calls into batched model calls, size and
+wait limits, and error propagation
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.batcher import EmbeddingBatcher
+
+
+class RecordingEncoder:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+    
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("encoder crashed")
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def run(batcher, texts):
+    async def encode_all():
+        try:
+            return await asyncio.gather(*(batcher.encode(text) for text in texts), return_exceptions=True)
+        finally:
+            await batcher.stop()
+    return asyncio.run(encode_all())
+
+
+def test_concurrent_calls_share_one_batch():
+    encoder = RecordingEncoder()
+    with ThreadPoolExecutor(1) as executor:
+        batcher = EmbeddingBatcher(encoder, executor, max_batch_size=32, max_wait_ms=50)
+        vectors = run(batcher, ["a", "bb", "ccc"])
+    
+    assert encoder.batches == [["a", "bb", "ccc"]]
+    assert [vector[0] for vector in vectors] == [1, 2, 3]  # each caller gets its own row
+    assert batcher.stats()["mean_batch_size"] == 3
+
+
+def test_batches_are_capped_at_max_batch_size():
+    encoder = RecordingEncoder()
+    with ThreadPoolExecutor(2) as executor:
+        batcher = EmbeddingBatcher(encoder, executor, max_batch_size=4, max_wait_ms=50, max_inflight_batches=2)
+        run(batcher, [f"text {i}" for i in range(10)])
+    
+    assert [len(batch) for batch in encoder.batches] == [4, 4, 2]
+    assert batcher.stats()["batch_size_histogram"]["<=4"] == 2
+
+
+def test_encoder_errors_reach_every_caller_of_the_batch():
+    with ThreadPoolExecutor(1) as executor:
+        batcher = EmbeddingBatcher(RecordingEncoder(fail=True), executor, max_wait_ms=20)
+        results = run(batcher, ["a", "b"])
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_lone_request_waits_at_most_max_wait():
+    encoder = RecordingEncoder()
+    
+    async def single():
+        with ThreadPoolExecutor(1) as executor:
+            batcher = EmbeddingBatcher(encoder, executor, max_batch_size=32, max_wait_ms=10)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await batcher.encode("alone")
+            elapsed = loop.time() - started
+            await batcher.stop()
+            return elapsed
+    
+    assert asyncio.run(single()) < 0.2
+    assert encoder.batches == [["alone"]]
@@ -0,0 +1,68 @@
+"""
+Centroid Tests
+CentroidIndex updates and persistence, and the classifier's two-stage
+prefilter following corpus changes made by other processes
+"""
+
+import time
+import numpy as np
+from src.centroids import CentroidIndex
+from src.local_index import LocalIndex
+from src.metadata_store import MetadataStore
+
+
+def test_add_remove_and_scores():
+    centroids = CentroidIndex()
+    centroids.add(np.eye(3)[:2], [{"category": "Billing"}, {"category": "Technical", "priority": "High"}])
+    
+    labels, scores = centroids.scores("category", np.eye(3)[:1])
+    assert labels == ["Billing", "Technical"]
+    assert scores.tolist() == [[1.0, 0.0]]
+    assert centroids.stats()["priority_counts"] == {"Medium": 1, "High": 1}
+    
+    centroids.remove(np.eye(3)[1:2], [{"category": "Technical", "priority": "High"}])
+    assert centroids.scores("category", np.eye(3)[:1])[0] == ["Billing"]
+    assert centroids.vectors == 1
+
+
+def test_save_and_load_check_the_state(tmp_path):
+    path = str(tmp_path / "centroids.npz")
+    centroids = CentroidIndex()
+    centroids.add(np.eye(2), [{"category": "Billing"}, {"category": "Technical"}])
+    centroids.save(path, {"model": "m", "generation": 7})
+    
+    loaded = CentroidIndex()
+    assert not loaded.load(path, {"model": "m", "generation": 8})
+    assert loaded.load(path, {"model": "m", "generation": 7})
+    assert loaded.stats() == centroids.stats()
+
+
+def test_prefilter_answers_clear_tickets_without_searching(make_classifier):
+    classifier = make_classifier(CENTROID_PREFILTER="true", CENTROID_MARGIN=0.0)
+    
+    result = classifier.classify("Cannot login to my account, forgot password")
+    
+    assert result["category"] == "Authentication"
+    assert result["similar_tickets"] == []
+    assert classifier.centroid_stats()["answered_by_centroids"] >= 1
+
+
+def test_centroids_follow_changes_from_other_processes(make_classifier, encoder, tmp_path):
+    classifier = make_classifier(CENTROID_PREFILTER="true", CENTROID_REFRESH_SECONDS=0)
+    assert classifier.centroid_stats()["vectors"] == 20
+    
+    # Another process (e.g. scripts/sync_tickets.py) indexes a new category
+    tickets = [{"text": f"parcel {i} never arrived, tracking stuck", "category": "Shipping"} for i in range(5)]
+    indexer = LocalIndex(classifier.endee.path, MetadataStore(classifier.metadata.path))
+    indexer.batch_insert(
+        "support_tickets", encoder.encode([t["text"] for t in tickets], normalize_embeddings=True), tickets
+    )
+    
+    classifier.classify("my parcel never arrived")  # notices the new generation
+    deadline = time.monotonic() + 5
+    while classifier.centroid_rebuilds == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    
+    assert classifier.centroid_stats()["category_counts"]["Shipping"] == 5
+    assert classifier.centroid_stats()["vectors"] == 25
+    assert classifier.centroid_stats()["rebuilds"] == 1
@@ -0,0 +1,64 @@
+"""
+Circuit Breaker Tests
+State transitions of CircuitBreaker: opening on consecutive failures,
+half-open probes and slow calls
+"""
+
+import time
+from src.circuit_breaker import CircuitBreaker
+
+
+def test_opens_after_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=2, slow_call_ms=100, reset_seconds=60)
+    
+    breaker.record_success(0.5)
+    breaker.record_success(0.5)
+    assert breaker.state == "open"
+
+
+def test_zero_threshold_never_opens():
+    breaker = CircuitBreaker(failure_threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow() and breaker.state == "closed"
@@ -0,0 +1,95 @@
+"""
+Embedding Cache Tests
+Memory and SQLite tiers, model scoping, and aclassify answering cache
+hits without queueing behind the encoder pool
+"""
+
+import time
+import asyncio
+import threading
+import numpy as np
+from src.embedding_cache import EmbeddingCache, model_identity
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache("model@4", path=path)
+    cache.put_many(["My invoice is wrong"], np.ones((1, 4)))
+    
+    assert np.array_equal(cache.get("my   INVOICE is wrong"), np.ones(4))
+    reopened = EmbeddingCache("model@4", path=path)
+    assert reopened.get("My invoice is wrong", memory_only=True) is None
+    assert np.array_equal(reopened.get("My invoice is wrong"), np.ones(4))
+    assert reopened.stats()["disk_hits"] == 1 and reopened.stats()["misses"] == 0
+    assert EmbeddingCache("other-model@4", path=path).get("My invoice is wrong") is None
+    cache.close()
+    reopened.close()
+
+
+def test_get_or_encode_encodes_each_missing_text_once():
+    cache = EmbeddingCache("model@2", path="")
+    cache.put("cached", np.array([1.0, 0.0]))
+    encoded = []
+    
+    def encode(texts):
+        encoded.append(texts)
+        return np.full((len(texts), 2), 2.0)
+    
+    vectors = cache.get_or_encode(["new", "cached", "new"], encode)
+    
+    assert encoded == [["new"]]
+    assert vectors.tolist() == [[2.0, 2.0], [1.0, 0.0], [2.0, 2.0]]
+    assert cache.stats()["misses"] == 2
+
+
+def test_model_identity_hashes_local_model_files(tmp_path):
+    class Model:
+        def get_sentence_embedding_dimension(self):
+            return 384
+    
+    (tmp_path / "config.json").write_text("{}")
+    (tmp_path / "model.safetensors").write_bytes(b"weights")
+    before = model_identity(str(tmp_path), Model())
+    (tmp_path / "model.safetensors").write_bytes(b"fine-tuned weights")
+    
+    assert before.startswith(f"{tmp_path}@384#")
+    assert model_identity(str(tmp_path), Model()) != before
+    assert model_identity("sentence-transformers/all-MiniLM-L6-v2", Model()).endswith("@384")
+
+
+def test_async_cache_hits_do_not_wait_for_the_encoder(make_classifier, encoder):
+    classifier = make_classifier()
+    classifier.embedding_cache.put("Cannot login", encoder.encode("Cannot login", normalize_embeddings=True))
+    
+    async def run():
+        # Occupy the single encoder thread with a slow encode
+        encoder.delay = 0.5
+        busy = threading.Event()
+        classifier._encode_executor.submit(lambda: (busy.set(), classifier._encode_texts(["slow batch"])))
+        busy.wait()
+        started = time.perf_counter()
+        result = await classifier.aclassify("Cannot login", top_k=3)
+        return result, time.perf_counter() - started
+    
+    result, elapsed = asyncio.run(run())
+    
+    assert result["category"] == "Authentication"
+    assert elapsed < 0.25
+    assert classifier.embedding_cache.stats()["memory_hits"] >= 1
+
+
+def test_async_disk_tier_goes_through_the_cache_io_pool(make_classifier, tmp_path):
+    classifier = make_classifier(EMBED_CACHE_PATH=tmp_path / "embeddings.db")
+    assert classifier._cache_io_executor is not None
+    
+    async def run():
+        first = await classifier.aclassify("Payment failed twice", top_k=3)
+        classifier.embedding_cache._lru.clear()
+        classifier.result_cache.invalidate()
+        second = await classifier.aclassify("Payment failed twice", top_k=3)
+        return first, second
+    
+    first, second = asyncio.run(run())
+    
+    assert first == second
+    assert classifier.embedding_cache.stats()["disk_hits"] == 1
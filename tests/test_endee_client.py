@@ -0,0 +1,136 @@
+"""
+Endee Client Tests
+Retries, the circuit breaker and error reporting of EndeeClient and
+AsyncEndeeClient, against FakeEndee over real HTTP
+"""
+
+import json
+import time
+import asyncio
+import msgpack
+import numpy as np
+import pytest
+from src.circuit_breaker import CircuitBreaker
+from src.endee_client import AsyncEndeeClient, EndeeClient, EndeeSearchError, EndeeUnavailable
+
+TICKETS = [
+    {"id": i, "text": f"ticket {i}", "category": category, "priority": "High"}
+    for i, category in enumerate(["Billing", "Technical", "Authentication", "Billing"])
+]
+
+
+def fail_next(fake, count: int):
+    """Make the fake answer the next count requests with its error_status"""
+    failures = [True] * count
+    fake._inject_error = lambda: bool(failures) and failures.pop()
+
+
+@pytest.fixture
+def client(fake_endee, metadata_store):
+    client = EndeeClient(metadata_store=metadata_store, breaker=CircuitBreaker(failure_threshold=0))
+    client.create_index("tickets", dimension=4)
+    assert client.batch_insert("tickets", np.eye(4, dtype=np.float32), TICKETS)
+    return client
+
+
+def test_search_returns_neighbours_with_sidecar_metadata(client):
+    results = client.search("tickets", [0, 1, 0, 0], top_k=2)
+    
+    assert results[0]["id"] == "ticket_1"
+    assert results[0]["metadata"] == {"category": "Technical", "priority": "High", "text": "ticket 1"}
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert len(results) == 2
+
+
+def test_transient_errors_are_retried(client, fake_endee):
+    fail_next(fake_endee, 2)
+    
+    results = client.search("tickets", [1, 0, 0, 0], top_k=1)
+    
+    assert results[0]["id"] == "ticket_0"
+    assert fake_endee.stats()["responses"]["search:503"] == 2
+    assert client.pool_stats()["retries"] == 2
+
+
+def test_retries_give_up_with_endee_unavailable(client, fake_endee):
+    client.retries["search"] = 1
+    fake_endee.error_rate = 1.0
+    
+    with pytest.raises(EndeeUnavailable):
+        client.search("tickets", [1, 0, 0, 0])
+    assert fake_endee.stats()["responses"]["search:503"] == 2
+
+
+def test_client_errors_raise_search_error(client):
+    with pytest.raises(EndeeSearchError, match="404"):
+        client.search("missing", [1, 0, 0, 0])
+
+
+def test_breaker_opens_on_5xx_and_recovers(fake_endee, metadata_store):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.2)
+    client = EndeeClient(metadata_store=metadata_store, breaker=breaker)
+    client.create_index("tickets", dimension=4)
+    client.batch_insert("tickets", np.eye(4, dtype=np.float32), TICKETS)
+    
+    # 500 is not retried, but it still counts as a breaker failure
+    fake_endee.error_status = 500
+    fake_endee.error_rate = 1.0
+    for _ in range(2):
+        with pytest.raises(EndeeUnavailable):
+            client.search("tickets", [1, 0, 0, 0])
+    assert breaker.state == "open"
+    
+    # Open: rejected without a request
+    sent = fake_endee.stats()["responses"]["search:500"]
+    with pytest.raises(EndeeUnavailable):
+        client.search("tickets", [1, 0, 0, 0])
+    assert fake_endee.stats()["responses"]["search:500"] == sent
+    
+    # After reset_seconds a successful probe closes the circuit
+    fake_endee.error_rate = 0.0
+    time.sleep(0.25)
+    assert client.search("tickets", [1, 0, 0, 0], top_k=1)[0]["id"] == "ticket_0"
+    assert breaker.state == "closed"
+
+
+def test_async_client_retries_and_raises(fake_endee, metadata_store):
+    async def run():
+        client = AsyncEndeeClient(metadata_store=metadata_store, breaker=CircuitBreaker(failure_threshold=0))
+        try:
+            await client.create_index("tickets", dimension=4)
+            await client.batch_insert("tickets", np.eye(4, dtype=np.float32), TICKETS)
+            fail_next(fake_endee, 1)
+            results = await client.search("tickets", [0, 0, 1, 0], top_k=1)
+            with pytest.raises(EndeeSearchError):
+                await client.search("missing", [0, 0, 1, 0])
+            return results
+        finally:
+            await client.aclose()
+    
+    assert asyncio.run(run())[0]["id"] == "ticket_2"
+    assert fake_endee.stats()["responses"]["search:503"] == 1
+
+
+class _Response:
+    def __init__(self, body: bytes, content_type: str = None):
+        self.content = body
+        self.headers = {"Content-Type": content_type} if content_type else {}
+
+
+@pytest.mark.parametrize("content_type", [None, "text/plain", "application/msgpack"])
+def test_responses_are_decoded_without_a_usable_content_type(content_type):
+    data = {"results": [{"id": "a", "distance": 0.25}]}
+    
+    assert EndeeClient._decode_response(_Response(msgpack.packb(data), content_type)) == data
+    if content_type != "application/msgpack":
+        assert EndeeClient._decode_response(_Response(json.dumps(data).encode(), content_type)) == data
+
+
+def test_delete_index_drops_its_metadata(client, metadata_store):
+    client.create_index("other", dimension=4)
+    client.batch_insert("other", np.eye(4, dtype=np.float32)[:1], [{"text": "kept", "category": "Billing"}], ["kept"])
+    
+    assert client.delete_index("tickets")
+    
+    assert metadata_store.ids() == ["kept"]
+    assert metadata_store.lookup(["ticket_0"]) == [None]
@@ -0,0 +1,85 @@
+"""
+Bulk Indexing Tests
+Streaming ticket parsing, checkpoints and resuming an interrupted
+scripts/index_tickets.py run against the local engine
+"""
+
+import sys
+import json
+import pytest
+import scripts.index_tickets as index_tickets
+from src.backends import create_vector_client
+from src.local_index import LocalIndex
+from src.metadata_store import MetadataStore
+
+
+def write_tickets(path, count: int):
+    tickets = [
+        {"id": i, "text": f"ticket number {i} about billing {i % 7}", "category": f"cat{i % 3}", "priority": "Low"}
+        for i in range(count)
+    ]
+    path.write_text(json.dumps(tickets, indent=1))
+    return tickets
+
+
+@pytest.mark.parametrize("name", ["tickets.json", "tickets.jsonl"])
+def test_iter_tickets_streams_arrays_and_ndjson(tmp_path, name):
+    tickets = [{"id": i, "text": "x" * (i * 37), "category": "Billing"} for i in range(50)]
+    path = tmp_path / name
+    if name.endswith(".jsonl"):
+        path.write_text("".join(json.dumps(ticket) + "\n\n" for ticket in tickets))
+    else:
+        path.write_text(json.dumps(tickets))
+    
+    assert list(index_tickets.iter_tickets(str(path), read_size=64)) == tickets
+
+
+def test_checkpoint_for_another_source_is_ignored(tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    index_tickets.save_checkpoint(checkpoint, "a.json", "support_tickets", 500)
+    
+    assert index_tickets.load_checkpoint(checkpoint, "a.json", "support_tickets") == 500
+    assert index_tickets.load_checkpoint(checkpoint, "b.json", "support_tickets") == 0
+    assert index_tickets.load_checkpoint(checkpoint, "a.json", "other_index") == 0
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(tmp_path, monkeypatch, encoder):
+    source = tmp_path / "tickets.json"
+    tickets = write_tickets(source, 100)
+    checkpoint = str(tmp_path / "checkpoint.json")
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    monkeypatch.setattr(index_tickets, "load_encoder", lambda model_path: (encoder, "hash-encoder"))
+    
+    inserted = []
+    
+    def client_failing_on(failing_chunk):
+        def create(**kwargs):
+            client = create_vector_client(**kwargs)
+            batch_insert = client.batch_insert
+            
+            def insert(index_name, vectors, metadatas, ids):
+                if failing_chunk is not None and ids[0] == f"ticket_{failing_chunk * 10}":
+                    return False
+                inserted.extend(ids)
+                return batch_insert(index_name, vectors, metadatas, ids)
+            client.batch_insert = insert
+            return client
+        return create
+    
+    argv = ["index_tickets.py", "--source", str(source), "--chunk-size", "10", "--workers", "1",
+            "--retries", "0", "--checkpoint", checkpoint]
+    monkeypatch.setattr(sys, "argv", argv)
+    
+    monkeypatch.setattr(index_tickets, "create_vector_client", client_failing_on(6))
+    with pytest.raises(SystemExit):
+        index_tickets.main()
+    assert json.load(open(checkpoint))["completed"] == 60
+    
+    inserted.clear()
+    monkeypatch.setattr(index_tickets, "create_vector_client", client_failing_on(None))
+    index_tickets.main()
+    
+    assert inserted == [f"ticket_{i}" for i in range(60, 100)]
+    assert json.load(open(checkpoint))["completed"] == 100
+    index = LocalIndex(metadata_store=MetadataStore())
+    assert index.get_stats("support_tickets")["total_elements"] == len(tickets)
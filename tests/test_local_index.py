@@ -0,0 +1,182 @@
+"""
+Local Index Tests
+Exact search, tombstones and cross-process refresh of LocalIndex, and
+the float16/PQ vector codecs with writer-side codebook training
+"""
+
+import os
+import multiprocessing
+import numpy as np
+import pytest
+import src.local_index as local_index
+from src.local_index import LocalIndex
+from src.metadata_store import MetadataStore
+from src.vector_codecs import Float16Codec, PQCodec, create_codec
+
+DIM = 32
+
+
+def clustered(count: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors around 64 cluster centres (PQ-friendly, like sentence embeddings)"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(64, DIM)).astype(np.float32)
+    vectors = centres[rng.integers(0, len(centres), count)] + 0.3 * rng.normal(size=(count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def metadatas(count: int, start: int = 0):
+    return [{"text": f"ticket {i}", "category": "Billing", "priority": "Low"} for i in range(start, start + count)]
+
+
+@pytest.fixture
+def index(tmp_path, metadata_store):
+    return LocalIndex(str(tmp_path / "local_index"), metadata_store, codec="float32")
+
+
+def test_search_is_exact_and_skips_deleted_rows(index):
+    vectors = clustered(200)
+    ids = [f"id{i}" for i in range(200)]
+    index.batch_insert("tickets", vectors, metadatas(200), ids)
+    
+    top = index.search("tickets", vectors[17], top_k=3)
+    assert top[0]["id"] == "id17" and top[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert top[0]["metadata"]["text"] == "ticket 17"
+    
+    index.delete_vectors("tickets", ["id17"])
+    assert "id17" not in [hit["id"] for hit in index.search("tickets", vectors[17], top_k=3)]
+    assert index.get_stats("tickets")["deleted_elements"] == 1
+
+
+def test_other_instances_see_inserts_overwrites_and_deletes(index, metadata_store):
+    vectors = clustered(50)
+    index.batch_insert("tickets", vectors, metadatas(50), [f"id{i}" for i in range(50)])
+    other = LocalIndex(index.path, metadata_store, codec="float16")
+    assert other.search("tickets", vectors[3], top_k=1)[0]["id"] == "id3"
+    
+    # Overwrite id3 in place and delete id4 from the first instance
+    index.upsert("tickets", vectors[10:11], metadatas(1, 10), ["id3"])
+    index.delete_vectors("tickets", ["id4"])
+    
+    hits = other.search("tickets", vectors[10], top_k=2)
+    assert {hit["id"] for hit in hits} == {"id3", "id10"}
+    assert "id4" not in [hit["id"] for hit in other.search("tickets", vectors[4], top_k=5)]
+
+
+def test_float16_codec_scores_match_float32():
+    vectors = clustered(500)
+    codec = Float16Codec(DIM)
+    codes = codec.encode(vectors)
+    
+    for metric in ("cosine", "l2"):
+        exact = vectors @ vectors[:4].T if metric == "cosine" else \
+            -((vectors[:, None, :] - vectors[None, :4, :]) ** 2).sum(-1)
+        assert np.allclose(codec.scores(codes, vectors[:4], metric), exact, atol=1e-2)
+
+
+def test_pq_codec_round_trip(tmp_path):
+    vectors = clustered(3000)
+    codec = PQCodec(DIM, subvectors=8)
+    codec.train(vectors)
+    codes = codec.encode(vectors)
+    assert codes.shape == (3000, 8) and codes.dtype == np.uint8
+    
+    # ADC scores are exactly the scores of the decoded vectors
+    queries = vectors[:5]
+    assert np.allclose(codec.scores(codes, queries, "cosine"), codec.decode(codes) @ queries.T, atol=1e-4)
+    
+    path = str(tmp_path / "codebook.npy")
+    codec.save(path)
+    loaded = PQCodec(DIM, subvectors=8)
+    assert loaded.load(path) and np.array_equal(loaded.encode(vectors), codes)
+    assert not PQCodec(DIM, subvectors=4).load(path)
+
+
+def test_codec_validation():
+    with pytest.raises(ValueError):
+        PQCodec(DIM, subvectors=5)
+    with pytest.raises(ValueError):
+        create_codec("int4", DIM)
+    assert create_codec("float32", DIM) is None
+
+
+def test_writer_trains_pq_codebook_and_searchers_load_it(tmp_path, metadata_store, monkeypatch):
+    monkeypatch.setattr(local_index, "PQ_MIN_TRAIN_ROWS", 1000)
+    monkeypatch.setenv("LOCAL_INDEX_PQ_SUBVECTORS", "8")
+    path = str(tmp_path / "local_index")
+    vectors = clustered(3000)
+    ids = [f"id{i}" for i in range(3000)]
+    
+    # Below the threshold nothing is trained and searches stay exact
+    writer = LocalIndex(path, metadata_store, codec="pq")
+    writer.batch_insert("tickets", vectors[:500], metadatas(500), ids[:500])
+    searcher = LocalIndex(path, metadata_store, codec="pq", rerank=50)
+    searcher.search("tickets", vectors[0], top_k=1)
+    assert not searcher.get_stats("tickets")["approximate_search"]
+    codebook = os.path.join(path, "tickets", "pq_8x256.npy")
+    assert not os.path.exists(codebook)
+    
+    # Crossing it trains the codebook in the writer, which never encodes
+    writer.batch_insert("tickets", vectors[500:], metadatas(2500, 500), ids[500:])
+    assert os.path.exists(codebook)
+    assert writer.get_stats("tickets")["code_bytes"] == 0
+    
+    # The searcher loads it, scans codes and reranks exactly
+    hits = searcher.search_batch("tickets", vectors[:20], top_k=5)
+    stats = searcher.get_stats("tickets")
+    assert stats["approximate_search"] and stats["code_bytes"] == 3000 * 8
+    exact = np.argsort(-(vectors @ vectors[:20].T), axis=0)[:5]
+    recall = np.mean([
+        len({hit["id"] for hit in hits[q]} & {ids[row] for row in exact[:, q]}) / 5 for q in range(20)
+    ])
+    assert recall >= 0.9
+    assert all(hits[q][0]["id"] == ids[q] and hits[q][0]["score"] == pytest.approx(1.0, abs=1e-5) for q in range(20))
+
+
+def test_duplicate_ids_in_a_batch_keep_the_last_copy(index):
+    vectors = clustered(3)
+    
+    index.batch_insert("tickets", vectors, metadatas(3), ["dup", "other", "dup"])
+    
+    assert index.get_stats("tickets")["total_elements"] == 2
+    hits = index.search("tickets", vectors[0], top_k=3)
+    assert [hit["id"] for hit in hits].count("dup") == 1
+    assert index.search("tickets", vectors[2], top_k=1)[0]["id"] == "dup"
+    assert index.metadata.lookup(["dup"])[0]["text"] == "ticket 2"
+
+
+def _append(path: str, metadata_path: str, worker: int):
+    index = LocalIndex(path, MetadataStore(metadata_path), codec="float32")
+    vectors = clustered(400, seed=worker)
+    for batch in range(20):
+        rows = slice(batch * 20, batch * 20 + 20)
+        index.batch_insert("tickets", vectors[rows], metadatas(20), [f"w{worker}_{i}" for i in range(400)][rows])
+        index.delete_vectors("tickets", [f"w{worker}_{batch * 20}"])
+
+
+def test_concurrent_writer_processes_keep_rows_and_ids_aligned(tmp_path, metadata_store):
+    path = str(tmp_path / "local_index")
+    LocalIndex(path, metadata_store).create_index("tickets", dimension=DIM)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_append, args=(path, metadata_store.path, w)) for w in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+    
+    index = LocalIndex(path, metadata_store)
+    assert index.get_stats("tickets")["total_elements"] == 4 * 380
+    for worker in range(4):
+        vectors = clustered(400, seed=worker)
+        hits = index.search_batch("tickets", vectors[3:400:20], top_k=1)
+        assert [hit[0]["id"] for hit in hits] == [f"w{worker}_{i}" for i in range(3, 400, 20)]
+
+
+def test_delete_index_drops_its_metadata(index, metadata_store):
+    index.batch_insert("tickets", clustered(5), metadatas(5), [f"id{i}" for i in range(5)])
+    index.batch_insert("other", clustered(1), metadatas(1), ["kept"])
+    
+    assert index.delete_index("tickets")
+    
+    assert metadata_store.ids() == ["kept"]
+    assert index.get_stats("tickets") == {"error": "Index 'tickets' not found"}
@@ -0,0 +1,107 @@
+"""
+Metadata Store Tests
+Tombstones, shadowing re-inserts and refresh across instances and
+processes sharing one MetadataStore directory
+"""
+
+import multiprocessing
+from src.metadata_store import MetadataStore, vector_ids
+
+
+def ticket(i: int, category: str = "Billing") -> dict:
+    return {"text": f"ticket {i}", "category": category, "priority": "Low"}
+
+
+def test_delete_writes_a_tombstone_and_reinsert_revives(metadata_store):
+    metadata_store.put_many(["a", "b"], [ticket(1), ticket(2)])
+    
+    metadata_store.delete_many(["a", "unknown"])
+    
+    assert metadata_store.lookup(["a", "b"]) == [None, ticket(2)]
+    assert metadata_store.ids() == ["b"]
+    assert metadata_store.stats()["rows"] == 3  # two rows and one tombstone
+    
+    metadata_store.put_many(["a"], [ticket(3, "Technical")])
+    assert metadata_store.lookup(["a"]) == [ticket(3, "Technical")]
+    assert metadata_store.ids() == ["b", "a"]
+
+
+def test_tombstones_survive_reopening(metadata_store):
+    metadata_store.put_many(["a", "b"], [ticket(1), ticket(2)])
+    metadata_store.delete_many(["b"])
+    
+    reopened = MetadataStore(metadata_store.path)
+    
+    assert reopened.lookup(["a", "b"]) == [ticket(1), None]
+    assert len(reopened) == 1
+
+
+def test_other_instances_see_appends_deletes_and_labels(metadata_store):
+    other = MetadataStore(metadata_store.path)
+    generation = other.generation()
+    
+    metadata_store.put_many(["a"], [ticket(1, "New Label")])
+    assert other.lookup(["a"]) == [ticket(1, "New Label")]
+    assert other.generation() != generation
+    
+    other.delete_many(["a"])
+    assert metadata_store.lookup(["a"]) == [None]
+    
+    generation = metadata_store.generation()
+    other.mark_changed()
+    assert metadata_store.generation() != generation
+
+
+def _write(path: str, worker: int):
+    store = MetadataStore(path)
+    for batch in range(10):
+        ids = [f"w{worker}_{batch}_{i}" for i in range(10)]
+        store.put_many(ids, [
+            {"text": vector_id, "category": f"cat{worker}_{batch % 3}", "priority": f"p{worker}"}
+            for vector_id in ids
+        ])
+        store.delete_many(ids[:2])
+
+
+def test_concurrent_writer_processes_do_not_corrupt_rows(metadata_store):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_write, args=(metadata_store.path, w)) for w in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+    
+    for worker in range(4):
+        for batch in range(10):
+            ids = [f"w{worker}_{batch}_{i}" for i in range(10)]
+            found = metadata_store.lookup(ids)
+            assert found[:2] == [None, None]
+            assert found[2:] == [
+                {"text": vector_id, "category": f"cat{worker}_{batch % 3}", "priority": f"p{worker}"}
+                for vector_id in ids[2:]
+            ]
+    assert len(metadata_store) == 4 * 10 * 8
+
+
+def test_vector_ids_are_stable():
+    tickets = [{"id": 7, "text": "a"}, {"text": "b"}, {"text": "b"}]
+    
+    ids = vector_ids(["explicit"], tickets)
+    
+    assert ids[0] == "explicit"
+    assert ids[1] == ids[2] and ids[1].startswith("text_")
+    assert vector_ids(None, tickets)[0] == "ticket_7"
+
+
+def test_delete_index_tombstones_the_ids_written_through_it(metadata_store):
+    metadata_store.put_many(["a", "b"], [ticket(1), ticket(2)], "tickets")
+    metadata_store.put_many(["c"], [ticket(3)], "archive")
+    metadata_store.delete_many(["b"])
+    generation = metadata_store.generation()
+    
+    assert metadata_store.delete_index("tickets", ["legacy", "a"]) == 1
+    
+    assert metadata_store.ids() == ["c"]
+    assert metadata_store.generation() != generation
+    assert MetadataStore(metadata_store.path).delete_index("tickets") == 0
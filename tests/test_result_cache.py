@@ -0,0 +1,43 @@
+"""
+Result Cache Tests
+Version invalidation of ResultCache, including changes made by another
+process through the shared MetadataStore
+"""
+
+from src.metadata_store import MetadataStore
+from src.result_cache import ResultCache
+
+
+def test_index_change_clears_the_cache():
+    version = [0]
+    cache = ResultCache(lambda: version[0], max_entries=10, ttl_seconds=60)
+    cache.put("My invoice is wrong", 5, {"category": "Billing"})
+    
+    assert cache.get("my  INVOICE is wrong", 5) == {"category": "Billing"}
+    version[0] += 1
+    assert cache.get("My invoice is wrong", 5) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_results_computed_before_a_change_are_not_cached():
+    version = [0]
+    cache = ResultCache(lambda: version[0], max_entries=10, ttl_seconds=60)
+    
+    captured = cache.version()
+    version[0] += 1  # the index changes while the result is being computed
+    cache.put("ticket", 5, {"category": "Billing"}, captured)
+    
+    assert cache.get("ticket", 5) is None
+    assert cache.stats()["stale_puts"] == 1
+
+
+def test_another_process_deleting_an_index_invalidates(tmp_path):
+    path = str(tmp_path / "metadata")
+    ours, theirs = MetadataStore(path), MetadataStore(path)
+    cache = ResultCache(ours.generation, max_entries=10, ttl_seconds=60)
+    cache.put("ticket", 5, {"category": "Billing"}, cache.version())
+    assert cache.get("ticket", 5) is not None
+    
+    theirs.mark_changed()
+    
+    assert cache.get("ticket", 5) is None
@@ -0,0 +1,90 @@
+"""
+Snapshot Tests
+SnapshotWriter -> Snapshot round trip, checksum verification and
+rejection of unfinished or foreign snapshot directories
+"""
+
+import os
+import numpy as np
+import pytest
+import src.snapshot as snapshot
+from src.snapshot import Snapshot, SnapshotWriter
+
+
+def write_snapshot(path: str, batches: int = 4, batch_size: int = 9):
+    rng = np.random.default_rng(0)
+    writer = SnapshotWriter(path, model_id="test-model@8")
+    ids, vectors, metadatas = [], [], []
+    for batch in range(batches):
+        batch_ids = [f"ticket_{batch}_{i}" + "é" * (i % 3) for i in range(batch_size)]
+        batch_vectors = rng.random((batch_size, 8), dtype=np.float32)
+        batch_metadatas = [
+            {"text": f"Ticket {batch}/{i} ✓" * (i % 4), "category": f"cat{i % 3}", "priority": None if i % 2 else "High"}
+            for i in range(batch_size)
+        ]
+        writer.add(batch_ids, batch_vectors, batch_metadatas)
+        ids += batch_ids
+        vectors.append(batch_vectors)
+        metadatas += batch_metadatas
+    manifest = writer.close(source="test")
+    return manifest, ids, np.concatenate(vectors), metadatas
+
+
+def test_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "ID_CHUNK_ROWS", 5)  # ids.npy is written in several chunks
+    path = str(tmp_path / "snapshot")
+    manifest, ids, vectors, metadatas = write_snapshot(path)
+    
+    restored = Snapshot(path)
+    
+    assert len(restored) == manifest["count"] == len(ids)
+    assert restored.manifest["model"] == "test-model@8"
+    assert restored.verify() == []
+    assert restored.ids.tolist() == ids
+    assert np.array_equal(restored.embeddings, vectors)
+    assert restored.metadatas(0, len(ids)) == [
+        {"category": m["category"], "priority": m["priority"] or "Medium", "text": m["text"]} for m in metadatas
+    ]
+    assert not [name for name in os.listdir(path) if name.endswith(".tmp")]
+
+
+def test_iter_batches_resumes_from_a_row(tmp_path):
+    path = str(tmp_path / "snapshot")
+    _, ids, vectors, _ = write_snapshot(path)
+    
+    batches = list(Snapshot(path).iter_batches(batch_size=10, start=7))
+    
+    assert [vector_id for batch_ids, _, _ in batches for vector_id in batch_ids] == ids[7:]
+    assert np.array_equal(np.concatenate([batch_vectors for _, batch_vectors, _ in batches]), vectors[7:])
+
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "snapshot")
+    SnapshotWriter(path, model_id="m").close()
+    
+    restored = Snapshot(path)
+    
+    assert len(restored) == 0 and restored.verify() == []
+    assert list(restored.iter_batches()) == []
+
+
+def test_corruption_and_unfinished_snapshots_are_detected(tmp_path):
+    path = str(tmp_path / "snapshot")
+    write_snapshot(path)
+    with open(os.path.join(path, "texts.bin"), "r+b") as f:
+        f.write(b"X")
+    assert Snapshot(path).verify() == ["texts.bin"]
+    
+    os.remove(os.path.join(path, "manifest.json"))
+    with pytest.raises(ValueError, match="manifest"):
+        Snapshot(path)
+    with pytest.raises(FileExistsError):
+        SnapshotWriter(path, model_id="m")
+
+
+def test_mismatched_dimensions_are_rejected(tmp_path):
+    writer = SnapshotWriter(str(tmp_path / "snapshot"), model_id="m")
+    writer.add(["a"], np.zeros((1, 8)), [{"text": "a"}])
+    
+    with pytest.raises(ValueError, match="8-dim"):
+        writer.add(["b"], np.zeros((1, 4)), [{"text": "b"}])
@@ -0,0 +1,61 @@
+"""
+Snapshot Script Tests
+Export -> import through scripts/snapshot_tickets.py, including the
+check that a snapshot was built with the configured encoder
+"""
+
+import os
+import sys
+import json
+import pytest
+import src.encoders as encoders
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import scripts.snapshot_tickets as snapshot_tickets  # noqa: E402
+from src.local_index import LocalIndex  # noqa: E402
+from src.metadata_store import MetadataStore  # noqa: E402
+
+
+@pytest.fixture
+def run(monkeypatch):
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    
+    def run(*argv):
+        monkeypatch.setattr(sys, "argv", ["snapshot_tickets.py", *argv])
+        snapshot_tickets.main()
+    return run
+
+
+def export(run, monkeypatch, tmp_path, encoder, model_name):
+    source = tmp_path / "tickets.json"
+    source.write_text(json.dumps([
+        {"id": i, "text": f"ticket {i} about billing", "category": "Billing", "priority": "Low"}
+        for i in range(12)
+    ]))
+    out = str(tmp_path / f"snapshot-{model_name}")
+    monkeypatch.setattr(encoders, "load_encoder", lambda model_path: (encoder, model_name))
+    run("export", "--source", str(source), "--out", out)
+    return out
+
+
+def restore(run, tmp_path, snapshot, *flags):
+    run("import", "--snapshot", snapshot, "--index", "restored",
+        "--checkpoint", str(tmp_path / "checkpoint.json"), "--reset", *flags)
+    return LocalIndex(metadata_store=MetadataStore()).get_stats("restored")["total_elements"]
+
+
+def test_import_with_the_configured_model(run, monkeypatch, tmp_path, encoder):
+    snapshot = export(run, monkeypatch, tmp_path, encoder, "hash-encoder")
+    
+    assert restore(run, tmp_path, snapshot) == 12
+
+
+def test_import_from_another_model_is_refused_unless_forced(run, monkeypatch, tmp_path, encoder):
+    snapshot = export(run, monkeypatch, tmp_path, encoder, "other-encoder")
+    monkeypatch.setattr(encoders, "load_encoder", lambda model_path: (encoder, "hash-encoder"))
+    
+    with pytest.raises(SystemExit):
+        restore(run, tmp_path, snapshot)
+    assert not os.path.exists(tmp_path / "checkpoint.json")
+    
+    assert restore(run, tmp_path, snapshot, "--force") == 12
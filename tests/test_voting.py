@@ -0,0 +1,54 @@
+"""
+Voting Tests
+Similarity weighting, weighted votes and adaptive-k widening of the
+classifier's kNN search
+"""
+
+import numpy as np
+import pytest
+from src.voting import vote_weights, weighted_vote
+
+
+def test_softmax_trusts_the_closest_neighbours():
+    weights = vote_weights(np.array([0.9, 0.8, 0.8]), "softmax", temperature=0.05)
+    
+    label, confidence, margin = weighted_vote(["Billing", "Technical", "Technical"], weights)
+    
+    assert label == "Billing"
+    assert confidence == pytest.approx(weights[0] / weights.sum())
+    assert margin == pytest.approx((weights[0] - weights[1:].sum()) / weights.sum())
+
+
+def test_uniform_is_a_majority_vote_and_ties_go_to_the_closer_label():
+    weights = vote_weights(np.array([0.9, 0.8, 0.8]), "uniform")
+    assert weighted_vote(["Billing", "Technical", "Technical"], weights)[0] == "Technical"
+    
+    label, confidence, margin = weighted_vote(["Billing", "Technical"], vote_weights(np.ones(2), "uniform"))
+    assert (label, confidence, margin) == ("Billing", 0.5, 0.0)
+
+
+def test_unknown_weighting_is_rejected():
+    with pytest.raises(ValueError, match="VOTE_WEIGHTING"):
+        vote_weights(np.ones(2), "median")
+
+
+def test_adaptive_k_widens_only_close_calls(make_classifier):
+    classifier = make_classifier(VOTE_INITIAL_K=3, VOTE_MARGIN_THRESHOLD=0.5, VOTE_WEIGHTING="uniform")
+    widened = classifier.voting_stats()["widened_searches"]
+    
+    def searcher(labels):
+        searches = []
+        
+        def search(index_name, query_vector, top_k):
+            searches.append(top_k)
+            return [{"score": 0.9, "metadata": {"category": label}} for label in labels[:top_k]]
+        return search, searches
+    
+    clear, clear_searches = searcher(["Billing"] * 10)
+    classifier._search_adaptive(clear, np.zeros(64), top_k=10)
+    close, close_searches = searcher(["Billing", "Technical", "Authentication"] * 4)
+    classifier._search_adaptive(close, np.zeros(64), top_k=10)
+    
+    assert clear_searches == [3]
+    assert close_searches == [3, 10]
+    assert classifier.voting_stats()["widened_searches"] == widened + 1